@@ -0,0 +1,155 @@
+"""The benchmarked hot paths.
+
+Each benchmark takes the workspace (scratch folder, template directory) and
+its parameters and returns ``(setup, run)``: ``setup()`` builds fresh inputs
+for one round and is not timed, ``run(inputs)`` is the timed part. A batch
+returns ``{'letters': n}`` so the runner can report letters per second.
+"""
+import itertools
+import os
+from docx import Document
+from db.database import connect_db, save_case
+from engine.bank import build_bank_cases
+from engine.batch import make_job, run_jobs
+from engine.identifiers import normalize_identifiers
+from engine.placeholders import replace_placeholder_in_paragraph
+from engine.render import build_bank_accounts_table, load_template, render
+from engine.templates import template_path
+from engine.tsp import REQUEST_KINDS
+from .fixtures import accounts, bank_sheet, tsp_identifiers
+
+OFFICER = {'Id': 1, 'OfficerName': 'Benchmark Officer', 'Designation': 'Inspector',
+           'Phone': '9000000000', 'Email': 'officer@example.com'}
+
+
+def placeholder_paragraph(workspace, runs, keys):
+    """A paragraph of ``runs`` runs holding two placeholders split across runs, and ``keys`` replacements."""
+    replacements = {f'{{{{Key_{i}}}}}': f'value {i}' for i in range(keys)}
+    text = f"Crime {{{{Key_0}}}} reported under NCRP {{{{Key_{keys - 1}}}}} is under investigation."
+    size = max(1, -(-len(text) // runs))
+    chunks = [text[i:i + size] for i in range(0, len(text), size)]
+    chunks += [''] * (runs - len(chunks))
+
+    def setup():
+        paragraph = Document().add_paragraph()
+        for chunk in chunks:
+            paragraph.add_run(chunk)
+        return paragraph
+
+    def run(paragraph):
+        replace_placeholder_in_paragraph(paragraph, replacements)
+    return setup, run
+
+
+def template_load(workspace, source):
+    path = template_path(workspace['template_dir'], 'Bank')
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    def run(_):
+        load_template(path if source == 'file' else data)
+    return (lambda: None), run
+
+
+def accounts_table(workspace, rows):
+    path = template_path(workspace['template_dir'], 'Bank')
+    rows_data = accounts(rows)
+
+    def run(doc):
+        build_bank_accounts_table(doc, rows_data)
+    return (lambda: load_template(path)), run
+
+
+def bank_letter(workspace, output_format, accounts_per_letter=25):
+    case = {
+        'CrimeNumber': '1/2025', 'NCRP_ID': '12345678901234', 'Bank': 'Bench Bank', 'Total_Amount': '₹1,000/-',
+        'Date_From': '01-01-2025', 'Date_To': '31-01-2025', 'Accounts': accounts(accounts_per_letter),
+    }
+
+    def run(_):
+        render('Bank', case, OFFICER, workspace['template_dir'], output_format=output_format)
+    return (lambda: None), run
+
+
+def bank_batch(workspace, banks, accounts_per_bank=5, workers=1):
+    """Group a sheet into cases and render one .docx per bank, as a batch run does."""
+    df = bank_sheet(banks * accounts_per_bank, banks)
+    rounds = itertools.count()
+
+    def setup():
+        output_dir = os.path.join(workspace['path'], f'batch_{banks}_{next(rounds)}')
+        os.makedirs(output_dir, exist_ok=True)
+        return output_dir
+
+    def run(output_dir):
+        cases, errors = build_bank_cases(df, '1/2025', '12345678901234', max_letters=banks)
+        jobs = [make_job('Bank', case, OFFICER, workspace['template_dir'],
+                         os.path.join(output_dir, f'Notice_{index}.docx'), case['Bank'])
+                for index, (bank_name, case) in enumerate(cases, start=1)]
+        results = run_jobs(jobs, workers)
+        return {'letters': sum(1 for r in results if r['status'] == 'ok')}
+    return setup, run
+
+
+def bank_cases(workspace, rows):
+    """Group a skewed sheet with repeated accounts and messy amounts, as real exports are."""
+    df = bank_sheet(rows, skew=1.0, duplicate_ratio=0.3, dirty_ratio=0.2, blank_ratio=0.05)
+
+    def run(_):
+        build_bank_cases(df, '1/2025', '12345678901234', max_letters=rows)
+    return (lambda: None), run
+
+
+def identifiers(workspace, request_type, count, dirty_ratio):
+    """Normalize and validate a bulk TSP list, a fifth of it invalid or pasted with spaces and prefixes."""
+    values = tsp_identifiers(request_type, count, dirty_ratio=dirty_ratio, invalid_ratio=0.05)
+    kind = REQUEST_KINDS[request_type]
+
+    def run(_):
+        normalize_identifiers(values, kind)
+        return {'identifiers': count}
+    return (lambda: None), run
+
+
+def db_connect(workspace):
+    def run(_):
+        conn = connect_db()
+        conn.close()
+    return (lambda: None), run
+
+
+def db_save_case(workspace, existing):
+    """save_case for a case already in the database, or a new one each round."""
+    numbers = itertools.count()
+
+    def setup():
+        if existing:
+            return {'CrimeNumber': 'BENCH/EXISTING', 'NCRP_ID': '1'}
+        return {'CrimeNumber': f'BENCH/{next(numbers)}', 'NCRP_ID': '1'}
+
+    def run(case):
+        error = save_case(case, OFFICER['Id'], 'Bank')
+        if error:
+            raise RuntimeError(error)
+    return setup, run
+
+
+# (name, function, parameter sets, rounds, parameter sets left out by --quick)
+BENCHMARKS = [
+    ('placeholders.replace', placeholder_paragraph,
+     [{'runs': runs, 'keys': keys} for runs in (1, 10, 50) for keys in (10, 50, 200)], 200, []),
+    ('template.load', template_load, [{'source': 'file'}, {'source': 'bytes'}], 30, []),
+    ('accounts_table.build', accounts_table, [{'rows': 100}, {'rows': 1000}, {'rows': 10000}], 5,
+     [{'rows': 10000}]),
+    ('letter.render', bank_letter, [{'output_format': 'docx'}, {'output_format': 'pdf'}], 10, []),
+    ('bank_cases.build', bank_cases, [{'rows': 1000}, {'rows': 10000}, {'rows': 100000}], 5,
+     [{'rows': 100000}]),
+    ('bank_batch.run', bank_batch, [{'banks': 10}, {'banks': 200}, {'banks': 2000}], 3, [{'banks': 2000}]),
+    ('identifiers.normalize', identifiers,
+     [{'request_type': request_type, 'count': count, 'dirty_ratio': dirty_ratio}
+      for request_type in ('CDR', 'IMEI CDR') for count in (100000, 1000000) for dirty_ratio in (0.0, 0.2)], 5,
+     [{'request_type': request_type, 'count': 1000000, 'dirty_ratio': dirty_ratio}
+      for request_type in ('CDR', 'IMEI CDR') for dirty_ratio in (0.0, 0.2)]),
+    ('db.connect', db_connect, [{}], 100, []),
+    ('db.save_case', db_save_case, [{'existing': True}, {'existing': False}], 100, []),
+]
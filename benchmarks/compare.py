@@ -0,0 +1,211 @@
+"""Compare a benchmark run against a baseline from the history.
+
+    python -m benchmarks.compare                          # latest run against the one before it
+    python -m benchmarks.compare --baseline 3f2a9c1       # against every run of that revision
+    python -m benchmarks.compare --baseline 20250601T020000 --report report.txt
+
+Round times are compared with a one-sided Mann-Whitney U test, so a few
+noisy rounds do not count as a slowdown: a benchmark is flagged when it is
+significantly slower (p < --alpha) and its median is at least --threshold
+slower. Batch throughput follows the batch times. Peak memory is
+near-deterministic and has one value per run, so it is flagged on size alone
+(--memory-threshold). Runs of one revision are pooled; only runs from this
+machine are used unless --any-machine is given. The exit code is 1 when
+anything regressed.
+"""
+import argparse
+import math
+import statistics
+import sys
+from .history import DEFAULT_HISTORY, find_runs, load_runs, machine_fingerprint
+from .runner import label
+
+# Smallest memory change worth reporting, whatever the percentage
+MIN_MEMORY_CHANGE_KB = 64
+EXACT_LIMIT = 20
+
+
+def _exact_greater(u, m, n):
+    """P(U >= u) under the null hypothesis, counting every ordering of m + n samples."""
+    # counts[i][j][k]: orderings of i candidate and j baseline samples with U == k
+    counts = [[None] * (n + 1) for _ in range(m + 1)]
+    for i in range(m + 1):
+        for j in range(n + 1):
+            if i == 0 or j == 0:
+                counts[i][j] = [1]
+                continue
+            size = i * j + 1
+            row = [0] * size
+            # The largest sample is a candidate (beats all j baseline samples) or a baseline one
+            for k, c in enumerate(counts[i - 1][j]):
+                row[k + j] += c
+            for k, c in enumerate(counts[i][j - 1]):
+                row[k] += c
+            counts[i][j] = row
+    dist = counts[m][n]
+    return sum(dist[math.ceil(u):]) / math.comb(m + n, m)
+
+
+def mann_whitney_greater(baseline, candidate):
+    """One-sided p-value that ``candidate`` values tend to be larger than ``baseline`` values."""
+    m, n = len(candidate), len(baseline)
+    if not m or not n:
+        return None
+    u = sum(1.0 if c > b else 0.5 if c == b else 0.0 for c in candidate for b in baseline)
+    values = sorted(candidate + baseline)
+    ties = [values.count(v) for v in set(values)]
+    if m + n <= EXACT_LIMIT and max(ties) == 1:
+        return _exact_greater(u, m, n)
+    total = m + n
+    tie_term = sum(t ** 3 - t for t in ties) / (total * (total - 1))
+    sigma = math.sqrt(m * n / 12 * ((total + 1) - tie_term))
+    if sigma == 0:
+        return 1.0
+    z = (u - m * n / 2 - 0.5) / sigma
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+
+def pooled(runs):
+    """key -> {'times', 'memory', 'letters'} over all runs."""
+    pool = {}
+    for run in runs:
+        for result in run['benchmarks']:
+            name = label(result['name'], result.get('params'))
+            entry = pool.setdefault(name, {'times': [], 'memory': [], 'letters': None})
+            entry['times'].extend(result.get('times') or [])
+            if result.get('peak_memory_kb') is not None:
+                entry['memory'].append(result['peak_memory_kb'])
+            if 'letters' in result:
+                entry['letters'] = result['letters']
+    return pool
+
+
+def compare(baseline_runs, candidate_runs, alpha=0.05, threshold=0.05, memory_threshold=0.10):
+    """One row per benchmark in both sets of runs; ``regressed`` marks the flagged ones."""
+    baseline, candidate = pooled(baseline_runs), pooled(candidate_runs)
+    rows = []
+    for name, new in candidate.items():
+        old = baseline.get(name)
+        if not old or not old['times'] or not new['times']:
+            continue
+        old_median, new_median = statistics.median(old['times']), statistics.median(new['times'])
+        ratio = new_median / old_median if old_median else 1.0
+        p_slower = mann_whitney_greater(old['times'], new['times'])
+        p_faster = mann_whitney_greater(new['times'], old['times'])
+        if p_slower < alpha and ratio >= 1 + threshold:
+            verdict = 'SLOWER'
+        elif p_faster < alpha and ratio <= 1 - threshold:
+            verdict = 'faster'
+        else:
+            verdict = ''
+        row = {
+            'name': name, 'baseline': old_median, 'candidate': new_median, 'change': ratio - 1,
+            'p': p_slower, 'rounds': (len(old['times']), len(new['times'])), 'verdict': verdict,
+            'memory': None, 'memory_verdict': '', 'throughput': None,
+        }
+        if new['letters'] and old['letters']:
+            row['throughput'] = (old['letters'] / old_median, new['letters'] / new_median)
+        if old['memory'] and new['memory']:
+            old_kb, new_kb = statistics.median(old['memory']), statistics.median(new['memory'])
+            row['memory'] = (old_kb, new_kb)
+            if new_kb - old_kb >= max(MIN_MEMORY_CHANGE_KB, old_kb * memory_threshold):
+                row['memory_verdict'] = 'MORE'
+            elif old_kb - new_kb >= max(MIN_MEMORY_CHANGE_KB, old_kb * memory_threshold):
+                row['memory_verdict'] = 'less'
+        row['regressed'] = row['verdict'] == 'SLOWER' or row['memory_verdict'] == 'MORE'
+        rows.append(row)
+    return rows
+
+
+def format_seconds(seconds):
+    if seconds >= 1:
+        return f"{seconds:.2f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} us"
+
+
+def describe(runs):
+    revisions = sorted({(r['environment'].get('git_commit') or 'unknown')[:10] for r in runs})
+    return f"{', '.join(revisions)} ({len(runs)} run{'s' if len(runs) != 1 else ''}: {', '.join(r['id'] for r in runs)})"
+
+
+def report(rows, baseline_runs, candidate_runs, alpha, threshold):
+    """The comparison as plain text."""
+    lines = [
+        "Benchmark comparison",
+        f"  baseline:  {describe(baseline_runs)}",
+        f"  candidate: {describe(candidate_runs)}",
+    ]
+    machines = {r.get('fingerprint') for r in baseline_runs + candidate_runs}
+    if len(machines) > 1:
+        lines.append("  warning: the runs come from different machines, so timings are not comparable")
+    lines.append(f"  slower = p < {alpha} and median at least {threshold:.0%} slower")
+    lines.append("")
+    width = max([len(r['name']) for r in rows] + [9])
+    lines.append(f"{'benchmark':<{width}}  {'baseline':>10}  {'candidate':>10}  {'change':>7}  {'p':>6}  verdict")
+    for r in rows:
+        line = (f"{r['name']:<{width}}  {format_seconds(r['baseline']):>10}  {format_seconds(r['candidate']):>10}"
+                f"  {r['change']:>+7.1%}  {r['p']:>6.3f}  {r['verdict']}")
+        if r['throughput']:
+            line += f"  ({r['throughput'][0]:.1f} -> {r['throughput'][1]:.1f} letters/s)"
+        lines.append(line.rstrip())
+    memory_rows = [r for r in rows if r['memory']]
+    if memory_rows:
+        lines += ["", f"{'peak memory':<{width}}  {'baseline':>10}  {'candidate':>10}  {'change':>7}  verdict"]
+        for r in memory_rows:
+            old_kb, new_kb = r['memory']
+            change = new_kb / old_kb - 1 if old_kb else 0.0
+            lines.append(f"{r['name']:<{width}}  {old_kb:>7.0f} KB  {new_kb:>7.0f} KB  {change:>+7.1%}"
+                         f"  {r['memory_verdict']}".rstrip())
+    regressed = [r['name'] for r in rows if r['regressed']]
+    lines.append("")
+    lines.append(f"{len(regressed)} regression{'s' if len(regressed) != 1 else ''}"
+                 + (f": {', '.join(regressed)}" if regressed else ""))
+    return '\n'.join(lines) + '\n'
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.compare",
+                                     description="Compare benchmark runs from the history.")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="history file (default: %(default)s)")
+    parser.add_argument('--baseline', default='previous',
+                        help="run id, git revision or 'previous', the run before the candidate (default: %(default)s)")
+    parser.add_argument('--candidate', default='latest', help="run id, git revision or 'latest' (default: %(default)s)")
+    parser.add_argument('--alpha', type=float, default=0.05, help="significance level (default: %(default)s)")
+    parser.add_argument('--threshold', type=float, default=0.05,
+                        help="smallest slowdown to flag, as a fraction (default: %(default)s)")
+    parser.add_argument('--memory-threshold', type=float, default=0.10,
+                        help="smallest peak memory increase to flag, as a fraction (default: %(default)s)")
+    parser.add_argument('--any-machine', action='store_true', help="also use runs from other machines")
+    parser.add_argument('--report', help="also write the report to this file")
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    runs = load_runs(args.history)
+    fingerprint = None if args.any_machine else machine_fingerprint()
+    candidate_runs = find_runs(runs, args.candidate, fingerprint)
+    if not candidate_runs:
+        parser.error(f"no runs match candidate '{args.candidate}' in {args.history}")
+    candidate_ids = {r['id'] for r in candidate_runs}
+    if args.baseline == 'previous':
+        machine_runs = [r for r in runs if fingerprint is None or r.get('fingerprint') == fingerprint]
+        baseline_runs = machine_runs[:machine_runs.index(candidate_runs[0])][-1:]
+    else:
+        baseline_runs = [r for r in find_runs(runs, args.baseline, fingerprint) if r['id'] not in candidate_ids]
+    if not baseline_runs:
+        parser.error(f"no runs match baseline '{args.baseline}' in {args.history}")
+    rows = compare(baseline_runs, candidate_runs, args.alpha, args.threshold, args.memory_threshold)
+    text = report(rows, baseline_runs, candidate_runs, args.alpha, args.threshold)
+    print(text, end='')
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            f.write(text)
+    return 1 if any(r['regressed'] for r in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""Synthetic inputs for benchmarks and load tests; no real NCRP data is used.
+
+Everything is drawn from ``random.Random(seed)``, so the same arguments
+always give the same sheet or list.
+
+    python -m benchmarks.fixtures bank --rows 5000 --banks 200 --skew 1.2 --output sheet.xlsx
+    python -m benchmarks.fixtures tsp --request-type "IMEI CDR" --count 500 --output imeis.txt
+    python -m benchmarks.fixtures inter --count 300 --output links.txt
+"""
+import argparse
+import random
+import sys
+from datetime import date, timedelta
+import pandas as pd
+from engine.bank import format_inr
+from engine.identifiers import VERHOEFF_D, VERHOEFF_P
+from engine.inter import PLATFORMS
+from engine.tsp import REQUEST_KINDS, REQUEST_TYPES
+
+# Column order of an NCRP export, after normalize_columns
+BANK_COLUMNS = ['account_no', 'ifsc_code', 'transaction_amount', 'date_from', 'date_to',
+                'transaction_id_/_utr_number2', 'bank/fis']
+
+START_DATE = date(2025, 1, 1)
+VERHOEFF_INV = [0, 4, 3, 2, 1, 5, 6, 7, 8, 9]
+
+
+def ifsc_code(rng, bank_index):
+    return f"B{bank_index:03d}".ljust(4, 'X')[:4] + '0' + f"{rng.randrange(10 ** 6):06d}"
+
+
+def bank_weights(banks, skew):
+    """Zipf-like share of rows per bank: 0 spreads rows evenly, larger values favour the first banks."""
+    return [1 / (i + 1) ** skew for i in range(banks)]
+
+
+def amount_text(rng, amount, dirty_ratio, blank_ratio):
+    """An amount cell: usually '₹1,23,456.00', sometimes written another way or left blank."""
+    roll = rng.random()
+    if roll < blank_ratio:
+        return rng.choice(['', None, ' '])
+    paise = rng.randrange(100) if rng.random() < 0.2 else 0
+    if roll < blank_ratio + dirty_ratio:
+        style = rng.randrange(4)
+        if style == 0:
+            return f"{amount}.{paise:02d}"
+        if style == 1:
+            return f"Rs. {format_inr(amount)[1:-2]}/-"
+        if style == 2:
+            return f"INR {amount:,}"
+        return float(amount)
+    return format_inr(amount).replace('/-', f".{paise:02d}")
+
+
+def bank_sheet(rows, banks=None, skew=0.0, duplicate_ratio=0.0, date_spread_days=180, max_range_days=30,
+               dirty_ratio=0.0, blank_ratio=0.0, seed=0):
+    """A bank sheet with the required columns.
+
+    ``rows`` transactions are spread over ``banks`` banks (default: one per
+    five rows) with ``skew`` as in bank_weights; every bank gets at least one
+    row. ``duplicate_ratio`` of the rows repeat an account already used for
+    the same bank, as repeated transfers to one account do. Transactions
+    start within ``date_spread_days`` of 1 Jan 2025 and last up to
+    ``max_range_days``. ``dirty_ratio`` of the amounts are written in other
+    styles (plain, 'Rs. ...', 'INR ...', floats) and ``blank_ratio`` left blank.
+    """
+    rng = random.Random(seed)
+    banks = banks or max(1, rows // 5)
+    if rows < banks:
+        raise ValueError(f"{rows} rows cannot cover {banks} banks")
+    bank_indexes = list(range(banks)) + rng.choices(range(banks), bank_weights(banks, skew), k=rows - banks)
+    rng.shuffle(bank_indexes)
+    bank_accounts = {}
+    records = []
+    for bank_index in bank_indexes:
+        used = bank_accounts.setdefault(bank_index, [])
+        if used and rng.random() < duplicate_ratio:
+            account, ifsc = rng.choice(used)
+        else:
+            account, ifsc = str(rng.randrange(10 ** 11, 10 ** 12)), ifsc_code(rng, bank_index)
+            used.append((account, ifsc))
+        day = START_DATE + timedelta(days=rng.randrange(max(1, date_spread_days)))
+        records.append((
+            account,
+            ifsc,
+            amount_text(rng, rng.randrange(100, 500000), dirty_ratio, blank_ratio),
+            day.strftime('%d-%m-%Y'),
+            (day + timedelta(days=rng.randrange(max(1, max_range_days)))).strftime('%d-%m-%Y'),
+            f"UTR{rng.randrange(10 ** 12):012d}",
+            f"Bank {bank_index + 1:04d}",
+        ))
+    return pd.DataFrame.from_records(records, columns=BANK_COLUMNS)
+
+
+def accounts(count, seed=0):
+    """Account dicts as build_bank_cases produces them."""
+    rng = random.Random(seed)
+    return [{'account_no': str(rng.randrange(10 ** 11, 10 ** 12)), 'ifsc_code': ifsc_code(rng, i % 50)}
+            for i in range(count)]
+
+
+def mobile_number(rng):
+    return str(rng.randrange(6, 10)) + f"{rng.randrange(10 ** 9):09d}"
+
+
+def imei_number(rng):
+    """15 digits with a valid Luhn check digit."""
+    body = [rng.randrange(10) for _ in range(14)]
+    total = 0
+    for i, digit in enumerate(reversed(body)):
+        if i % 2 == 0:
+            digit *= 2
+            digit -= 9 if digit > 9 else 0
+        total += digit
+    return ''.join(map(str, body)) + str(-total % 10)
+
+
+def aadhaar_number(rng):
+    """12 digits starting 2-9 with a valid Verhoeff check digit."""
+    body = [rng.randrange(2, 10)] + [rng.randrange(10) for _ in range(10)]
+    check = 0
+    for i, digit in enumerate(reversed(body)):
+        check = VERHOEFF_D[check, VERHOEFF_P[(i + 1) % 8, digit]]
+    return ''.join(map(str, body)) + str(VERHOEFF_INV[check])
+
+
+def pos_code(rng):
+    return f"POS{rng.randrange(10 ** 7):07d}"
+
+
+IDENTIFIERS = {
+    'mobile': mobile_number,
+    'imei': imei_number,
+    'aadhaar': aadhaar_number,
+    'pos': pos_code,
+}
+
+
+def messy(rng, value, kind):
+    """The same identifier as officers paste it: spaces, dashes, country codes."""
+    if kind == 'mobile':
+        return rng.choice([f"+91 {value[:5]} {value[5:]}", f"0{value}", f"91-{value}", f"{value[:5]}-{value[5:]}"])
+    if kind == 'pos':
+        return value.lower()
+    return ' '.join(value[i:i + 4] for i in range(0, len(value), 4))
+
+
+def identifier_list(generate, count, duplicate_ratio, seed):
+    rng = random.Random(seed)
+    values = []
+    for _ in range(count):
+        values.append(rng.choice(values) if values and rng.random() < duplicate_ratio else generate(rng))
+    return rng, values
+
+
+def tsp_identifiers(request_type, count, duplicate_ratio=0.0, dirty_ratio=0.0, invalid_ratio=0.0, seed=0):
+    """Identifiers for a TSP bulk request: valid numbers, some pasted messily, some invalid.
+
+    Invalid ones are one digit short (PoS codes get a stray '#'), or carry a
+    wrong check digit where the kind has one.
+    """
+    if request_type not in REQUEST_TYPES:
+        raise ValueError(f"Invalid request type: {request_type}")
+    kind = REQUEST_KINDS[request_type]
+    rng, values = identifier_list(IDENTIFIERS[kind], count, duplicate_ratio, seed)
+    for i, value in enumerate(values):
+        roll = rng.random()
+        if roll < invalid_ratio:
+            if kind in ('imei', 'aadhaar') and rng.random() < 0.5:
+                values[i] = value[:-1] + str((int(value[-1]) + 1) % 10)
+            elif kind == 'pos':
+                values[i] = value + '#'
+            else:
+                values[i] = value[:-1]
+        elif roll < invalid_ratio + dirty_ratio:
+            values[i] = messy(rng, value, kind)
+    return values
+
+
+def handle(rng):
+    return f"user_{rng.randrange(10 ** 6):06d}"
+
+
+def inter_identifier(rng, platform, dirty):
+    """One URL or ID for an intermediary letter; dirty ones carry tracking parameters and variant hosts."""
+    name = handle(rng)
+    if platform == "WhatsApp":
+        number = mobile_number(rng)
+        return rng.choice([f"+91 {number}", f"https://wa.me/91{number}"]) if dirty else number
+    if platform == "Google":
+        if rng.random() < 0.5:
+            return f"{name}@gmail.com"
+        return '-'.join(f"{rng.randrange(16 ** n):0{n}x}" for n in (8, 4, 4, 4, 12))
+    domain = {"Facebook": "facebook.com", "Instagram": "instagram.com", "Twitter": "x.com"}[platform]
+    if not dirty:
+        return f"https://{domain}/{name}"
+    variant = rng.choice([
+        f"https://m.{domain}/{name.upper()}/?utm_source=share",
+        f"www.{domain}/{name}?igshid={rng.randrange(10 ** 9)}",
+        f"@{name}",
+    ])
+    if variant.startswith('@'):
+        return {"Facebook": "fb:", "Instagram": "ig:", "Twitter": "tw:"}[platform] + variant
+    return variant
+
+
+def inter_identifiers(count, platforms=None, duplicate_ratio=0.0, dirty_ratio=0.0, seed=0):
+    """A mixed list of URLs and IDs across ``platforms`` (default: all), as pasted for Auto mode."""
+    platforms = platforms or PLATFORMS
+    for platform in platforms:
+        if platform not in PLATFORMS:
+            raise ValueError(f"Invalid platform: {platform}")
+
+    def generate(rng):
+        return inter_identifier(rng, rng.choice(platforms), rng.random() < dirty_ratio)
+    return identifier_list(generate, count, duplicate_ratio, seed)[1]
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.fixtures", description="Write synthetic inputs.")
+    sub = parser.add_subparsers(dest='kind', required=True)
+    bank = sub.add_parser('bank', help="bank sheet (.xlsx or .csv)")
+    bank.add_argument('--rows', type=int, default=1000)
+    bank.add_argument('--banks', type=int)
+    bank.add_argument('--skew', type=float, default=0.0)
+    bank.add_argument('--duplicate-ratio', type=float, default=0.0)
+    bank.add_argument('--date-spread-days', type=int, default=180)
+    bank.add_argument('--dirty-ratio', type=float, default=0.0)
+    bank.add_argument('--blank-ratio', type=float, default=0.0)
+    tsp = sub.add_parser('tsp', help="identifiers for a TSP bulk request, one per line")
+    tsp.add_argument('--request-type', choices=REQUEST_TYPES, default="CDR")
+    tsp.add_argument('--invalid-ratio', type=float, default=0.0)
+    inter = sub.add_parser('inter', help="URLs and IDs for intermediary letters, one per line")
+    inter.add_argument('--platform', action='append', choices=PLATFORMS, dest='platforms')
+    for p in (tsp, inter):
+        p.add_argument('--count', type=int, default=100)
+        p.add_argument('--duplicate-ratio', type=float, default=0.0)
+        p.add_argument('--dirty-ratio', type=float, default=0.0)
+    for p in (bank, tsp, inter):
+        p.add_argument('--seed', type=int, default=0)
+        p.add_argument('--output', required=True)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.kind == 'bank':
+        df = bank_sheet(args.rows, args.banks, args.skew, args.duplicate_ratio, args.date_spread_days,
+                        dirty_ratio=args.dirty_ratio, blank_ratio=args.blank_ratio, seed=args.seed)
+        if args.output.lower().endswith('.csv'):
+            df.to_csv(args.output, index=False)
+        else:
+            df.to_excel(args.output, index=False)
+        print(f"{len(df)} rows, {df['bank/fis'].nunique()} banks written to {args.output}")
+        return 0
+    if args.kind == 'tsp':
+        values = tsp_identifiers(args.request_type, args.count, args.duplicate_ratio, args.dirty_ratio,
+                                 args.invalid_ratio, args.seed)
+    else:
+        values = inter_identifiers(args.count, args.platforms, args.duplicate_ratio, args.dirty_ratio, args.seed)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(values) + '\n')
+    print(f"{len(values)} identifiers written to {args.output}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
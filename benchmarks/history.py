@@ -0,0 +1,63 @@
+"""Local history of benchmark runs.
+
+Every run of ``python -m benchmarks`` is appended as one JSON line to
+``benchmark_results/history.jsonl`` with its id, git revision and machine
+fingerprint, so later runs can be compared against it (see compare.py).
+"""
+import hashlib
+import json
+import os
+import platform
+from pathlib import Path
+
+DEFAULT_HISTORY = os.path.join(Path(__file__).parent.parent, 'benchmark_results', 'history.jsonl')
+
+
+def machine_fingerprint():
+    """Short hash of the host, CPU, OS and Python; runs are only comparable on the same one."""
+    parts = [platform.node(), platform.machine(), platform.processor(), platform.system(), platform.release(),
+             str(os.cpu_count()), platform.python_implementation(), '.'.join(platform.python_version_tuple()[:2])]
+    return hashlib.sha256('|'.join(parts).encode('utf-8')).hexdigest()[:12]
+
+
+def run_id(document):
+    return document['created'].replace(':', '').replace('-', '')
+
+
+def append_run(document, path=DEFAULT_HISTORY):
+    """Add a results document to the history and return its id."""
+    record = dict(document, id=run_id(document), fingerprint=machine_fingerprint())
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record) + '\n')
+    return record['id']
+
+
+def load_runs(path=DEFAULT_HISTORY):
+    """All runs in the history, oldest first; unreadable lines are skipped."""
+    if not os.path.exists(path):
+        return []
+    runs = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                runs.append(json.loads(line))
+            except ValueError:
+                continue
+    return runs
+
+
+def find_runs(runs, ref, fingerprint=None):
+    """Runs matching ``ref``: a run id, or a git revision (prefix) whose runs are pooled.
+
+    ``latest`` is the newest run. With a ``fingerprint`` only runs from that
+    machine are considered.
+    """
+    if fingerprint:
+        runs = [r for r in runs if r.get('fingerprint') == fingerprint]
+    if ref == 'latest':
+        return runs[-1:]
+    by_id = [r for r in runs if r.get('id') == ref]
+    if by_id:
+        return by_id
+    return [r for r in runs if (r['environment'].get('git_commit') or '').startswith(ref)]
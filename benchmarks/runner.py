@@ -0,0 +1,189 @@
+"""Standalone benchmark runner.
+
+    python -m benchmarks                       # everything, results in benchmark_results/
+    python -m benchmarks --quick --filter batch
+    python -m benchmarks --list
+
+Runs offline against a scratch copy of the database and writes one JSON
+file with the environment and, per benchmark, the round times (min, median,
+mean, stdev), the peak Python memory of one extra round and any extra
+figures such as letters per second.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from importlib import metadata
+from pathlib import Path
+from db.database import DB_PATH_ENV, create_database
+from engine.templates import default_template_dir
+from .cases import BENCHMARKS
+from .history import DEFAULT_HISTORY, append_run, machine_fingerprint
+
+ROOT = Path(__file__).parent.parent
+DEFAULT_OUTPUT_DIR = os.path.join(ROOT, 'benchmark_results')
+PACKAGES = ('python-docx', 'lxml', 'pandas', 'numpy', 'openpyxl', 'reportlab')
+
+
+def git_revision():
+    """(commit, dirty) of the working tree, or (None, None) outside a git checkout."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                                timeout=10).stdout.strip()
+        status = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=ROOT,
+                                capture_output=True, text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None, None
+    return commit or None, bool(status) if commit else None
+
+
+def environment():
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    commit, dirty = git_revision()
+    return {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+        'cpu_count': os.cpu_count(),
+        'git_commit': commit,
+        'git_dirty': dirty,
+        'fingerprint': machine_fingerprint(),
+        'packages': versions,
+    }
+
+
+def measure(setup, run, rounds, memory=True):
+    """Time ``rounds`` calls of run(setup()); returns the summary dict."""
+    times, extra = [], {}
+    for _ in range(rounds):
+        inputs = setup()
+        start = time.perf_counter()
+        extra = run(inputs) or {}
+        times.append(time.perf_counter() - start)
+    result = {
+        'rounds': rounds,
+        'min': min(times),
+        'max': max(times),
+        'mean': statistics.fmean(times),
+        'median': statistics.median(times),
+        'stdev': statistics.stdev(times) if rounds > 1 else 0.0,
+        'times': times,
+        'peak_memory_kb': None,
+    }
+    if memory:
+        # A separate round: tracing slows the code down too much to time it
+        inputs = setup()
+        tracemalloc.start()
+        try:
+            run(inputs)
+            result['peak_memory_kb'] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+        finally:
+            tracemalloc.stop()
+    if 'letters' in extra:
+        result['letters_per_second'] = extra['letters'] / result['median'] if result['median'] else None
+    if 'identifiers' in extra:
+        result['identifiers_per_second'] = extra['identifiers'] / result['median'] if result['median'] else None
+    result.update(extra)
+    return result
+
+
+def selected(name_filter=None, quick=False):
+    """(name, function, params, rounds) for every benchmark to run."""
+    for name, function, param_sets, rounds, slow in BENCHMARKS:
+        if name_filter and name_filter not in name:
+            continue
+        for params in param_sets:
+            if quick and params in slow:
+                continue
+            yield name, function, params, rounds
+
+
+def label(name, params):
+    if not params:
+        return name
+    return f"{name}[{','.join(f'{k}={v}' for k, v in params.items())}]"
+
+
+def run_benchmarks(name_filter=None, quick=False, rounds=None, memory=True, template_dir=None, echo=print):
+    """Run the selected benchmarks in a scratch workspace and return the results document."""
+    workspace_path = tempfile.mkdtemp(prefix='letter_bench_')
+    workspace = {'path': workspace_path, 'template_dir': template_dir or default_template_dir()}
+    previous_db = os.environ.get(DB_PATH_ENV)
+    scratch_db = os.path.join(workspace_path, 'letter_requests.db')
+    bundled_db = os.path.join(ROOT, 'db', 'letter_requests.db')
+    if os.path.exists(bundled_db):
+        shutil.copyfile(bundled_db, scratch_db)
+    os.environ[DB_PATH_ENV] = scratch_db
+    results = []
+    try:
+        create_database()
+        for name, function, params, default_rounds in selected(name_filter, quick):
+            setup, run = function(workspace, **params)
+            summary = measure(setup, run, rounds or default_rounds, memory)
+            results.append(dict({'name': name, 'params': params}, **summary))
+            echo(f"{label(name, params):<55} median {summary['median'] * 1000:10.3f} ms"
+                 f"  stdev {summary['stdev'] * 1000:9.3f} ms"
+                 + (f"  {summary['letters_per_second']:.1f} letters/s" if summary.get('letters_per_second') else '')
+                 + (f"  {summary['identifiers_per_second'] / 1e6:.2f}M identifiers/s"
+                    if summary.get('identifiers_per_second') else ''))
+    finally:
+        if previous_db is None:
+            os.environ.pop(DB_PATH_ENV, None)
+        else:
+            os.environ[DB_PATH_ENV] = previous_db
+        shutil.rmtree(workspace_path, ignore_errors=True)
+    return {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'quick': quick,
+        'environment': environment(),
+        'benchmarks': results,
+    }
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmark the letter pipeline.")
+    parser.add_argument('--filter', help="only benchmarks whose name contains this text")
+    parser.add_argument('--quick', action='store_true', help="skip the largest sizes")
+    parser.add_argument('--rounds', type=int, help="timed rounds per benchmark (default: per benchmark)")
+    parser.add_argument('--no-memory', action='store_true', help="skip the peak memory round")
+    parser.add_argument('--template-dir', help="root folder with banks/, tsp/ and inter/ (default: config.json)")
+    parser.add_argument('--output', help="JSON file to write (default: benchmark_results/<timestamp>.json)")
+    parser.add_argument('--history', default=DEFAULT_HISTORY, help="history file to append to (default: %(default)s)")
+    parser.add_argument('--no-history', action='store_true', help="do not add this run to the history")
+    parser.add_argument('--list', action='store_true', help="list the benchmarks and exit")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.list:
+        for name, function, params, rounds in selected(args.filter, args.quick):
+            print(label(name, params))
+        return 0
+    # The code under test logs every letter; keep that out of the timings
+    logging.disable(logging.CRITICAL)
+    document = run_benchmarks(args.filter, args.quick, args.rounds, not args.no_memory, args.template_dir)
+    output = args.output or os.path.join(DEFAULT_OUTPUT_DIR, f"{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(document, f, indent=2)
+    print(f"Results written to {output}", file=sys.stderr)
+    if not args.no_history:
+        print(f"Added run {append_run(document, args.history)} to {args.history}", file=sys.stderr)
+    return 0
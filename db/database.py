@@ -2,18 +2,41 @@ import sqlite3
 import os
 import sys
 import shutil
+import contextlib
+import functools
 from pathlib import Path
 import logging
 import bcrypt
 
-# Set up logging
-log_dir = os.path.join(Path.home(), 'Documents', 'LetterGeneratorLogs')
-os.makedirs(log_dir, exist_ok=True)
-logging.basicConfig(
-    filename=os.path.join(log_dir, 'database.log'),
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = logging.getLogger(__name__)
+
+# Environment variable that points connect_db at another database file
+DB_PATH_ENV = 'LETTER_DB_PATH'
+
+# Context manager factories entered around each instrumented call with the
+# operation's name; the engine adds its latency metric and stage timer here.
+_call_hooks = []
+
+
+def add_call_hook(hook):
+    """Run every instrumented database call inside ``hook(operation)``."""
+    _call_hooks.append(hook)
+
+
+def instrumented(operation):
+    """Decorator running a database call inside the registered call hooks."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if not _call_hooks:
+                return function(*args, **kwargs)
+            with contextlib.ExitStack() as stack:
+                for hook in _call_hooks:
+                    stack.enter_context(hook(operation))
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
 
 def connect_db():
     """Connect to the SQLite database with proper error handling."""
@@ -22,7 +45,10 @@ def connect_db():
         user_db_dir = os.path.join(Path.home(), 'Documents', 'LetterGeneratorData')
         user_db_path = os.path.join(user_db_dir, 'letter_requests.db')
         
-        if getattr(sys, 'frozen', False):
+        if os.environ.get(DB_PATH_ENV):
+            # Explicit database, e.g. a scratch copy for benchmarks
+            user_db_path = os.environ[DB_PATH_ENV]
+        elif getattr(sys, 'frozen', False):
             # Running as executable
             base_path = sys._MEIPASS
             bundled_db_path = os.path.join(base_path, 'db', 'letter_requests.db')
@@ -31,14 +57,14 @@ def connect_db():
                 os.makedirs(user_db_dir, exist_ok=True)
                 if os.path.exists(bundled_db_path):
                     shutil.copyfile(bundled_db_path, user_db_path)
-                    logging.debug(f"Copied database from {bundled_db_path} to {user_db_path}")
+                    logger.debug("Copied database from %s to %s", bundled_db_path, user_db_path)
                 else:
-                    logging.error(f"Bundled database not found: {bundled_db_path}")
+                    logger.error("Bundled database not found: %s", bundled_db_path)
                     return None
         else:
             # Running in development
             user_db_path = os.path.join(Path(__file__).parent.parent, 'db', 'letter_requests.db')
-            logging.debug(f"Using development database path: {user_db_path}")
+            logger.debug("Using development database path: %s", user_db_path)
         
         # Ensure the database directory exists
         os.makedirs(os.path.dirname(user_db_path), exist_ok=True)
@@ -49,7 +75,7 @@ def connect_db():
         cursor = conn.cursor()
         cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='Officers'")
         if not cursor.fetchone():
-            logging.warning("Officers table not found, creating it")
+            logger.warning("Officers table not found, creating it")
             cursor.execute("""
                 CREATE TABLE Officers (
                     Id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -69,16 +95,16 @@ def connect_db():
                 ('admin', hashed_pw, 'Administrator', 'Admin', '0000000000', 'admin@example.com')
             )
             conn.commit()
-            logging.debug("Created default admin user")
+            logger.debug("Created default admin user")
         cursor.execute("SELECT COUNT(*) FROM Officers")
         count = cursor.fetchone()[0]
-        logging.debug(f"Officers table contains {count} records")
+        logger.debug("Officers table contains %s records", count)
         return conn
     except sqlite3.Error as e:
-        logging.error(f"Database connection error: {e}")
+        logger.error("Database connection error: %s", e)
         return None
     except Exception as e:
-        logging.error(f"Unexpected error: {e}")
+        logger.error("Unexpected error: %s", e)
         return None
 
 def create_database():
@@ -87,7 +113,7 @@ def create_database():
     try:
         conn = connect_db()
         if not conn:
-            logging.error("Failed to connect to database for table creation")
+            logger.error("Failed to connect to database for table creation")
             return
         
         cursor = conn.cursor()
@@ -102,6 +128,45 @@ def create_database():
             )
         """)
         
+        # Create Letters table (one row per generated letter)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS Letters (
+                Id INTEGER PRIMARY KEY AUTOINCREMENT,
+                CaseId INTEGER NOT NULL,
+                OfficerId INTEGER,
+                LetterType TEXT NOT NULL,
+                Recipient TEXT,
+                OutputPath TEXT NOT NULL,
+                CreatedAt TEXT DEFAULT (datetime('now')),
+                InputHash TEXT,
+                FOREIGN KEY (CaseId) REFERENCES Cases(Id)
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_letters_case ON Letters(CaseId)")
+        # Databases created before input hashes were stored
+        if 'InputHash' not in [row[1] for row in cursor.execute("PRAGMA table_info(Letters)")]:
+            cursor.execute("ALTER TABLE Letters ADD COLUMN InputHash TEXT")
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_letters_output ON Letters(OutputPath)")
+
+        # Create BatchErrors table (one row per problem in a generation batch)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS BatchErrors (
+                Id INTEGER PRIMARY KEY AUTOINCREMENT,
+                BatchId TEXT NOT NULL,
+                CrimeNumber TEXT,
+                NCRP_ID TEXT,
+                OfficerId INTEGER,
+                LetterType TEXT NOT NULL,
+                SourcePath TEXT,
+                GroupKey TEXT,
+                Stage TEXT,
+                ErrorClass TEXT,
+                Message TEXT NOT NULL,
+                CreatedAt TEXT DEFAULT (datetime('now'))
+            )
+        """)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_batch_errors_batch ON BatchErrors(BatchId)")
+
         # Create OTPs table
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS OTPs (
@@ -114,21 +179,22 @@ def create_database():
         """)
         
         conn.commit()
-        logging.debug("Database tables created successfully")
+        logger.debug("Database tables created successfully")
         
     except sqlite3.Error as e:
-        logging.error(f"Error creating database: {e}")
+        logger.error("Error creating database: %s", e)
     finally:
         if conn:
             conn.close()
 
+@instrumented('save_case')
 def save_case(case, officer_id, letter_type):
     """Save case data to database."""
     conn = None
     try:
         conn = connect_db()
         if not conn:
-            logging.error("Database connection failed")
+            logger.error("Database connection failed")
             return "Database connection failed"
         
         cursor = conn.cursor()
@@ -146,19 +212,171 @@ def save_case(case, officer_id, letter_type):
             case_id = cursor.lastrowid
         
         conn.commit()
-        logging.debug(f"Saved case ID {case_id} for CrimeNumber {case['CrimeNumber']}")
+        logger.debug("Saved case ID %s for CrimeNumber %s", case_id, case['CrimeNumber'])
         return None
         
     except sqlite3.Error as e:
-        logging.error(f"Database error: {str(e)}")
+        logger.error("Database error: %s", e)
         return f"Database error: {str(e)}"
     except Exception as e:
-        logging.error(f"Unexpected error: {str(e)}")
+        logger.error("Unexpected error: %s", e)
         return f"Unexpected error: {str(e)}"
     finally:
         if conn:
             conn.close()
 
+@instrumented('record_letter')
+def record_letter(case, officer_id, letter_type, recipient, output_path, input_hash=None):
+    """Record a generated letter against its case, with the hash of its inputs (see engine.incremental)."""
+    conn = None
+    try:
+        conn = connect_db()
+        if not conn:
+            logger.error("Database connection failed")
+            return "Database connection failed"
+
+        cursor = conn.cursor()
+        cursor.execute("SELECT Id FROM Cases WHERE CrimeNumber = ? AND NCRP_ID = ?",
+                      (case.get('CrimeNumber', ''), case.get('NCRP_ID', '')))
+        case_row = cursor.fetchone()
+        if not case_row:
+            logger.error("No case found for CrimeNumber %s", case.get('CrimeNumber', ''))
+            return "Case not found"
+
+        cursor.execute(
+            "INSERT INTO Letters (CaseId, OfficerId, LetterType, Recipient, OutputPath, InputHash) VALUES (?, ?, ?, ?, ?, ?)",
+            (case_row[0], officer_id, letter_type, recipient, output_path, input_hash)
+        )
+        conn.commit()
+        logger.debug("Recorded %s letter for case ID %s: %s", letter_type, case_row[0], output_path)
+        return None
+
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", e)
+        return f"Database error: {str(e)}"
+    finally:
+        if conn:
+            conn.close()
+
+@instrumented('letter_input_hashes')
+def letter_input_hashes(output_paths, chunk_size=500):
+    """{output path: input hash} of the latest letter recorded at each path."""
+    conn = None
+    hashes = {}
+    try:
+        conn = connect_db()
+        if not conn:
+            logger.error("Database connection failed")
+            return hashes
+        paths = list(dict.fromkeys(path for path in output_paths if path))
+        for start in range(0, len(paths), chunk_size):
+            chunk = paths[start:start + chunk_size]
+            rows = conn.execute(
+                f"SELECT OutputPath, InputHash FROM Letters WHERE OutputPath IN ({', '.join('?' * len(chunk))}) "
+                "ORDER BY Id", chunk
+            )
+            hashes.update(rows)
+        return hashes
+    except sqlite3.Error as e:
+        logger.error("Error reading letter input hashes: %s", e)
+        return hashes
+    finally:
+        if conn:
+            conn.close()
+
+def letter_input_hash(output_path):
+    """Input hash of the latest letter recorded at ``output_path``, or None."""
+    return letter_input_hashes([output_path]).get(output_path)
+
+@instrumented('record_batch_errors')
+def record_batch_errors(batch_id, case, officer_id, letter_type, errors, source_path=None):
+    """Store the errors of one batch in a single transaction.
+
+    BatchIssues keep their group, stage and error class; plain strings are
+    stored with the message only. Returns an error message or None.
+    """
+    conn = None
+    try:
+        conn = connect_db()
+        if not conn:
+            logger.error("Database connection failed")
+            return "Database connection failed"
+        rows = [
+            (batch_id, case.get('CrimeNumber', ''), case.get('NCRP_ID', ''), officer_id, letter_type, source_path,
+             getattr(error, 'group', ''), getattr(error, 'stage', ''), getattr(error, 'error_class', ''), str(error))
+            for error in errors
+        ]
+        with conn:
+            conn.executemany(
+                "INSERT INTO BatchErrors (BatchId, CrimeNumber, NCRP_ID, OfficerId, LetterType, SourcePath, "
+                "GroupKey, Stage, ErrorClass, Message) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows
+            )
+        logger.debug("Recorded %s errors for batch %s", len(rows), batch_id)
+        return None
+    except sqlite3.Error as e:
+        logger.error("Database error: %s", e)
+        return f"Database error: {str(e)}"
+    finally:
+        if conn:
+            conn.close()
+
+def failed_groups(batch_id):
+    """The case, letter type, source file and failed groups of a batch, or None if it has no errors.
+
+    Groups are listed once each, in the order they first failed; groups with
+    only warnings still got their letter and are left out.
+    """
+    conn = None
+    try:
+        conn = connect_db()
+        if not conn:
+            logger.error("Database connection failed")
+            return None
+        rows = conn.execute(
+            "SELECT CrimeNumber, NCRP_ID, LetterType, SourcePath, GroupKey, Stage FROM BatchErrors "
+            "WHERE BatchId = ? ORDER BY Id", (batch_id,)
+        ).fetchall()
+        if not rows:
+            return None
+        return {
+            'CrimeNumber': rows[0][0], 'NCRP_ID': rows[0][1], 'LetterType': rows[0][2], 'SourcePath': rows[0][3],
+            'Groups': list(dict.fromkeys(row[4] for row in rows if row[4] and row[5] != 'warning'))
+        }
+    except sqlite3.Error as e:
+        logger.error("Error reading errors of batch %s: %s", batch_id, e)
+        return None
+    finally:
+        if conn:
+            conn.close()
+
+@instrumented('fetch_officer')
+def fetch_officer(officer_id):
+    """Return the officer's profile as a dict, or None if not found."""
+    conn = None
+    try:
+        conn = connect_db()
+        if not conn:
+            logger.error("Database connection failed")
+            return None
+        cursor = conn.cursor()
+        cursor.execute(
+            "SELECT Id, Username, OfficerName, Designation, Phone, Email FROM Officers WHERE Id = ?",
+            (officer_id,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            return None
+        return {
+            'Id': row[0], 'Username': row[1], 'OfficerName': row[2],
+            'Designation': row[3], 'Phone': row[4], 'Email': row[5]
+        }
+    except sqlite3.Error as e:
+        logger.error("Error fetching officer %s: %s", officer_id, e)
+        return None
+    finally:
+        if conn:
+            conn.close()
+
 def create_default_admin():
     """Create default admin user."""
     # Moved to connect_db to ensure creation when Officers table is created
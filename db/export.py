@@ -0,0 +1,135 @@
+import csv
+import logging
+from db.database import connect_db
+
+try:
+    import xlsxwriter
+    XLSXWRITER_AVAILABLE = True
+except ImportError:
+    XLSXWRITER_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1000
+
+# Each dataset: (headers, base query, date column, officer filter).
+# The officer filter is a SQL fragment taking a single officer id parameter.
+DATASETS = {
+    'Officers': (
+        ["Id", "Username", "OfficerName", "Designation", "Phone", "Email"],
+        "SELECT Id, Username, OfficerName, Designation, Phone, Email FROM Officers",
+        None,
+        "Id = ?",
+    ),
+    'Cases': (
+        ["Id", "CrimeNumber", "NCRP_ID", "CreatedAt"],
+        "SELECT Id, CrimeNumber, NCRP_ID, CreatedAt FROM Cases",
+        "CreatedAt",
+        "Id IN (SELECT CaseId FROM Letters WHERE OfficerId = ?)",
+    ),
+    'Letters': (
+        ["Id", "CrimeNumber", "NCRP_ID", "LetterType", "Recipient", "OfficerId", "OfficerName", "OutputPath", "CreatedAt"],
+        "SELECT L.Id, C.CrimeNumber, C.NCRP_ID, L.LetterType, L.Recipient, L.OfficerId, O.OfficerName, "
+        "L.OutputPath, L.CreatedAt FROM Letters L JOIN Cases C ON C.Id = L.CaseId "
+        "LEFT JOIN Officers O ON O.Id = L.OfficerId",
+        "L.CreatedAt",
+        "L.OfficerId = ?",
+    ),
+    'BatchErrors': (
+        ["Id", "BatchId", "CrimeNumber", "NCRP_ID", "LetterType", "GroupKey", "Stage", "ErrorClass", "Message",
+         "OfficerId", "SourcePath", "CreatedAt"],
+        "SELECT Id, BatchId, CrimeNumber, NCRP_ID, LetterType, GroupKey, Stage, ErrorClass, Message, "
+        "OfficerId, SourcePath, CreatedAt FROM BatchErrors",
+        "CreatedAt",
+        "OfficerId = ?",
+    ),
+}
+
+
+def build_query(dataset, date_from=None, date_to=None, officer_id=None, where='', where_params=()):
+    """Return (headers, sql, params) for a dataset with the given filters.
+
+    Dates are 'YYYY-MM-DD' strings compared against the date part of CreatedAt.
+    Datasets without a date column ignore the date filters. ``where`` is an
+    extra SQL condition with ``where_params``, e.g. a viewer's current filter.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Unknown dataset: {dataset}")
+    headers, sql, date_column, officer_filter = DATASETS[dataset]
+    clauses = []
+    params = []
+    if date_column and date_from:
+        clauses.append(f"date({date_column}) >= date(?)")
+        params.append(date_from)
+    if date_column and date_to:
+        clauses.append(f"date({date_column}) <= date(?)")
+        params.append(date_to)
+    if officer_id is not None:
+        clauses.append(officer_filter)
+        params.append(officer_id)
+    if where:
+        clauses.append(f"({where})")
+        params.extend(where_params)
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY 1"
+    return headers, sql, params
+
+
+def _write_csv(cursor, headers, file_path, chunk_size):
+    count = 0
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(headers)
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def _write_xlsx(cursor, headers, file_path, chunk_size, sheet_name):
+    if not XLSXWRITER_AVAILABLE:
+        raise ImportError("xlsxwriter is required for Excel export (pip install xlsxwriter)")
+    # constant_memory flushes each row to disk once the next row is started
+    workbook = xlsxwriter.Workbook(file_path, {'constant_memory': True})
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+        bold = workbook.add_format({'bold': True})
+        worksheet.write_row(0, 0, headers, bold)
+        count = 0
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            for row in rows:
+                count += 1
+                worksheet.write_row(count, 0, row)
+    finally:
+        workbook.close()
+    return count
+
+
+def export_dataset(dataset, file_path, date_from=None, date_to=None, officer_id=None, chunk_size=CHUNK_SIZE,
+                   where='', where_params=()):
+    """Stream a dataset from SQLite straight to a .csv or .xlsx file.
+
+    Rows are pulled from the cursor in chunks of ``chunk_size`` so memory use
+    does not grow with the table. Returns the number of rows written.
+    """
+    headers, sql, params = build_query(dataset, date_from, date_to, officer_id, where, where_params)
+    conn = connect_db()
+    if not conn:
+        raise ConnectionError("Failed to connect to database")
+    try:
+        cursor = conn.execute(sql, params)
+        if file_path.lower().endswith('.xlsx'):
+            count = _write_xlsx(cursor, headers, file_path, chunk_size, dataset)
+        else:
+            count = _write_csv(cursor, headers, file_path, chunk_size)
+        logger.debug("Exported %s %s rows to %s", count, dataset, file_path)
+        return count
+    finally:
+        conn.close()
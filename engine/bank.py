@@ -0,0 +1,141 @@
+import re
+from datetime import datetime
+import pandas as pd
+from db.database import validate_case
+from .errors import BatchIssue, InputDataError
+from .identifiers import OK, normalize_identifiers
+from .timing import timed
+
+REQUIRED_COLUMNS = {
+    'account_no', 'ifsc_code', 'transaction_amount', 'date_from',
+    'date_to', 'transaction_id_/_utr_number2', 'bank/fis'
+}
+
+MAX_LETTERS = 200
+
+
+def format_inr(amount):
+    """Format an amount in Indian digit grouping, e.g. ₹1,23,456/-."""
+    try:
+        amount = float(re.sub(r'[^\d.]', '', str(amount)))
+    except ValueError:
+        return str(amount)
+    s = f"{amount:,.2f}"
+    s = s.split('.')
+    x = s[0]
+    if len(x) > 3:
+        x = x[:-3].replace(',', '')[::-1]
+        x = ','.join([x[i:i+2] for i in range(0, len(x), 2)])[::-1] + ',' + s[0][-3:]
+    else:
+        x = s[0]
+    return f"₹{x}/-"
+
+
+def clean_account_number(x):
+    """Render account numbers read as floats (1234.0) without the decimal part."""
+    try:
+        if isinstance(x, float) and x.is_integer():
+            return str(int(x))
+        if isinstance(x, str) and x.replace('.', '', 1).isdigit():
+            f = float(x)
+            if f.is_integer():
+                return str(int(f))
+            return str(f)
+        return str(x)
+    except Exception:
+        return str(x)
+
+
+def parse_amount(x):
+    """Parse '₹1,23,456.00' style amounts; blanks count as zero."""
+    if pd.isnull(x):
+        return 0
+    digits = re.sub(r'[^\d.]', '', str(x))
+    return float(digits) if digits else 0
+
+
+def normalize_columns(df):
+    df.columns = [str(col).strip().lower().replace(' ', '_') for col in df.columns]
+    return df
+
+
+@timed('read_excel')
+def read_bank_sheet(path):
+    """Read the first sheet of an NCRP export and check its columns.
+
+    Raises InputDataError when the file cannot be read, the sheet is empty
+    or required columns are missing.
+    """
+    try:
+        df = normalize_columns(pd.read_excel(path, sheet_name=0))
+    except FileNotFoundError:
+        raise InputDataError("Excel file not found")
+    except pd.errors.EmptyDataError:
+        raise InputDataError("Excel file is empty or corrupted")
+    except Exception as e:
+        raise InputDataError(f"Failed to read Excel file: {e}")
+    if df.empty:
+        raise InputDataError("The Excel sheet is empty")
+    missing_columns = REQUIRED_COLUMNS - set(df.columns)
+    if missing_columns:
+        raise InputDataError(f"Missing required columns: {', '.join(sorted(missing_columns))}")
+    return df
+
+
+def _format_date(value):
+    if pd.isnull(value):
+        return 'N/A'
+    return value.strftime('%d-%m-%Y')
+
+
+@timed('group_cases')
+def build_bank_cases(df, crime_number, ncrp_id, max_letters=MAX_LETTERS):
+    """Group a bank sheet into one case per bank.
+
+    Account numbers are normalized (spaces, dashes and spreadsheet '.0'
+    removed) before de-duplication. Returns (cases, errors) where cases is a
+    list of (bank_name, case) and errors are the validation messages for
+    skipped banks and rows, as BatchIssues.
+    """
+    df = df.copy()
+    normalized, codes = normalize_identifiers(df['account_no'].tolist(), 'account')
+    df['account_no'] = normalized
+    df['ifsc_code'] = df['ifsc_code'].fillna('').astype(str).str.strip().str.upper()
+    account_ok = pd.Series(codes == OK, index=df.index)
+    total_amount = df['transaction_amount'].apply(parse_amount).sum()
+    date_from = pd.to_datetime(df['date_from'], errors='coerce', dayfirst=True)
+    date_to = pd.to_datetime(df['date_to'], errors='coerce', dayfirst=True)
+    request_date = datetime.now().strftime("%d-%m-%Y")
+    cases = []
+    errors = []
+    for bank_name, group in df.groupby('bank/fis'):
+        skipped = int((~account_ok[group.index]).sum())
+        if skipped:
+            group = group[account_ok[group.index]]
+            # Only a bank left without rows has failed; otherwise its letter is still written
+            errors.append(BatchIssue(f"Bank {bank_name}: skipped {skipped} rows with an invalid account number",
+                                     bank_name, 'validate' if group.empty else 'warning', 'InputDataError'))
+            if group.empty:
+                continue
+        unique_accounts = group[['account_no', 'ifsc_code']].drop_duplicates(subset=['account_no'])
+        case = {
+            'CrimeNumber': crime_number,
+            'NCRP_ID': ncrp_id,
+            'Total_Amount': format_inr(total_amount),
+            'Bank': str(bank_name).strip() or 'Unknown Bank',
+            'RequestDate': request_date,
+            'RecipientName': 'Nodal Officer',
+            'Address': 'N/A',
+            'Date_From': _format_date(date_from[group.index].min()),
+            'Date_To': _format_date(date_to[group.index].max()),
+            'Accounts': unique_accounts.to_dict('records')
+        }
+        validation_errors = validate_case(case)
+        if validation_errors:
+            errors.append(BatchIssue(f"Bank {bank_name}: Validation warnings - {'; '.join(validation_errors)}",
+                                     bank_name, 'validate', 'InvalidRequestError'))
+            continue
+        cases.append((bank_name, case))
+        if len(cases) >= max_letters:
+            break
+    return cases, errors
@@ -0,0 +1,196 @@
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from . import incremental, logs, metrics
+from .bank import build_bank_cases, read_bank_sheet
+from .errors import EngineError
+from .render import render
+from .msisdn import load_index
+from .timing import StageTimer, active_timer
+from .tsp import build_tsp_import_cases, has_auto_tsp, read_tsp_sheet
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_ROOT = os.path.join(Path.home(), 'Documents', 'GeneratedLetters')
+OUTPUT_SUBDIRS = {'Bank': 'bank', 'TSP': 'tsp', 'Intermediary': 'inter'}
+
+
+def default_output_dir(letter_type):
+    return os.path.join(OUTPUT_ROOT, OUTPUT_SUBDIRS[letter_type])
+
+
+def make_job(letter_type, case, officer, template_dir, output_path, recipient=None):
+    """A picklable unit of work for render_job."""
+    return {
+        'letter_type': letter_type,
+        'case': case,
+        'officer': officer,
+        'template_dir': template_dir,
+        'output_path': output_path,
+        'recipient': recipient or 'N/A',
+    }
+
+
+def bank_jobs(excel_path, crime_number, ncrp_id, officer, template_dir, output_dir=None):
+    """Read a bank sheet and return (jobs, errors), one job per bank."""
+    output_dir = output_dir or default_output_dir('Bank')
+    df = read_bank_sheet(excel_path)
+    cases, errors = build_bank_cases(df, crime_number, ncrp_id)
+    jobs = []
+    for index, (bank_name, case) in enumerate(cases, start=1):
+        jobs.append(make_job('Bank', case, officer, template_dir, bank_output_path(case, index, output_dir),
+                             recipient=case['Bank']))
+    return jobs, errors
+
+
+def bank_output_path(case, index, output_dir=None):
+    """Output path of a bank letter; ``index`` is the bank's 1-based position in the sheet."""
+    output_dir = output_dir or default_output_dir('Bank')
+    return os.path.join(output_dir, f"Notice_{case['Bank'].replace(' ', '_')}_{index}.docx")
+
+
+def tsp_output_path(case, output_dir=None):
+    output_dir = output_dir or default_output_dir('TSP')
+    return os.path.join(output_dir, f"Notice_{case['TSP'].replace(' ', '_')}_{case['Request_Type'].replace(' ', '_')}.docx")
+
+
+def inter_output_path(case, output_dir=None):
+    output_dir = output_dir or default_output_dir('Intermediary')
+    name = case['Platform']
+    if name == "Google" and case.get('GoogleIdType', "Gmail ID") != "Gmail ID":
+        name = f"{name}_{case['GoogleIdType']}"
+    return os.path.join(output_dir, f"Notice_{name.replace(' ', '_')}.docx")
+
+
+def with_output_format(jobs, output_format):
+    """Switch jobs to 'docx' or 'pdf' output, renaming their output files to match."""
+    for job in jobs:
+        job['output_format'] = output_format
+        if job['output_path']:
+            job['output_path'] = f"{os.path.splitext(job['output_path'])[0]}.{output_format}"
+    return jobs
+
+
+def render_job(job):
+    """Render and save one letter; never raises so pool workers always report back.
+
+    ``stages`` in the result holds the letter's stage times (see engine.timing).
+    """
+    start = time.perf_counter()
+    result = {
+        'letter_type': job['letter_type'],
+        'recipient': job['recipient'],
+        'output_path': job['output_path'],
+        'status': 'ok',
+        'error': None,
+    }
+    if job.get('bundle_name'):
+        result['bundle_name'] = job['bundle_name']
+    if job.get('input_hash'):
+        result['input_hash'] = job['input_hash']
+    timer = StageTimer(job['recipient'])
+    with logs.log_context(**dict(job.get('log_context', {}), recipient=job['recipient'])):
+        try:
+            with timer:
+                data = render(job['letter_type'], job['case'], job['officer'], job['template_dir'],
+                              job['output_path'], job.get('output_format'))
+            if not job['output_path']:
+                # No path: the document bytes go back to the caller, e.g. for a ZIP bundle
+                result['data'] = data
+        except EngineError as e:
+            result['status'] = 'failed'
+            result['error'] = f"{type(e).__name__}: {e}"
+            logger.error("Failed to generate letter for %s: %s", job['recipient'], e)
+    result['elapsed'] = round(time.perf_counter() - start, 4)
+    result['stages'] = timer.as_dict()
+    return result
+
+
+def reused_result(job):
+    """The result of a job whose output file is already current."""
+    return {
+        'letter_type': job['letter_type'],
+        'recipient': job['recipient'],
+        'output_path': job['output_path'],
+        'status': 'ok',
+        'error': None,
+        'reused': True,
+        'input_hash': job['input_hash'],
+        'elapsed': 0.0,
+        'stages': {},
+    }
+
+
+def run_jobs(jobs, workers=1, executor='process', on_result=None, reuse=False):
+    """Render jobs, in parallel when workers > 1, and return results in job order.
+
+    ``on_result(result)`` is called as each letter finishes, e.g. for progress.
+    The letters' stage times are added to the caller's active StageTimer and
+    the batch is counted in engine.metrics. With ``reuse``, letters whose
+    output is current (see engine.incremental) are not rendered or counted;
+    their results have ``reused`` set, and every result carries its
+    ``input_hash`` for record_letter.
+    """
+    if reuse:
+        stale, current = incremental.split_jobs(jobs)
+        logger.info("Reusing %s of %s letters with unchanged inputs", len(current), len(jobs))
+        results = [None] * len(jobs)
+        positions = {id(job): index for index, job in enumerate(jobs)}
+        for job in current:
+            result = reused_result(job)
+            results[positions[id(job)]] = result
+            if on_result:
+                on_result(result)
+        for job, result in zip(stale, run_jobs(stale, workers, executor, on_result) if stale else []):
+            results[positions[id(job)]] = result
+        return results
+    timer = active_timer()
+    metrics.BATCH_LETTERS.observe(len(jobs))
+    context = logs.current_context()
+    for job in jobs:
+        job['log_context'] = context
+    if workers <= 1 or len(jobs) <= 1:
+        results = []
+        for job in jobs:
+            result = render_job(job)
+            results.append(result)
+            if timer:
+                timer.merge(result['stages'])
+            metrics.letter_done(result['letter_type'], result['elapsed'], result['error'])
+            if on_result:
+                on_result(result)
+        return results
+
+    results = [None] * len(jobs)
+    if executor == 'process':
+        pool = ProcessPoolExecutor(max_workers=workers, **logs.pool_options())
+    else:
+        pool = ThreadPoolExecutor(max_workers=workers)
+    with pool:
+        futures = {pool.submit(render_job, job): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            result = future.result()
+            results[futures[future]] = result
+            if timer:
+                timer.merge(result['stages'])
+            metrics.letter_done(result['letter_type'], result['elapsed'], result['error'])
+            if on_result:
+                on_result(result)
+    return results
+
+
+def tsp_import_jobs(sheet_path, crime_number, ncrp_id, officer, template_dir, output_dir=None):
+    """Read a TSP import sheet and return (jobs, errors), one job per letter group.
+
+    Rows with TSP "Auto" are assigned an operator from the MSISDN series index.
+    """
+    output_dir = output_dir or default_output_dir('TSP')
+    df = read_tsp_sheet(sheet_path)
+    cases, errors = build_tsp_import_cases(df, crime_number, ncrp_id, load_index() if has_auto_tsp(df) else None)
+    jobs = []
+    for index, case in enumerate(cases, start=1):
+        name = f"Notice_{case['TSP']}_{case['Request_Type']}_{index}.docx".replace(' ', '_')
+        jobs.append(make_job('TSP', case, officer, template_dir, os.path.join(output_dir, name), recipient=case['TSP']))
+    return jobs, errors
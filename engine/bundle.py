@@ -0,0 +1,155 @@
+"""ZIP bundle output for batches.
+
+Instead of one .docx file per letter, a batch can be written to a single
+archive: each letter is rendered to bytes and appended to the ZIP as soon as
+it is ready, so only the letters in flight are held in memory and nothing is
+written to the output folder. ``manifest.json`` inside the archive lists the
+file, recipient, identifiers and SHA-256 of every letter. The archive is
+written under a ``.part`` name and renamed once complete.
+"""
+import hashlib
+import json
+import logging
+import os
+import zipfile
+from datetime import datetime
+from .bank import clean_account_number
+from .batch import run_jobs
+from .errors import OutputError
+from .render import tsp_identifiers
+from .timing import timed
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+
+
+def case_identifiers(letter_type, case):
+    """The account numbers, phone numbers, URLs etc. a letter asks about."""
+    if letter_type == 'Bank':
+        return [clean_account_number(a.get('account_no', 'N/A')) for a in case.get('Accounts', [])]
+    if letter_type == 'TSP':
+        return list(tsp_identifiers(case))
+    if letter_type == 'Intermediary':
+        return list(case.get('AccountID', []))
+    return []
+
+
+def bundle_member(bundle_path, name):
+    """Path recorded for a letter stored inside a bundle."""
+    return os.path.join(bundle_path, name)
+
+
+class LetterBundle:
+    """A ZIP archive that letters are appended to one at a time.
+
+    Use as a context manager; the manifest is written and the archive moved
+    into place on a clean exit, and the partial file removed otherwise.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.partial_path = path + '.part'
+        self.letters = []
+        self.failed = []
+        self.names = set()
+        self.written = set()
+        self.zip = None
+
+    def __enter__(self):
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self.zip = zipfile.ZipFile(self.partial_path, 'w', zipfile.ZIP_STORED, allowZip64=True)
+        except OSError as e:
+            raise OutputError(f"Failed to create bundle '{self.path}': {e}") from e
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.zip.close()
+            os.remove(self.partial_path)
+        return False
+
+    def unique_name(self, name):
+        """Reserve ``name``, or ``name_2``, ``name_3``... if it is taken."""
+        base, ext = os.path.splitext(name)
+        candidate, n = name, 2
+        while candidate in self.names:
+            candidate = f"{base}_{n}{ext}"
+            n += 1
+        self.names.add(candidate)
+        return candidate
+
+    @timed('bundle_write')
+    def add(self, name, data, letter_type=None, recipient=None, identifiers=None):
+        """Append one letter; returns the name it was stored under.
+
+        A name reserved with unique_name is used as is the first time.
+        """
+        if name in self.written or name not in self.names:
+            name = self.unique_name(name)
+        self.written.add(name)
+        try:
+            # .docx files are already deflated; storing them again is cheaper
+            self.zip.writestr(name, data, compress_type=zipfile.ZIP_STORED)
+        except OSError as e:
+            raise OutputError(f"Failed to write {name} to bundle '{self.path}': {e}") from e
+        self.letters.append({
+            'file': name,
+            'letter_type': letter_type,
+            'recipient': recipient,
+            'identifiers': identifiers or [],
+            'sha256': hashlib.sha256(data).hexdigest(),
+            'size': len(data),
+        })
+        return name
+
+    def add_failure(self, recipient, error):
+        self.failed.append({'recipient': recipient, 'error': error})
+
+    def manifest(self):
+        return {
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'letters': self.letters,
+            'failed': self.failed,
+        }
+
+    def close(self):
+        try:
+            self.zip.writestr(MANIFEST_NAME, json.dumps(self.manifest(), indent=2),
+                              compress_type=zipfile.ZIP_DEFLATED)
+            self.zip.close()
+            os.replace(self.partial_path, self.path)
+        except OSError as e:
+            raise OutputError(f"Failed to finish bundle '{self.path}': {e}") from e
+        logger.debug("Bundle %s: %s letters, %s failed", self.path, len(self.letters), len(self.failed))
+        return self.path
+
+
+def export_bundle(jobs, bundle_path, workers=1, executor='process', on_result=None):
+    """Render every job straight into one ZIP archive and return the results.
+
+    Results are those of run_jobs, with ``output_path`` pointing inside the
+    bundle (see bundle_member).
+    """
+    with LetterBundle(bundle_path) as bundle:
+        jobs = [dict(job, output_path=None, bundle_name=bundle.unique_name(os.path.basename(job['output_path'])))
+                for job in jobs]
+        by_name = {job['bundle_name']: job for job in jobs}
+
+        def store(result):
+            data = result.pop('data', None)
+            if result['status'] == 'ok':
+                job = by_name[result['bundle_name']]
+                name = bundle.add(result['bundle_name'], data, job['letter_type'], job['recipient'],
+                                  case_identifiers(job['letter_type'], job['case']))
+                result['output_path'] = bundle_member(bundle_path, name)
+            else:
+                bundle.add_failure(result['recipient'], result['error'])
+            if on_result:
+                on_result(result)
+
+        results = run_jobs(jobs, workers, executor, on_result=store)
+    return results
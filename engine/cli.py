@@ -0,0 +1,332 @@
+"""Headless letter generation.
+
+Examples:
+    python -m engine bank --crime-number 21/2025 --ncrp-id 12345678901234 --officer-id 1 --excel layer1.xlsx
+    python -m engine tsp --crime-number 21/2025 --ncrp-id 12345678901234 --officer-id 1 \\
+        --tsp Airtel --request-type CDR --ids 9876543210,9123456789 --from-date 01-01-2025 --to-date 31-01-2025
+    python -m engine inter ... --platform WhatsApp --input numbers.txt --json
+    python -m engine inter ... --platform Auto --input links.txt
+    python -m engine tsp-import ... --sheet suspects.xlsx --workers 4
+    python -m engine bank ... --excel layer1.xlsx --bundle D:/dispatch/21_2025.zip
+    python -m engine bank ... --excel layer1.xlsx --merged D:/print/21_2025.docx
+    python -m engine bank ... --excel layer1.xlsx --format pdf --workers 4
+    python -m engine serve --port 8765 --workers 4
+    python -m engine watch --inbox D:/NCRP/inbox --officer-id 3 --workers 4
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+import pandas as pd
+from db.database import create_database, fetch_officer, record_letter, save_case
+from . import metrics
+from .errors import EngineError
+from .batch import (bank_jobs, inter_output_path, make_job, run_jobs, tsp_import_jobs, tsp_output_path,
+                    with_output_format)
+from .bundle import export_bundle
+from .inbox import Inbox
+from .merge import export_merged
+from .inter import (AUTO_PLATFORM, GOOGLE_ID_TYPES, PLATFORMS, build_inter_case, build_inter_cases_by_platform,
+                    validate_accounts)
+from .intervals import parse_range
+from .logs import log_context, new_batch_id, setup_logging
+from .msisdn import load_index
+from .render import OUTPUT_FORMATS
+from .service import serve
+from .templates import default_template_dir
+from .timing import Profiler, StageTimer
+from .tsp import (AUTO_TSP, REQUEST_TYPES, TSP_NAMES, build_tsp_case, build_tsp_cases_by_operator,
+                  validate_date_ranges, validate_identifiers)
+
+logger = logging.getLogger(__name__)
+
+
+def read_identifiers(path, column=None):
+    """Identifiers from a text file (one per line) or a column of a CSV/Excel sheet."""
+    ext = os.path.splitext(path)[1].lower()
+    if ext in ('.csv', '.xlsx', '.xls'):
+        df = pd.read_csv(path, dtype=str) if ext == '.csv' else pd.read_excel(path, sheet_name=0, dtype=str)
+        series = df[column] if column else df.iloc[:, 0]
+        return [str(v).strip() for v in series.dropna() if str(v).strip()]
+    with open(path, 'r', encoding='utf-8') as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def collect_identifiers(args):
+    identifiers = []
+    if args.ids:
+        identifiers.extend(i.strip() for i in args.ids.split(',') if i.strip())
+    if args.input:
+        identifiers.extend(read_identifiers(args.input, args.column))
+    return identifiers
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m engine", description="Generate letters without the GUI.")
+    monitoring = argparse.ArgumentParser(add_help=False)
+    monitoring.add_argument('--metrics-file', help="write Prometheus metrics to this file (default: config.json)")
+    monitoring.add_argument('--metrics-interval', type=float, default=15,
+                            help="seconds between metrics file updates (default: %(default)s)")
+    monitoring.add_argument('--metrics-port', type=int, help="serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+
+    common = argparse.ArgumentParser(add_help=False, parents=[monitoring])
+    common.add_argument('--crime-number', required=True)
+    common.add_argument('--ncrp-id', required=True)
+    common.add_argument('--officer-id', required=True, type=int)
+    common.add_argument('--template-dir', help="root folder with banks/, tsp/ and inter/ (default: config.json)")
+    common.add_argument('--output-dir', help="where letters are written (default: Documents/GeneratedLetters/<type>)")
+    common.add_argument('--workers', type=int, default=1, help="letters rendered in parallel")
+    common.add_argument('--executor', choices=['process', 'thread'], default='process')
+    common.add_argument('--json', action='store_true', help="print a JSON summary to stdout")
+    common.add_argument('--format', choices=OUTPUT_FORMATS, default='docx', help="letter file format")
+    common.add_argument('--timings', action='store_true', help="print the time spent in each stage")
+    common.add_argument('--force', action='store_true',
+                        help="render every letter, even those whose inputs and output file are unchanged")
+    common.add_argument('--profile', action='store_true',
+                        help="cProfile the batch (letters are rendered in-process) and write the profile to "
+                             "Documents/LetterGeneratorLogs")
+    output = common.add_mutually_exclusive_group()
+    output.add_argument('--bundle', metavar='ZIP', help="write every letter into one ZIP archive with a "
+                                                        "manifest.json instead of separate .docx files")
+    output.add_argument('--merged', metavar='DOCX', help="write every letter into one .docx for printing, "
+                                                         "each letter starting on a new page")
+
+    identifiers = argparse.ArgumentParser(add_help=False)
+    identifiers.add_argument('--ids', help="comma separated identifiers")
+    identifiers.add_argument('--input', help="text file (one per line) or CSV/Excel file")
+    identifiers.add_argument('--column', help="column to read from a CSV/Excel input (default: first)")
+    identifiers.add_argument('--from-date', help="DD-MM-YYYY")
+    identifiers.add_argument('--to-date', help="DD-MM-YYYY")
+
+    sub = parser.add_subparsers(dest='command', required=True)
+    bank = sub.add_parser('bank', parents=[common], help="bank letters from an NCRP Excel export")
+    bank.add_argument('--excel', required=True)
+
+    tsp = sub.add_parser('tsp', parents=[common, identifiers], help="TSP letter for a list of identifiers")
+    tsp.add_argument('--tsp', required=True, choices=TSP_NAMES + [AUTO_TSP],
+                     help=f"operator, or {AUTO_TSP} to split mobile numbers by the MSISDN series file")
+    tsp.add_argument('--request-type', required=True, choices=REQUEST_TYPES)
+    tsp.add_argument('--range', action='append', dest='ranges', metavar='FROM:TO',
+                     help="date range DD-MM-YYYY:DD-MM-YYYY for CDR/IMEI CDR; repeat for several windows, "
+                          "overlapping ones are merged")
+
+    tsp_import = sub.add_parser('tsp-import', parents=[common],
+                                help="TSP letters from a sheet of identifier, TSP, request type and dates")
+    tsp_import.add_argument('--sheet', required=True, help="CSV/Excel with identifier, tsp, request_type, "
+                                                           "from_date and to_date columns")
+
+    inter = sub.add_parser('inter', parents=[common, identifiers], help="intermediary letter for a list of URLs/IDs")
+    inter.add_argument('--platform', required=True, choices=PLATFORMS + [AUTO_PLATFORM],
+                       help=f"platform, or {AUTO_PLATFORM} to sort mixed URLs and IDs into one letter per platform")
+    inter.add_argument('--default-platform', choices=PLATFORMS,
+                       help=f"platform of bare @handles with --platform {AUTO_PLATFORM}")
+    inter.add_argument('--google-id-type', choices=GOOGLE_ID_TYPES, default="Gmail ID")
+
+    service = sub.add_parser('serve', parents=[monitoring], help="run the local HTTP generation service")
+    service.add_argument('--host', default='127.0.0.1', help="loopback address to bind (default: 127.0.0.1)")
+    service.add_argument('--port', type=int, default=8765)
+    service.add_argument('--template-dir', help="root folder with banks/, tsp/ and inter/ (default: config.json)")
+    service.add_argument('--output-dir', help="where letters are written (default: Documents/GeneratedLetters/service)")
+    service.add_argument('--workers', type=int, default=2, help="letters rendered in parallel")
+    service.add_argument('--executor', choices=['process', 'thread'], default='process')
+
+    watch = sub.add_parser('watch', parents=[monitoring], help="generate bank letters for spreadsheets dropped into a folder")
+    watch.add_argument('--inbox', required=True, help="folder to watch; done/ and failed/ are created inside it")
+    watch.add_argument('--officer-id', type=int, help="officer used when the file name or sidecar does not give one")
+    watch.add_argument('--template-dir', help="root folder with banks/, tsp/ and inter/ (default: config.json)")
+    watch.add_argument('--output-dir', help="where letters are written (default: Documents/GeneratedLetters/bank)")
+    watch.add_argument('--workers', type=int, default=1, help="letters rendered in parallel")
+    watch.add_argument('--executor', choices=['process', 'thread'], default='process')
+    watch.add_argument('--settle', type=float, default=2.0,
+                       help="seconds a file must stay unchanged before it is read")
+    watch.add_argument('--once', action='store_true', help="process the current contents and exit")
+    return parser
+
+
+def build_jobs(args, officer, template_dir):
+    """Return (letter_type, jobs, errors) for the parsed command."""
+    if args.command == 'bank':
+        jobs, errors = bank_jobs(args.excel, args.crime_number, args.ncrp_id, officer, template_dir, args.output_dir)
+        return 'Bank', jobs, errors
+    if args.command == 'tsp-import':
+        jobs, errors = tsp_import_jobs(args.sheet, args.crime_number, args.ncrp_id, officer, template_dir,
+                                       args.output_dir)
+        return 'TSP', jobs, errors
+
+    identifiers = collect_identifiers(args)
+    if args.command == 'tsp':
+        date_ranges = [parse_range(text) for text in args.ranges or []]
+        if args.from_date or args.to_date or not date_ranges:
+            date_ranges.insert(0, (args.from_date, args.to_date))
+        error = validate_identifiers(args.request_type, identifiers) or \
+            validate_date_ranges(args.request_type, date_ranges)
+        if error:
+            return 'TSP', [], [error]
+        if args.tsp == AUTO_TSP:
+            cases, unknown = build_tsp_cases_by_operator(args.crime_number, args.ncrp_id, args.request_type,
+                                                         identifiers, args.from_date, args.to_date, load_index(),
+                                                         date_ranges)
+            jobs = [make_job('TSP', case, officer, template_dir, tsp_output_path(case, args.output_dir),
+                             recipient=case['TSP']) for case in cases]
+            return 'TSP', jobs, [f"Operator not found for {number}" for number in unknown]
+        case = build_tsp_case(args.crime_number, args.ncrp_id, args.tsp, args.request_type,
+                              identifiers, date_ranges=date_ranges)
+        job = make_job('TSP', case, officer, template_dir, tsp_output_path(case, args.output_dir),
+                       recipient=args.tsp)
+        return 'TSP', [job], []
+
+    if args.platform == AUTO_PLATFORM:
+        cases, unknown = build_inter_cases_by_platform(args.crime_number, args.ncrp_id, identifiers,
+                                                       args.from_date, args.to_date, args.default_platform)
+        jobs = [make_job('Intermediary', case, officer, template_dir, inter_output_path(case, args.output_dir),
+                         recipient=case['Platform']) for case in cases]
+        return 'Intermediary', jobs, [f"Platform not recognised for {value}" for value in unknown]
+    error = validate_accounts(args.platform, identifiers)
+    if error:
+        return 'Intermediary', [], [error]
+    case = build_inter_case(args.crime_number, args.ncrp_id, args.platform, identifiers,
+                            args.from_date, args.to_date, args.google_id_type)
+    job = make_job('Intermediary', case, officer, template_dir, inter_output_path(case, args.output_dir),
+                   recipient=args.platform)
+    return 'Intermediary', [job], []
+
+
+def watch_inbox(args):
+    create_database()
+    inbox = Inbox(args.inbox, args.template_dir or default_template_dir(), args.output_dir,
+                  args.officer_id, args.workers, args.executor, args.settle)
+    if args.once:
+        summaries = inbox.run_once()
+        return 0 if all(s['status'] == 'done' for s in summaries) else 1
+    print(f"Watching {inbox.inbox_dir} for bank spreadsheets...")
+    try:
+        inbox.watch(on_summary=lambda s: print(f"{s['file']}: {s['status']} ({s['generated']} letters)"))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def start_metrics(args):
+    """Enable metrics from --metrics-file/--metrics-port, or else from config.json."""
+    if args.metrics_file or args.metrics_port is not None:
+        metrics.start(args.metrics_file, args.metrics_interval, args.metrics_port)
+    else:
+        metrics.start_from_config()
+
+
+def run_batch(args, officer, template_dir):
+    """Build, render and record the letters of one command; returns (results, errors)."""
+    try:
+        letter_type, jobs, errors = build_jobs(args, officer, template_dir)
+        with_output_format(jobs, args.format)
+    except EngineError as e:
+        metrics.count_error(e)
+        return [], [str(e)]
+    if not jobs:
+        return [], errors
+
+    results = []
+    case_key = {'CrimeNumber': args.crime_number, 'NCRP_ID': args.ncrp_id}
+    save_error = save_case(case_key, args.officer_id, letter_type)
+    if save_error:
+        metrics.count_error(save_error)
+        errors.append(save_error)
+        return results, errors
+    if args.bundle or args.merged:
+        try:
+            if args.bundle:
+                results = export_bundle(jobs, args.bundle, args.workers, args.executor)
+            else:
+                results = export_merged(jobs, args.merged, args.workers, args.executor)
+        except EngineError as e:
+            metrics.count_error(e)
+            errors.append(str(e))
+    else:
+        results = run_jobs(jobs, args.workers, args.executor, reuse=not args.force)
+    for result in results:
+        if result['status'] == 'ok' and not result.get('reused'):
+            record_error = record_letter(case_key, args.officer_id, letter_type,
+                                         result['recipient'], result['output_path'], result.get('input_hash'))
+            if record_error:
+                logger.warning("Letter not recorded: %s", record_error)
+    return results, errors
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, 'merged', None) and args.format != 'docx':
+        parser.error("--merged writes a .docx; it cannot be combined with --format pdf")
+    setup_logging('engine')
+    try:
+        start_metrics(args)
+    except (OSError, ValueError) as e:
+        print(f"error: cannot start metrics: {e}", file=sys.stderr)
+        return 2
+    if args.command == 'serve':
+        try:
+            serve(args.template_dir or default_template_dir(), args.host, args.port,
+                  args.output_dir, args.workers, args.executor)
+        except ValueError as e:
+            print(f"error: {e}", file=sys.stderr)
+            return 2
+        return 0
+    if args.command == 'watch':
+        return watch_inbox(args)
+
+    start = time.perf_counter()
+    create_database()
+
+    officer = fetch_officer(args.officer_id)
+    if not officer:
+        print(f"Officer {args.officer_id} not found", file=sys.stderr)
+        return 2
+    template_dir = args.template_dir or default_template_dir()
+    if args.profile and args.workers > 1:
+        # cProfile cannot see into worker processes
+        print("--profile renders letters in-process; ignoring --workers", file=sys.stderr)
+        args.workers = 1
+
+    batch_id = new_batch_id()
+    with StageTimer(args.command) as timer, Profiler(args.command, args.profile) as profiler, \
+            log_context(batch_id=batch_id, crime_number=args.crime_number, ncrp_id=args.ncrp_id):
+        results, errors = run_batch(args, officer, template_dir)
+    logger.info(timer.report())
+
+    generated = sum(1 for r in results if r['status'] == 'ok')
+    reused = sum(1 for r in results if r.get('reused'))
+    failed = len(results) - generated
+    summary = {
+        'command': args.command,
+        'batch_id': batch_id,
+        'crime_number': args.crime_number,
+        'ncrp_id': args.ncrp_id,
+        'officer_id': args.officer_id,
+        'generated': generated,
+        'reused': reused,
+        'failed': failed,
+        'errors': errors,
+        'elapsed': round(time.perf_counter() - start, 3),
+        'stages': timer.as_dict(),
+        'profile': profiler.path,
+        'letters': results,
+    }
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        for result in results:
+            status = result['output_path'] if result['status'] == 'ok' else f"FAILED: {result['error']}"
+            if result.get('reused'):
+                status += " (unchanged)"
+            print(f"{result['recipient']}: {status}")
+        for error in errors:
+            print(f"error: {error}", file=sys.stderr)
+        print(f"Generated {generated} letters ({reused} reused, {generated - reused} regenerated), {failed} failed, "
+              f"{len(errors)} issues in {summary['elapsed']}s")
+        if args.timings or args.profile:
+            print(timer.report())
+        if profiler.path:
+            print(f"Profile written to {profiler.path}")
+    return 0 if generated and not failed else 1
@@ -0,0 +1,75 @@
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+from .errors import ServiceError
+
+
+class ServiceClient:
+    """Submits letters to a running generation service (see engine.service)."""
+
+    def __init__(self, base_url, timeout=30, poll_interval=0.2):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+
+    def _request(self, method, path, payload=None):
+        data = json.dumps(payload).encode('utf-8') if payload is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, method=method,
+                                         headers={'Content-Type': 'application/json'})
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except urllib.error.HTTPError as e:
+            body = e.read()
+            try:
+                message = json.loads(body).get('error', body.decode('utf-8', 'replace'))
+            except ValueError:
+                message = body.decode('utf-8', 'replace')
+            raise ServiceError(f"Generation service returned {e.code}: {message}") from e
+        except (urllib.error.URLError, OSError) as e:
+            raise ServiceError(f"Generation service at {self.base_url} is not reachable: {e}") from e
+
+    def health(self):
+        return json.loads(self._request('GET', '/health')[1])
+
+    def submit(self, officer_id, letters, record=True):
+        """Queue letters ([{'letter_type': ..., 'case': ...}]) and return the job id."""
+        payload = {'officer_id': officer_id, 'letters': letters, 'record': record}
+        return json.loads(self._request('POST', '/jobs', payload)[1])['id']
+
+    def status(self, job_id):
+        return json.loads(self._request('GET', f'/jobs/{job_id}')[1])
+
+    def wait(self, job_id, timeout=None):
+        """Poll until the job finishes and return its final status."""
+        deadline = time.monotonic() + (timeout or self.timeout)
+        while True:
+            status = self.status(job_id)
+            if status['status'] in ('done', 'failed'):
+                return status
+            if time.monotonic() > deadline:
+                raise ServiceError(f"Job {job_id} did not finish in time")
+            time.sleep(self.poll_interval)
+
+    def download(self, job_id, output_path, index=None):
+        """Save a job's letter (or the .zip of all its letters) to output_path."""
+        path = f'/jobs/{job_id}/download' if index is None else f'/jobs/{job_id}/letters/{index}'
+        data = self._request('GET', path)[1]
+        try:
+            os.makedirs(os.path.dirname(output_path) or '.', exist_ok=True)
+            with open(output_path, 'wb') as f:
+                f.write(data)
+        except OSError as e:
+            raise ServiceError(f"Failed to save letter to '{output_path}': {e}") from e
+        return output_path
+
+    def render(self, letter_type, case, officer_id, output_path, record=True):
+        """Generate one letter through the service and save it locally."""
+        job_id = self.submit(officer_id, [{'letter_type': letter_type, 'case': case}], record)
+        status = self.wait(job_id)
+        letter = status['letters'][0]
+        if letter['status'] != 'ok':
+            raise ServiceError(letter['error'] or f"Job {job_id} failed")
+        return self.download(job_id, output_path, 0)
@@ -0,0 +1,51 @@
+class EngineError(Exception):
+    """Base class for errors raised by the letter engine."""
+
+
+class InvalidRequestError(EngineError, ValueError):
+    """Unknown letter type or request type, or inputs that fail validation."""
+
+
+class InputDataError(EngineError, ValueError):
+    """An input sheet or identifier file that cannot be used."""
+
+
+class TemplateNotFoundError(EngineError, FileNotFoundError):
+    """The template for a letter does not exist."""
+
+
+class TemplateLoadError(EngineError):
+    """The template exists but python-docx could not open it."""
+
+
+class RenderError(EngineError):
+    """Filling the template failed."""
+
+
+class OutputError(EngineError, OSError):
+    """The rendered letter could not be written."""
+
+
+class ServiceError(EngineError):
+    """The generation service rejected a job or could not be reached."""
+
+
+class BatchIssue(str):
+    """A batch error message that also records where it happened.
+
+    It is the message string itself, so code that prints or joins errors is
+    unaffected; ``group`` is the bank or operator the letter was for,
+    ``stage`` the step that failed (validate, save, render, or warning for
+    a problem that did not stop the letter) and ``error_class`` the kind of
+    error.
+    """
+
+    def __new__(cls, message, group='', stage='', error_class=''):
+        issue = super().__new__(cls, message)
+        issue.group = str(group)
+        issue.stage = stage
+        issue.error_class = error_class
+        return issue
+
+    def __reduce__(self):
+        return BatchIssue, (str(self), self.group, self.stage, self.error_class)
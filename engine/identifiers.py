@@ -0,0 +1,254 @@
+"""Normalization and validation of identifiers in bulk.
+
+``normalize_identifiers(values, kind)`` works on a whole list at once: the
+values are packed into a numpy array of character codes, separators are dropped
+and the remaining characters shifted left with two boolean masks, and the
+length, prefix and checksum rules (Luhn for IMEI, Verhoeff for Aadhaar) are
+evaluated column-wise. It returns the normalized strings and one error code
+per value; ``error_message`` turns a code into the text shown to officers.
+"""
+import re
+import numpy as np
+
+OK = 0
+EMPTY = 1
+BAD_CHARACTERS = 2
+BAD_LENGTH = 3
+BAD_PREFIX = 4
+BAD_CHECKSUM = 5
+
+# kind -> (label, (min length, max length), digits only)
+KINDS = {
+    'mobile': ("Phone No", (10, 10), True),
+    'imei': ("IMEI No", (15, 15), True),
+    'aadhaar': ("Aadhar No", (12, 12), True),
+    'pos': ("PoS code", (1, 30), False),
+    'account': ("Account No", (6, 20), False),
+}
+
+SEPARATORS = ' \t-.()/+_,'
+# A number written with spaces and punctuation, e.g. "+91 (98765) 432-10"
+SPACED_NUMBER = re.compile(r'\+?[\d\s\-.()/]+')
+
+# Character class of each ASCII code point; anything else is invalid
+DIGIT, LETTER, SEPARATOR = 1, 2, 3
+ASCII_CLASS = np.zeros(128, dtype=np.uint8)
+ASCII_CLASS[ord('0'):ord('9') + 1] = DIGIT
+ASCII_CLASS[ord('A'):ord('Z') + 1] = LETTER
+ASCII_CLASS[ord('a'):ord('z') + 1] = LETTER
+ASCII_CLASS[[ord(c) for c in SEPARATORS]] = SEPARATOR
+ASCII_CLASS[0] = SEPARATOR
+
+VERHOEFF_D = np.array([
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
+    [1, 2, 3, 4, 0, 6, 7, 8, 9, 5],
+    [2, 3, 4, 0, 1, 7, 8, 9, 5, 6],
+    [3, 4, 0, 1, 2, 8, 9, 5, 6, 7],
+    [4, 0, 1, 2, 3, 9, 5, 6, 7, 8],
+    [5, 9, 8, 7, 6, 0, 4, 3, 2, 1],
+    [6, 5, 9, 8, 7, 1, 0, 4, 3, 2],
+    [7, 6, 5, 9, 8, 2, 1, 0, 4, 3],
+    [8, 7, 6, 5, 9, 3, 2, 1, 0, 4],
+    [9, 8, 7, 6, 5, 4, 3, 2, 1, 0],
+], dtype=np.int8)
+
+VERHOEFF_P = np.array([
+    [0, 1, 2, 3, 4, 5, 6, 7, 8, 9],
+    [1, 5, 7, 6, 2, 8, 3, 0, 9, 4],
+    [5, 8, 0, 3, 7, 9, 6, 2, 4, 1],
+    [8, 9, 1, 6, 0, 4, 3, 5, 7, 2],
+    [9, 4, 5, 8, 1, 6, 7, 3, 2, 0],
+    [4, 2, 8, 9, 5, 7, 0, 3, 1, 6],
+    [2, 7, 9, 3, 8, 0, 6, 4, 1, 5],
+    [7, 0, 4, 6, 9, 1, 3, 2, 5, 8],
+], dtype=np.int8)
+
+
+def _text(value):
+    """Cell value as text; spreadsheet floats such as 9876543210.0 lose the '.0'."""
+    if value is None:
+        return ''
+    if isinstance(value, float):
+        if value != value:
+            return ''
+        if value.is_integer():
+            return str(int(value))
+    text = str(value).strip()
+    if text.endswith('.0') and text[:-2].isdigit():
+        return text[:-2]
+    return text
+
+
+def luhn_valid(digits):
+    """Row-wise Luhn check of an (n, 15) uint8 array of digits.
+
+    Doubling every second digit from the right and taking 9 off results over
+    9 is the same as weighting those digits 2 and taking 9 off for each one
+    above 4, so the total is two integer matrix products.
+    """
+    doubled = np.arange(digits.shape[1])[::-1] % 2 == 1
+    total = digits @ np.where(doubled, 2, 1).astype(np.uint16)
+    high = (digits[:, doubled] > 4) @ np.ones(np.count_nonzero(doubled), dtype=np.uint16)
+    return (total - 9 * high) % 10 == 0
+
+
+def verhoeff_valid(digits):
+    """Row-wise Verhoeff check of an (n, 12) uint8 array of digits."""
+    check = np.zeros(len(digits), dtype=np.int8)
+    for i, column in enumerate(digits[:, ::-1].T):
+        check = VERHOEFF_D[check, VERHOEFF_P[i % 8, column]]
+    return check == 0
+
+
+def _pack(values):
+    """(points, classes): the values as an (n, width) uint8 array of character codes, and the class of each.
+
+    Lists of ASCII strings are packed one byte per character as they are;
+    anything else goes through _text first. Non-ASCII characters become the
+    invalid code 127, except non-breaking spaces (common in copied text),
+    which separate like spaces.
+    """
+    if all(map(str.__instancecheck__, values)):
+        try:
+            texts = np.array(values, dtype='S')
+        except UnicodeEncodeError:
+            pass
+        else:
+            points = texts.view(np.uint8).reshape(len(values), -1)
+            # Only strings with a '.' need _text's cleanup
+            if (points == ord('.')).any():
+                dotted = np.flatnonzero((points == ord('.')).any(axis=1))
+                texts[dotted] = [_text(values[i]) for i in dotted]
+            return points, ASCII_CLASS[points]
+    texts = [v if type(v) is str and '.' not in v else _text(v) for v in values]
+    points = np.array(texts, dtype=str)
+    points = points.view(np.uint32).reshape(len(texts), -1)
+    classes = ASCII_CLASS.take(points, mode='clip')
+    classes[points == 0xA0] = SEPARATOR
+    return np.minimum(points, 127).astype(np.uint8), classes
+
+
+def normalize_identifiers(values, kind):
+    """Return (normalized, codes) for a list of identifiers of one kind.
+
+    ``normalized`` is a numpy array of strings (digits only, or upper-case
+    alphanumerics for PoS codes and account numbers; mobile numbers lose a
+    +91/91/0 prefix) and ``codes`` an int8 array of OK/EMPTY/BAD_* codes.
+    """
+    label, (min_len, max_len), digits_only = KINDS[kind]
+    values = list(values)
+    if not values:
+        return np.zeros(0, dtype='U1'), np.zeros(0, dtype=np.int8)
+    points, classes = _pack(values)
+    width = points.shape[1]
+    if not digits_only:
+        points[(classes == LETTER) & (points >= ord('a'))] -= 32
+        keep = (classes == DIGIT) | (classes == LETTER)
+    else:
+        keep = classes == DIGIT
+    bad_chars = ((classes == 0) | (digits_only & (classes == LETTER))).any(axis=1)
+    lengths = keep.sum(axis=1)
+
+    # Move kept characters to the front of each row, preserving their order:
+    # boolean indexing reads them in row-major order and writes them back
+    # into the leading ``length`` cells. Already-clean input skips this.
+    if (keep != (points != 0)).any():
+        compact = np.zeros_like(points)
+        compact[np.arange(width) < lengths[:, None]] = points[keep]
+        points = compact
+
+    if kind == 'mobile':
+        for prefix_len, prefix in ((2, '91'), (1, '0')):
+            if width <= prefix_len:
+                continue
+            head = np.all(points[:, :prefix_len] == [ord(c) for c in prefix], axis=1)
+            shift = head & (lengths == 10 + prefix_len)
+            if shift.any():
+                points[shift, :-prefix_len] = points[shift, prefix_len:]
+                points[shift, -prefix_len:] = 0
+                lengths[shift] -= prefix_len
+
+    codes = np.full(len(values), OK, dtype=np.int8)
+    codes[(lengths < min_len) | (lengths > max_len)] = BAD_LENGTH
+    codes[lengths == 0] = EMPTY
+    codes[bad_chars] = BAD_CHARACTERS
+
+    if kind in ('mobile', 'imei', 'aadhaar'):
+        rows = np.flatnonzero(codes == OK)
+        if len(rows):
+            # The digits, once, as a uint8 matrix; no copy of the rows when all are valid
+            digits = (points[:, :min_len] if len(rows) == len(points) else points[rows, :min_len]) - np.uint8(ord('0'))
+            if kind == 'mobile':
+                bad = digits[:, 0] < 6
+                codes[rows[bad]] = BAD_PREFIX
+            elif kind == 'aadhaar':
+                bad_prefix = digits[:, 0] < 2
+                codes[rows[bad_prefix]] = BAD_PREFIX
+                codes[rows[~bad_prefix & ~verhoeff_valid(digits)]] = BAD_CHECKSUM
+            else:
+                codes[rows[~luhn_valid(digits)]] = BAD_CHECKSUM
+
+    # Widening the codes to UCS-4 is much cheaper than decoding bytes strings
+    return points.astype(np.uint32).view(f'U{width}').ravel(), codes
+
+
+def error_message(kind, code):
+    label, (min_len, max_len), digits_only = KINDS[kind]
+    if code == EMPTY:
+        return f"{label} is empty."
+    if code == BAD_CHARACTERS:
+        return f"{label} contains invalid characters."
+    if code == BAD_LENGTH:
+        unit = "digits" if digits_only else "characters"
+        if min_len == max_len:
+            return f"{label} must be {min_len} {unit}."
+        return f"{label} must be {min_len} to {max_len} {unit}."
+    if code == BAD_PREFIX:
+        return "Phone No must start with 6, 7, 8 or 9." if kind == 'mobile' else f"{label} cannot start with 0 or 1."
+    if code == BAD_CHECKSUM:
+        return f"{label} has an invalid check digit."
+    return None
+
+
+def first_error(values, kind):
+    """Message for the first invalid value, or None when all are valid."""
+    _, codes = normalize_identifiers(values, kind)
+    bad = np.flatnonzero(codes != OK)
+    if not len(bad):
+        return None
+    return f"{error_message(kind, codes[bad[0]])} ({_text(values[bad[0]]) or 'blank'})"
+
+
+def split_identifiers(text, kind=None):
+    """Split pasted text into identifiers.
+
+    Newlines, commas, semicolons and tabs always separate. Whitespace
+    separates too, except inside a number of a digits-only kind that is only
+    valid with its spaces, e.g. "+91 98765 43210".
+    """
+    values = []
+    max_len = KINDS[kind][1][1] if kind in KINDS and KINDS[kind][2] else 0
+    for token in re.split(r'[\r\n,;\t]+', text):
+        token = token.strip()
+        if not token:
+            continue
+        if max_len and SPACED_NUMBER.fullmatch(token) and len(re.sub(r'\D', '', token)) <= max_len + 2:
+            values.append(token)
+        else:
+            values.extend(token.split())
+    return values
+
+
+def looks_like_header(cells, kind=None):
+    """True when the first row of a file holds column names ("Mobile No", "URL") rather than identifiers.
+
+    Every non-empty cell must have a letter and no digit; for free text
+    (``kind`` None or not digits-only) no '.', '/', '@' or ':' either, so
+    URLs, e-mail addresses and handles are never taken for a header.
+    """
+    cells = [_text(cell) for cell in cells]
+    cells = [cell for cell in cells if cell and cell.lower() != 'nan']
+    if not cells:
+        return False
+    not_in_header = r'\d' if kind in KINDS and KINDS[kind][2] else r'[\d./@:]'
+    return all(re.search(r'[A-Za-z]', cell) and not re.search(not_in_header, cell) for cell in cells)
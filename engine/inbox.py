@@ -0,0 +1,256 @@
+"""Watch-folder inbox for bank letters.
+
+Spreadsheets dropped into the inbox are turned into bank letters without
+opening the GUI. The case is taken from a sidecar ``<name>.json`` next to the
+spreadsheet, e.g. ``{"crime_number": "21/2025", "ncrp_id": "12345678901234",
+"officer_id": 3}``, or else from the file name::
+
+    <crime number>__<NCRP ID>[__<officer id>].xlsx   e.g. 21_2025__12345678901234__3.xlsx
+
+where ``_`` in the crime number stands for ``/``. Files are only read once
+their size and modification time have been stable for ``settle`` seconds, so
+exports still being copied in are left alone. Processed spreadsheets (and
+their sidecars) are moved to ``done/`` or ``failed/`` with a ``.result.json``
+summary beside them.
+"""
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from datetime import datetime
+from db.database import fetch_officer, record_letter, save_case
+from . import metrics
+from .batch import bank_jobs, default_output_dir, run_jobs
+from .errors import EngineError, InputDataError
+from .logs import add_context, log_context, new_batch_id
+from .timing import StageTimer
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    WATCHDOG_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SPREADSHEET_EXTENSIONS = ('.xlsx', '.xls')
+FILENAME_PATTERN = re.compile(r'^(?P<crime>.+?)__(?P<ncrp>\d+)(?:__(?P<officer>\d+))?$')
+
+
+def is_spreadsheet(path):
+    name = os.path.basename(path)
+    # Skip Excel lock files and hidden/partial downloads
+    if name.startswith(('~$', '.')):
+        return False
+    return name.lower().endswith(SPREADSHEET_EXTENSIONS)
+
+
+def case_from_file(path, default_officer_id=None):
+    """Return (crime_number, ncrp_id, officer_id) for an inbox spreadsheet."""
+    stem = os.path.splitext(path)[0]
+    sidecar = stem + '.json'
+    if os.path.exists(sidecar):
+        try:
+            with open(sidecar, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            raise InputDataError(f"Unreadable sidecar {os.path.basename(sidecar)}: {e}")
+        crime_number, ncrp_id = meta.get('crime_number'), meta.get('ncrp_id')
+        officer_id = meta.get('officer_id', default_officer_id)
+    else:
+        match = FILENAME_PATTERN.match(os.path.basename(stem))
+        if not match:
+            raise InputDataError(
+                f"Cannot identify the case for {os.path.basename(path)}: "
+                "use <crime number>__<NCRP ID>[__<officer id>] or a sidecar .json"
+            )
+        crime_number = match.group('crime').replace('_', '/')
+        ncrp_id = match.group('ncrp')
+        officer_id = match.group('officer') or default_officer_id
+    if not crime_number or not ncrp_id:
+        raise InputDataError(f"Crime number and NCRP ID are required for {os.path.basename(path)}")
+    if officer_id is None:
+        raise InputDataError(f"No officer given for {os.path.basename(path)}")
+    try:
+        officer_id = int(officer_id)
+    except (TypeError, ValueError):
+        raise InputDataError(f"Invalid officer id {officer_id!r} for {os.path.basename(path)}")
+    return str(crime_number), str(ncrp_id), officer_id
+
+
+def move_to(path, folder):
+    """Move a file into folder, adding a timestamp if the name is taken."""
+    os.makedirs(folder, exist_ok=True)
+    target = os.path.join(folder, os.path.basename(path))
+    if os.path.exists(target):
+        base, ext = os.path.splitext(target)
+        target = f"{base}_{datetime.now().strftime('%Y%m%d%H%M%S')}{ext}"
+    shutil.move(path, target)
+    return target
+
+
+class _InboxEvents(FileSystemEventHandler):
+    def __init__(self, inbox):
+        self.inbox = inbox
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.inbox.touch(event.src_path)
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.inbox.touch(event.src_path)
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.inbox.touch(event.dest_path)
+
+
+class Inbox:
+    def __init__(self, inbox_dir, template_dir, output_dir=None, officer_id=None,
+                 workers=1, executor='process', settle=2.0):
+        self.inbox_dir = os.path.abspath(inbox_dir)
+        self.done_dir = os.path.join(self.inbox_dir, 'done')
+        self.failed_dir = os.path.join(self.inbox_dir, 'failed')
+        self.template_dir = template_dir
+        self.output_dir = output_dir or default_output_dir('Bank')
+        self.officer_id = officer_id
+        self.workers = workers
+        self.executor = executor
+        self.settle = settle
+        # path -> (size, mtime, time the stat was last seen to change)
+        self.pending = {}
+
+    def touch(self, path):
+        """Note a new or changed file; it is processed once it has settled."""
+        if os.path.dirname(os.path.abspath(path)) == self.inbox_dir and is_spreadsheet(path):
+            self.pending.setdefault(path, (None, None, time.monotonic()))
+
+    def scan(self):
+        for name in os.listdir(self.inbox_dir):
+            self.touch(os.path.join(self.inbox_dir, name))
+
+    def settled(self):
+        """Pending files whose size and mtime have not changed for ``settle`` seconds.
+
+        Empty files settle too, so they are filed under failed/ instead of being waited on forever.
+        """
+        ready = []
+        now = time.monotonic()
+        for path, (size, mtime, changed) in list(self.pending.items()):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                del self.pending[path]
+                continue
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                self.pending[path] = (stat.st_size, stat.st_mtime, now)
+            elif now - changed >= self.settle:
+                del self.pending[path]
+                ready.append(path)
+        return sorted(ready)
+
+    def process(self, path):
+        """Generate the letters for one spreadsheet and file it under done/ or failed/."""
+        batch_id = new_batch_id()
+        with log_context(batch_id=batch_id, file=os.path.basename(path)):
+            return self._process(path, batch_id)
+
+    def _process(self, path, batch_id):
+        start = time.perf_counter()
+        summary = {'file': os.path.basename(path), 'batch_id': batch_id, 'generated': 0, 'reused': 0, 'failed': 0,
+                   'errors': [], 'letters': []}
+        timer = StageTimer(summary['file'])
+        with timer:
+            try:
+                if os.path.getsize(path) == 0:
+                    raise InputDataError(f"{summary['file']} is empty")
+                crime_number, ncrp_id, officer_id = case_from_file(path, self.officer_id)
+                summary.update({'crime_number': crime_number, 'ncrp_id': ncrp_id, 'officer_id': officer_id})
+                add_context(crime_number=crime_number, ncrp_id=ncrp_id)
+                officer = fetch_officer(officer_id)
+                if not officer:
+                    raise InputDataError(f"Officer {officer_id} not found")
+                output_dir = os.path.join(self.output_dir, os.path.splitext(os.path.basename(path))[0])
+                jobs, errors = bank_jobs(path, crime_number, ncrp_id, officer, self.template_dir, output_dir)
+                summary['errors'].extend(errors)
+                if jobs:
+                    case_key = {'CrimeNumber': crime_number, 'NCRP_ID': ncrp_id}
+                    save_error = save_case(case_key, officer_id, 'Bank')
+                    if save_error:
+                        raise InputDataError(save_error)
+                    results = run_jobs(jobs, self.workers, self.executor, reuse=True)
+                    for result in results:
+                        if result['status'] == 'ok' and not result.get('reused'):
+                            record_error = record_letter(case_key, officer_id, 'Bank', result['recipient'],
+                                                         result['output_path'], result.get('input_hash'))
+                            if record_error:
+                                logger.warning("Letter not recorded: %s", record_error)
+                    summary['letters'] = results
+                    summary['generated'] = sum(1 for r in results if r['status'] == 'ok')
+                    summary['reused'] = sum(1 for r in results if r.get('reused'))
+                    summary['failed'] = len(results) - summary['generated']
+            except EngineError as e:
+                metrics.count_error(e)
+                summary['errors'].append(str(e))
+
+        ok = summary['generated'] and not summary['failed']
+        summary['status'] = 'done' if ok else 'failed'
+        summary['elapsed'] = round(time.perf_counter() - start, 3)
+        summary['stages'] = timer.as_dict()
+        folder = self.done_dir if ok else self.failed_dir
+        moved = move_to(path, folder)
+        sidecar = os.path.splitext(path)[0] + '.json'
+        if os.path.exists(sidecar):
+            move_to(sidecar, folder)
+        with open(os.path.splitext(moved)[0] + '.result.json', 'w', encoding='utf-8') as f:
+            json.dump(summary, f, indent=2)
+        log = logger.info if ok else logger.error
+        log("Inbox: %s -> %s (%s generated, %s reused, %s failed, %s issues)", summary['file'], summary['status'],
+            summary['generated'], summary['reused'], summary['failed'], len(summary['errors']))
+        logger.info(timer.report())
+        return summary
+
+    def run_once(self):
+        """Process everything currently in the inbox that has settled."""
+        os.makedirs(self.inbox_dir, exist_ok=True)
+        self.scan()
+        summaries = []
+        while self.pending:
+            summaries.extend(self.process(path) for path in self.settled())
+            if self.pending:
+                time.sleep(min(self.settle, 0.5))
+        return summaries
+
+    def watch(self, poll_interval=0.5, on_summary=None):
+        """Process new spreadsheets until interrupted.
+
+        Uses watchdog events when it is installed and falls back to polling
+        the folder otherwise.
+        """
+        os.makedirs(self.inbox_dir, exist_ok=True)
+        observer = None
+        if WATCHDOG_AVAILABLE:
+            observer = Observer()
+            observer.schedule(_InboxEvents(self), self.inbox_dir, recursive=False)
+            observer.start()
+        else:
+            logger.warning("watchdog is not installed; polling the inbox instead")
+        self.scan()
+        try:
+            while True:
+                if observer is None:
+                    self.scan()
+                for path in self.settled():
+                    summary = self.process(path)
+                    if on_summary:
+                        on_summary(summary)
+                time.sleep(poll_interval)
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
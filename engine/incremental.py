@@ -0,0 +1,106 @@
+"""Skip letters whose inputs have not changed since they were last written.
+
+A letter's input hash covers the content of its template, the case (the
+values that fill the placeholders, including the accounts or identifier
+lists), the officer fields printed on the letter and the output format.
+record_letter stores the hash with the output path; when a batch is
+generated again, a letter whose output file still exists and was last
+recorded with the same hash is reused instead of rendered and rewritten.
+
+Bump HASH_VERSION when a change to the renderers alters the letters they
+write, so existing outputs are regenerated.
+"""
+import hashlib
+import json
+import os
+import threading
+from db.database import letter_input_hash, letter_input_hashes
+from .errors import EngineError
+from .render import officer_replacements, output_format_for, resolve_template
+from .timing import timed
+
+HASH_VERSION = 1
+
+_digests = {}
+_lock = threading.Lock()
+
+
+def template_digest(template):
+    """sha256 of a template's bytes; files are re-read only when their mtime or size changes."""
+    if isinstance(template, bytes):
+        return hashlib.sha256(template).hexdigest()
+    stat = os.stat(template)
+    key = (stat.st_mtime, stat.st_size)
+    with _lock:
+        entry = _digests.get(template)
+        if entry and entry[0] == key:
+            return entry[1]
+    digest = hashlib.sha256()
+    with open(template, 'rb') as f:
+        for block in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(block)
+    with _lock:
+        _digests[template] = (key, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def input_hash(letter_type, case, officer, template, output_path=None, output_format=None):
+    """Hex digest of everything that goes into one letter.
+
+    ``template`` is what render() accepts: a .docx path, its bytes, or the
+    template directory. Raises EngineError when the template cannot be found.
+    """
+    if not isinstance(template, bytes) and not str(template).lower().endswith('.docx'):
+        template = resolve_template(letter_type, case, template)
+    try:
+        template_hash = template_digest(template)
+    except OSError as e:
+        raise EngineError(f"Failed to read template '{template}': {e}") from e
+    inputs = {
+        'version': HASH_VERSION,
+        'letter_type': letter_type,
+        'template': template_hash,
+        'case': case,
+        'officer': officer_replacements(officer),
+        'format': output_format or output_format_for(output_path),
+    }
+    encoded = json.dumps(inputs, sort_keys=True, default=str, ensure_ascii=False).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def is_current(output_path, digest):
+    """True when ``output_path`` exists and was last recorded with ``digest``."""
+    return bool(output_path) and os.path.exists(output_path) and letter_input_hash(output_path) == digest
+
+
+def check(letter_type, case, officer, template, output_path, output_format=None):
+    """(input hash, reusable) for one letter; reusable when its current output can be kept."""
+    digest = input_hash(letter_type, case, officer, template, output_path, output_format)
+    return digest, is_current(output_path, digest)
+
+
+@timed('check_inputs')
+def split_jobs(jobs):
+    """(jobs to render, jobs whose output is current) for batch jobs (see engine.batch.make_job).
+
+    Each job gets its ``input_hash``; jobs without an output path, or whose
+    hash cannot be computed, are always rendered.
+    """
+    for job in jobs:
+        job['input_hash'] = None
+        if job['output_path']:
+            try:
+                job['input_hash'] = input_hash(job['letter_type'], job['case'], job['officer'], job['template_dir'],
+                                               job['output_path'], job.get('output_format'))
+            except EngineError:
+                # Let the render report it
+                pass
+    recorded = letter_input_hashes(job['output_path'] for job in jobs if job['input_hash'])
+    stale, current = [], []
+    for job in jobs:
+        if (job['input_hash'] and recorded.get(job['output_path']) == job['input_hash']
+                and os.path.exists(job['output_path'])):
+            current.append(job)
+        else:
+            stale.append(job)
+    return stale, current
@@ -0,0 +1,86 @@
+from datetime import datetime
+from .identifiers import OK, first_error, normalize_identifiers
+from .templates import INTER_TEMPLATES
+from .timing import timed
+from .urls import classify_many
+
+PLATFORMS = ["WhatsApp", "Facebook", "Instagram", "Google", "Twitter", "Telegram"]
+GOOGLE_ID_TYPES = ["Gmail ID", "GAID"]
+# Platforms whose accounts are phone numbers; numbers with a foreign +CC are left as typed
+MOBILE_PLATFORMS = ["WhatsApp"]
+# Sort a mixed list of URLs and IDs into one letter per platform
+AUTO_PLATFORM = "Auto"
+
+
+def is_foreign_number(account):
+    return account.startswith('+') and not account.startswith('+91')
+
+
+def _indian_numbers(accounts):
+    return [a for a in accounts if not is_foreign_number(a)]
+
+
+def validate_accounts(platform, accounts):
+    """Return an error message for missing or malformed accounts, else None."""
+    accounts = [a.strip() for a in accounts if a and a.strip()]
+    if not accounts:
+        return "At least one URL or ID is required."
+    if platform in MOBILE_PLATFORMS:
+        return first_error(_indian_numbers(accounts), 'mobile')
+    return None
+
+
+def clean_accounts(platform, accounts):
+    """Accounts without blanks or duplicates; Indian mobile numbers are normalized."""
+    accounts = [a.strip() for a in accounts if a and a.strip()]
+    if platform in MOBILE_PLATFORMS:
+        indian = _indian_numbers(accounts)
+        if indian:
+            normalized, codes = normalize_identifiers(indian, 'mobile')
+            cleaned = {a: n for a, n, c in zip(indian, normalized.tolist(), codes.tolist()) if c == OK}
+            accounts = [cleaned.get(a, a) for a in accounts]
+    return list(dict.fromkeys(accounts))
+
+
+def to_yyyy_mm_dd(date_str):
+    if date_str and date_str != 'N/A':
+        try:
+            return datetime.strptime(date_str, "%d-%m-%Y").strftime("%Y-%m-%d")
+        except ValueError:
+            return 'Invalid Date'
+    return 'N/A'
+
+
+def build_inter_case(crime_number, ncrp_id, platform, accounts, from_date=None, to_date=None,
+                     google_id_type="Gmail ID"):
+    """Case dict consumed by render_inter_letter."""
+    return {
+        'CrimeNumber': crime_number,
+        'NCRP_ID': ncrp_id,
+        'RecipientName': 'N/A',
+        'RequestDate': datetime.now().strftime("%d-%m-%Y"),
+        'Platform': platform or 'N/A',
+        'AccountID': clean_accounts(platform, accounts),
+        'Address': 'N/A',
+        'Date_From': to_yyyy_mm_dd(from_date),
+        'Date_To': to_yyyy_mm_dd(to_date),
+        'LetterType': 'Intermediary',
+        'GoogleIdType': google_id_type,
+    }
+
+
+@timed('group_cases')
+def build_inter_cases_by_platform(crime_number, ncrp_id, accounts, from_date=None, to_date=None,
+                                  default_platform=None):
+    """Classify a mixed list of URLs and IDs with engine.urls.
+
+    Returns (cases, unknown): one case per platform with a template (Google
+    gets one per ID type), plus the values that match no platform.
+    ``default_platform`` is used for bare @handles.
+    """
+    groups, unknown = classify_many(accounts, default_platform, platforms=INTER_TEMPLATES)
+    cases = [
+        build_inter_case(crime_number, ncrp_id, platform, values, from_date, to_date, id_type or "Gmail ID")
+        for (platform, id_type), values in groups.items()
+    ]
+    return cases, unknown
@@ -0,0 +1,61 @@
+"""Date ranges for CDR and IMEI CDR requests.
+
+Officers often need call records for several windows. Overlapping or
+adjacent windows (one ending the day before the next starts) are merged with
+a sort-and-sweep, so each TSP gets one letter listing the smallest set of
+disjoint periods.
+"""
+from datetime import date, datetime
+
+DATE_FORMAT = "%d-%m-%Y"
+
+
+def parse_date(value):
+    """DD-MM-YYYY text to a date, or None if it does not parse."""
+    try:
+        return datetime.strptime(str(value).strip(), DATE_FORMAT).date()
+    except ValueError:
+        return None
+
+
+def merge_intervals(intervals):
+    """Merge overlapping or adjacent (start, end) integer pairs.
+
+    Both ends are inclusive, so (1, 3) and (4, 6) merge into (1, 6). Returns
+    the merged pairs sorted by start.
+    """
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return [(start, end) for start, end in merged]
+
+
+def merge_date_ranges(ranges):
+    """Merge (from_date, to_date) DD-MM-YYYY pairs into disjoint, sorted ranges.
+
+    Pairs that do not parse or end before they start are left out; check them
+    with engine.tsp.validate_date_range first.
+    """
+    intervals = []
+    for from_date, to_date in ranges:
+        start, end = parse_date(from_date), parse_date(to_date)
+        if start and end and start <= end:
+            intervals.append((start.toordinal(), end.toordinal()))
+    return [
+        (date.fromordinal(start).strftime(DATE_FORMAT), date.fromordinal(end).strftime(DATE_FORMAT))
+        for start, end in merge_intervals(intervals)
+    ]
+
+
+def parse_range(text):
+    """Split "DD-MM-YYYY:DD-MM-YYYY" (or "... to ...") into a (from_date, to_date) pair."""
+    text = str(text).strip()
+    for separator in (':', ' to ', ','):
+        if separator in text:
+            from_date, to_date = text.split(separator, 1)
+            return from_date.strip(), to_date.strip()
+    return text, ''
@@ -0,0 +1,185 @@
+"""One logging setup for the GUI, the command line and their worker processes.
+
+``setup_logging(name)`` routes every record through a queue to a listener
+thread that writes ``Documents/LetterGeneratorLogs/<name>.log``, so file
+writes never happen on the GUI or render thread. Files rotate by size and
+hold one JSON object per line::
+
+    {"time": "...", "level": "ERROR", "logger": "engine.batch", "message": "...",
+     "batch_id": "3f2a9c1d", "crime_number": "21/2025", "recipient": "SBI"}
+
+Context fields come from ``log_context(...)`` (for the current thread or
+task) and ``set_context(...)`` (process-wide, e.g. the GUI's current case).
+Modules log through ``logging.getLogger(__name__)``, so levels can be set
+per subsystem in the ``logging`` section of config.json::
+
+    "logging": {"level": "INFO", "levels": {"engine.render": "DEBUG", "db": "WARNING"},
+                "max_bytes": 5000000, "backup_count": 5}
+
+Process pools pass ``pool_options()`` to their executor so letters rendered
+in worker processes log to the same file.
+"""
+import atexit
+import contextlib
+import contextvars
+import copy
+import json
+import logging
+import logging.handlers
+import multiprocessing
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+CONFIG_FILE = 'config.json'
+LOG_DIR = os.path.join(Path.home(), 'Documents', 'LetterGeneratorLogs')
+DEFAULT_LEVEL = 'INFO'
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 5
+# LogRecord attributes that are not extra fields
+RECORD_FIELDS = set(vars(logging.makeLogRecord({}))) | {'message', 'asctime', 'context'}
+
+_context = contextvars.ContextVar('log_context', default={})
+_process_context = {}
+_exception_formatter = logging.Formatter()
+_state = {'queue': None, 'listener': None, 'levels': None, 'path': None}
+
+
+def new_batch_id():
+    return uuid.uuid4().hex[:8]
+
+
+def set_context(**fields):
+    """Add fields to every record of this process; a None value removes the field."""
+    for key, value in fields.items():
+        if value is None:
+            _process_context.pop(key, None)
+        else:
+            _process_context[key] = value
+
+
+def current_context():
+    """The context fields in effect here, e.g. to hand to a pool worker."""
+    return {**_process_context, **_context.get()}
+
+
+def add_context(**fields):
+    """Add fields for the rest of the enclosing log_context() block."""
+    _context.set({**_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+
+
+@contextlib.contextmanager
+def log_context(**fields):
+    """Add fields to the records logged inside the block on this thread or task."""
+    token = _context.set({**_context.get(), **{k: v for k, v in fields.items() if v is not None}})
+    try:
+        yield
+    finally:
+        _context.reset(token)
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        entry.update(getattr(record, 'context', None) or {})
+        entry.update((k, v) for k, v in vars(record).items() if k not in RECORD_FIELDS)
+        if record.process != os.getpid():
+            entry['process'] = record.process
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def load_settings(config=None):
+    if config is None:
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            config = {}
+    settings = config.get('logging') if isinstance(config, dict) else None
+    return settings if isinstance(settings, dict) else {}
+
+
+def apply_levels(level, levels):
+    logging.getLogger().setLevel(str(level).upper())
+    for name, value in (levels or {}).items():
+        logging.getLogger(name).setLevel(str(value).upper())
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """Queues records with their message formatted and the context of the logging thread."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg = record.message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        record.context = current_context()
+        return record
+
+
+def setup_logging(name='app', config=None, log_dir=None):
+    """Send all logging to ``<log_dir>/<name>.log`` through a background listener.
+
+    Safe to call more than once; only the first call configures logging.
+    Returns the log file path.
+    """
+    if _state['listener'] is not None:
+        return _state['path']
+    settings = load_settings(config)
+    log_dir = log_dir or settings.get('dir') or LOG_DIR
+    path = os.path.join(log_dir, f"{name}.log")
+    os.makedirs(log_dir, exist_ok=True)
+    file_handler = logging.handlers.RotatingFileHandler(
+        path, maxBytes=int(settings.get('max_bytes', MAX_BYTES)),
+        backupCount=int(settings.get('backup_count', BACKUP_COUNT)), encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter())
+
+    # A multiprocessing queue, so worker processes can log through it as well
+    queue = multiprocessing.Queue(-1)
+    listener = logging.handlers.QueueListener(queue, file_handler)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(ContextQueueHandler(queue))
+    levels = (settings.get('level', DEFAULT_LEVEL), settings.get('levels') or {})
+    apply_levels(*levels)
+    listener.start()
+    _state.update(queue=queue, listener=listener, levels=levels, path=path)
+    atexit.register(shutdown)
+    return path
+
+
+def shutdown():
+    """Write out the queued records and stop the listener."""
+    listener = _state['listener']
+    if listener is not None:
+        _state['listener'] = None
+        listener.stop()
+        for handler in listener.handlers:
+            handler.close()
+
+
+def _init_worker(queue, levels):
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    root.addHandler(ContextQueueHandler(queue))
+    apply_levels(*levels)
+
+
+def pool_options():
+    """Executor keyword arguments that connect worker processes to the log queue."""
+    if _state['listener'] is None:
+        return {}
+    return {'initializer': _init_worker, 'initargs': (_state['queue'], _state['levels'])}
@@ -0,0 +1,218 @@
+"""Tail, search and slice large log files without reading them into memory.
+
+Files are memory-mapped only for the duration of each call, so the log
+handler can still rotate (rename) them on Windows while a viewer is open.
+Searches run in steps of CHUNK_SIZE bytes; the GUI runs one step per event
+loop turn and stays responsive on files of any size. A search keeps only
+the byte offsets of matching lines.
+
+Lines are the JSON records written by engine.logs, or the older
+``time - LEVEL - message`` text lines.
+"""
+import glob
+import json
+import mmap
+import os
+import re
+from array import array
+from .logs import LOG_DIR
+
+LEVELS = ('DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL')
+CHUNK_SIZE = 4 * 1024 * 1024
+TAIL_LINES = 5000
+MAX_MATCHES = 1_000_000
+
+LEVEL_RE = re.compile(rb'"level": "([A-Z]+)"|^\S+ \S+ - ([A-Z]+) - ')
+TEXT_LINE_RE = re.compile(r'^(\S+ \S+) - ([A-Z]+) - (.*)$', re.S)
+
+
+def log_files(log_dir=None):
+    """Log files in the logs directory, newest first, rotated backups included."""
+    paths = glob.glob(os.path.join(log_dir or LOG_DIR, '*.log')) + glob.glob(os.path.join(log_dir or LOG_DIR, '*.log.*'))
+    return sorted(paths, key=os.path.getmtime, reverse=True)
+
+
+def parse_line(text):
+    """(time, level, batch id, message) of one log line."""
+    if text.startswith('{'):
+        try:
+            entry = json.loads(text)
+        except ValueError:
+            entry = None
+        if isinstance(entry, dict):
+            message = entry.get('message', '')
+            if entry.get('exception'):
+                message += ' | ' + entry['exception'].strip().splitlines()[-1]
+            return (entry.get('time', ''), entry.get('level', ''), entry.get('batch_id', ''),
+                    message.replace('\n', ' | '))
+    match = TEXT_LINE_RE.match(text)
+    if match:
+        return match.group(1), match.group(2), '', match.group(3).replace('\n', ' | ')
+    return '', '', '', text
+
+
+class LogFile:
+    """One log file; every read maps it, reads and unmaps it again."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def size(self):
+        try:
+            return os.path.getsize(self.path)
+        except OSError:
+            return 0
+
+    def _map(self):
+        """(file, mmap) or None for a missing or empty file."""
+        try:
+            f = open(self.path, 'rb')
+        except OSError:
+            return None
+        try:
+            return f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            f.close()
+            return None
+
+    def tail(self, count=TAIL_LINES):
+        """Offsets of the last ``count`` lines, oldest first; only the end of the file is touched."""
+        mapped = self._map()
+        if mapped is None:
+            return array('Q')
+        f, mm = mapped
+        try:
+            offsets = []
+            end = len(mm)
+            if end and mm[end - 1:end] == b'\n':
+                end -= 1
+            while end > 0 and len(offsets) < count:
+                start = mm.rfind(b'\n', 0, end) + 1
+                offsets.append(start)
+                end = start - 1
+            return array('Q', reversed(offsets))
+        finally:
+            mm.close()
+            f.close()
+
+    def lines(self, offsets, start, count):
+        """Decoded lines at ``offsets[start:start + count]``."""
+        mapped = self._map()
+        if mapped is None:
+            return []
+        f, mm = mapped
+        try:
+            result = []
+            for offset in offsets[start:start + count]:
+                if offset >= len(mm):
+                    result.append('')
+                    continue
+                end = mm.find(b'\n', offset)
+                result.append(mm[offset:end if end != -1 else len(mm)].decode('utf-8', 'replace').rstrip('\r'))
+            return result
+        finally:
+            mm.close()
+            f.close()
+
+    def export(self, offsets, path):
+        """Write the lines at ``offsets`` to ``path``; returns the number written."""
+        mapped = self._map()
+        if mapped is None:
+            return 0
+        f, mm = mapped
+        try:
+            with open(path, 'wb') as out:
+                for offset in offsets:
+                    end = mm.find(b'\n', offset)
+                    out.write(mm[offset:end if end != -1 else len(mm)].rstrip(b'\r') + b'\n')
+            return len(offsets)
+        finally:
+            mm.close()
+            f.close()
+
+
+class LogSearch:
+    """Incremental search of a LogFile for lines matching a regex, levels and a batch id.
+
+    Call ``step()`` until ``done``; ``matches`` holds the offsets of the
+    matching lines found so far, in file order. Raises re.error for an
+    invalid pattern.
+    """
+
+    def __init__(self, log, pattern='', levels=None, batch_id='', ignore_case=True):
+        self.log = log
+        self.levels = {level.encode('ascii') for level in levels} if levels else None
+        self.batch = f'"batch_id": "{batch_id}"'.encode('utf-8') if batch_id else None
+        flags = re.MULTILINE | (re.IGNORECASE if ignore_case else 0)
+        if pattern:
+            self.driver = re.compile(pattern.encode('utf-8'), flags)
+        elif self.batch:
+            self.driver = re.compile(re.escape(self.batch))
+        else:
+            # Every line; the level filter picks from them
+            self.driver = re.compile(rb'^', re.MULTILINE)
+        self.matches = array('Q')
+        self.position = 0
+        self.end = log.size()
+        self.done = self.end == 0
+        self.truncated = False
+
+    @property
+    def progress(self):
+        return self.position / self.end if self.end else 1.0
+
+    def _accept(self, line):
+        if self.batch is not None and self.batch not in line:
+            return False
+        if self.levels is not None:
+            match = LEVEL_RE.search(line)
+            if not match or (match.group(1) or match.group(2)) not in self.levels:
+                return False
+        return True
+
+    def step(self, budget=CHUNK_SIZE):
+        """Scan the next ``budget`` bytes; returns the number of new matches."""
+        if self.done:
+            return 0
+        mapped = self.log._map()
+        if mapped is None:
+            self.done = True
+            return 0
+        f, mm = mapped
+        found = 0
+        try:
+            end = min(self.end, len(mm))
+            # Finish the line the budget ends in, so no line is split between steps
+            limit = mm.find(b'\n', min(end, self.position + budget), end)
+            limit = end if limit == -1 else limit + 1
+            pos = self.position
+            while pos < limit:
+                match = self.driver.search(mm, pos, limit)
+                if match is None:
+                    pos = limit
+                    break
+                line_start = mm.rfind(b'\n', 0, match.start()) + 1
+                line_end = mm.find(b'\n', match.start(), limit)
+                if line_end == -1:
+                    line_end = limit
+                if self._accept(mm[line_start:line_end]):
+                    self.matches.append(line_start)
+                    found += 1
+                    if len(self.matches) >= MAX_MATCHES:
+                        self.truncated = True
+                        pos = end
+                        break
+                pos = line_end + 1
+            self.position = min(pos, end)
+            self.done = self.position >= end
+        finally:
+            mm.close()
+            f.close()
+        return found
+
+    def run(self):
+        """Search to the end of the file in one go (for scripts)."""
+        while not self.done:
+            self.step()
+        return self.matches
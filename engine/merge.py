@@ -0,0 +1,248 @@
+"""One print-ready .docx for a whole batch.
+
+``DocumentMerger`` appends rendered letters to the first one at the XML
+level. Each letter is visited once, so merging is linear in the total size:
+
+* the body is moved over and each letter's section properties move onto
+  its last paragraph as a section break, so every letter starts on a new
+  page with its own page setup;
+* images and hyperlinks are re-related to the merged part (identical images
+  are stored once);
+* the numbering definitions a letter uses are copied under fresh ids so
+  lists restart in every letter, and styles missing from the first letter
+  are added;
+* drawing ids are renumbered so Word does not report duplicates.
+
+Headers and footers are not copied; a section without its own header or
+footer reference continues the previous one, which is what letters from the
+same template need.
+"""
+import copy
+import io
+import logging
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+from .batch import run_jobs
+from .errors import InvalidRequestError, OutputError, RenderError
+from .render import save_document
+from .timing import timed
+
+logger = logging.getLogger(__name__)
+
+R_ATTRIBUTES = (qn('r:embed'), qn('r:link'), qn('r:id'))
+HEADER_FOOTER_TAGS = (qn('w:headerReference'), qn('w:footerReference'))
+NUM_ID, DOC_PR, SECT_PR = qn('w:numId'), qn('wp:docPr'), qn('w:sectPr')
+
+
+def _as_document(letter):
+    if isinstance(letter, bytes):
+        return Document(io.BytesIO(letter))
+    return letter
+
+
+class DocumentMerger:
+    def __init__(self, first):
+        """Start the merged document from ``first`` (a Document or .docx bytes)."""
+        self.doc = _as_document(first)
+        self.part = self.doc.part
+        self.body = self.doc.element.body
+        self.letters = 1
+        self.styles = self.doc.styles.element
+        self.style_ids = {s.get(qn('w:styleId')) for s in self.styles.iterchildren(qn('w:style'))}
+        self.numbering = None
+        self.next_abstract_id = self.next_num_id = 0
+        self.next_drawing_id = 1
+        # Kept as the last child of the body; finding it again would rescan
+        # every letter merged so far
+        self.sect_pr = self.body.find(SECT_PR)
+        for doc_pr in self.body.iter(qn('wp:docPr')):
+            self.next_drawing_id = max(self.next_drawing_id, int(doc_pr.get('id', 0)) + 1)
+
+    def _numbering(self):
+        if self.numbering is None:
+            self.numbering = self.part.numbering_part.element
+            ids = [int(a.get(qn('w:abstractNumId'))) for a in self.numbering.iterchildren(qn('w:abstractNum'))]
+            nums = [int(n.get(qn('w:numId'))) for n in self.numbering.iterchildren(qn('w:num'))]
+            self.next_abstract_id = max(ids, default=-1) + 1
+            self.next_num_id = max(nums, default=0) + 1
+        return self.numbering
+
+    def _copy_numbering(self, other):
+        """Copy the lists another letter's body uses under new ids; returns {old numId: new numId}."""
+        used = {n.get(qn('w:val')) for n in other.element.body.iter(NUM_ID)} - {'0'}
+        if not used:
+            return {}
+        try:
+            source = other.part.numbering_part.element
+        except (KeyError, NotImplementedError):
+            return {}
+        nums = [n for n in source.iterchildren(qn('w:num')) if n.get(qn('w:numId')) in used]
+        used_abstracts = {n.find(qn('w:abstractNumId')).get(qn('w:val')) for n in nums
+                          if n.find(qn('w:abstractNumId')) is not None}
+        target = self._numbering()
+        abstract_map, num_map = {}, {}
+        first_num = next(target.iterchildren(qn('w:num')), None)
+        for abstract in source.iterchildren(qn('w:abstractNum')):
+            if abstract.get(qn('w:abstractNumId')) not in used_abstracts:
+                continue
+            new = copy.deepcopy(abstract)
+            abstract_map[abstract.get(qn('w:abstractNumId'))] = str(self.next_abstract_id)
+            new.set(qn('w:abstractNumId'), str(self.next_abstract_id))
+            # nsid identifies a list to Word; drop it so copies are not treated as one list
+            for nsid in new.findall(qn('w:nsid')):
+                new.remove(nsid)
+            self.next_abstract_id += 1
+            # Schema order: every abstractNum comes before the first num
+            if first_num is not None:
+                first_num.addprevious(new)
+            else:
+                target.append(new)
+        for num in nums:
+            new = copy.deepcopy(num)
+            num_map[num.get(qn('w:numId'))] = str(self.next_num_id)
+            new.set(qn('w:numId'), str(self.next_num_id))
+            abstract_ref = new.find(qn('w:abstractNumId'))
+            if abstract_ref is not None:
+                abstract_ref.set(qn('w:val'), abstract_map.get(abstract_ref.get(qn('w:val')), abstract_ref.get(qn('w:val'))))
+            self.next_num_id += 1
+            target.append(new)
+        return num_map
+
+    def _copy_styles(self, other):
+        for style in other.styles.element.iterchildren(qn('w:style')):
+            style_id = style.get(qn('w:styleId'))
+            if style_id not in self.style_ids:
+                self.styles.append(copy.deepcopy(style))
+                self.style_ids.add(style_id)
+
+    def _relate(self, other, rid, cache):
+        """Relationship id in the merged part for ``rid`` of another letter."""
+        if rid in cache:
+            return cache[rid]
+        rel = other.part.rels[rid]
+        if rel.is_external:
+            new_rid = self.part.relate_to(rel.target_ref, rel.reltype, is_external=True)
+        elif rel.reltype == RT.IMAGE:
+            image_part = self.part.package.get_or_add_image_part(io.BytesIO(rel.target_part.blob))
+            new_rid = self.part.relate_to(image_part, RT.IMAGE)
+        else:
+            logger.warning("Merged letter drops a %s relationship", rel.reltype.rsplit('/', 1)[-1])
+            new_rid = None
+        cache[rid] = new_rid
+        return new_rid
+
+    def _end_section(self, final_sect_pr):
+        """End the current letter's section so the next letter starts on a new page.
+
+        The section properties move onto the letter's last paragraph; a new
+        paragraph is only added when the letter ends with a table or already
+        ends a section, so no blank page is created.
+        """
+        sect_pr = copy.deepcopy(final_sect_pr)
+        section_type = sect_pr.find(qn('w:type'))
+        if section_type is not None:
+            section_type.set(qn('w:val'), 'nextPage')
+        last = final_sect_pr.getprevious()
+        if last is None or last.tag != qn('w:p') or last.find(f"{qn('w:pPr')}/{SECT_PR}") is not None:
+            last = self.body.makeelement(qn('w:p'), {})
+            final_sect_pr.addprevious(last)
+        p_pr = last.find(qn('w:pPr'))
+        if p_pr is None:
+            p_pr = last.makeelement(qn('w:pPr'), {})
+            last.insert(0, p_pr)
+        change = p_pr.find(qn('w:pPrChange'))
+        if change is not None:
+            change.addprevious(sect_pr)
+        else:
+            p_pr.append(sect_pr)
+
+    @timed('merge')
+    def append(self, letter):
+        """Add one letter (a Document or .docx bytes) on a new page."""
+        other = _as_document(letter)
+        num_map = self._copy_numbering(other)
+        self._copy_styles(other)
+
+        final_sect_pr = self.sect_pr
+        self._end_section(final_sect_pr)
+
+        rel_cache = {}
+        rels = other.part.rels
+        val = qn('w:val')
+        for element in list(other.element.body):
+            if element.tag == SECT_PR:
+                continue
+            for node in element.iter():
+                if node.attrib:
+                    for attribute in R_ATTRIBUTES:
+                        rid = node.get(attribute)
+                        if rid is not None and rid in rels:
+                            new_rid = self._relate(other, rid, rel_cache)
+                            if new_rid:
+                                node.set(attribute, new_rid)
+                if node.tag == NUM_ID and node.get(val) in num_map:
+                    node.set(val, num_map[node.get(val)])
+                elif node.tag == DOC_PR:
+                    node.set('id', str(self.next_drawing_id))
+                    self.next_drawing_id += 1
+            final_sect_pr.addprevious(element)
+
+        # Later letters keep their own page setup; without header/footer
+        # references they continue those of the first letter
+        other_sect_pr = other.element.body.find(SECT_PR)
+        if other_sect_pr is not None:
+            replacement = copy.deepcopy(other_sect_pr)
+            for reference in [c for c in replacement if c.tag in HEADER_FOOTER_TAGS]:
+                replacement.remove(reference)
+            self.body.replace(final_sect_pr, replacement)
+            self.sect_pr = replacement
+        self.letters += 1
+        return self
+
+    def save(self, output_path):
+        return save_document(self.doc, output_path)
+
+
+def merge_documents(letters, output_path=None):
+    """Merge letters (Documents or .docx bytes) in order into one document.
+
+    Saves to ``output_path`` when given and returns the path, else returns the
+    merged Document.
+    """
+    letters = iter(letters)
+    try:
+        merger = DocumentMerger(next(letters))
+    except StopIteration:
+        raise RenderError("There are no letters to merge")
+    for letter in letters:
+        merger.append(letter)
+    return merger.save(output_path) if output_path else merger.doc
+
+
+def export_merged(jobs, output_path, workers=1, executor='process', on_result=None):
+    """Render every job and write them, in job order, into one .docx.
+
+    Returns the run_jobs results; the ``output_path`` of each letter is the
+    merged file.
+    """
+    if any(job.get('output_format', 'docx') != 'docx' for job in jobs):
+        raise InvalidRequestError("Only .docx letters can be merged into one document")
+    jobs = [dict(job, output_path=None) for job in jobs]
+    results = run_jobs(jobs, workers, executor, on_result=on_result)
+    merger = None
+    for result in results:
+        data = result.pop('data', None)
+        if result['status'] != 'ok':
+            continue
+        try:
+            if merger is None:
+                merger = DocumentMerger(data)
+            else:
+                merger.append(data)
+        except Exception as e:
+            raise OutputError(f"Failed to merge the letter for {result['recipient']}: {e}") from e
+        result['output_path'] = output_path
+    if merger is not None:
+        merger.save(output_path)
+    return results
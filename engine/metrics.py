@@ -0,0 +1,305 @@
+"""In-process generation metrics in the Prometheus text format.
+
+Counters and histograms for letters generated, render latency, batch sizes,
+errors by category, database latency and template cache lookups. Nothing
+is recorded until ``start()`` enables collection, so the calls sprinkled
+through the engine cost one flag check when metrics are off.
+
+Metrics are exported to a file every ``interval`` seconds (and once more at
+exit) and/or served at ``http://127.0.0.1:<port>/metrics``. The GUI and the
+command line read the ``metrics`` section of config.json::
+
+    "metrics": {"file": "D:/metrics/station1.prom", "interval": 15, "port": 9464}
+
+The generation service also answers ``GET /metrics`` on its own port.
+"""
+import atexit
+import contextlib
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from db.database import add_call_hook
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = 'config.json'
+PREFIX = 'letter_generator_'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+
+
+class _State:
+    enabled = False
+    exit_hook = False
+
+
+_state = _State()
+_lock = threading.Lock()
+_metrics = []
+_exporters = []
+
+
+def _labels_text(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (str(v).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') for _, v in pairs)
+    return '{' + ','.join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + '}'
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name, documentation, labels=()):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values = {}
+        _metrics.append(self)
+
+    def inc(self, amount=1, **labels):
+        if not _state.enabled:
+            return
+        key = tuple(labels.get(name, '') for name in self.labels)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def exposition(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels_text(self.labels, key)} {_number(value)}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name, documentation, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets) + (float('inf'),)
+        # label values -> [count per bucket (not cumulative), sum, count]
+        self.values = {}
+        _metrics.append(self)
+
+    def observe(self, value, **labels):
+        if not _state.enabled:
+            return
+        key = tuple(labels.get(name, '') for name in self.labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with _lock:
+            entry = self.values.get(key)
+            if entry is None:
+                entry = self.values[key] = [[0] * len(self.buckets), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    def time(self, **labels):
+        """Decorator observing the seconds each call takes."""
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                if not _state.enabled:
+                    return function(*args, **kwargs)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.observe(time.perf_counter() - start, **labels)
+            return wrapper
+        return decorate
+
+    @contextlib.contextmanager
+    def timer(self, **labels):
+        """Context manager observing the seconds its block takes."""
+        if not _state.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def exposition(self):
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self.values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                labels = _labels_text(self.labels, key, [('le', _number(bound))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels_text(self.labels, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels_text(self.labels, key)} {count}")
+        return lines
+
+
+LETTERS = Counter('letters_total', "Letters generated, by letter type.", ['letter_type'])
+RENDER_SECONDS = Histogram('render_seconds', "Time to render and save one letter.", ['letter_type'])
+BATCH_LETTERS = Histogram('batch_letters', "Letters per batch.", buckets=SIZE_BUCKETS)
+ERRORS = Counter('errors_total', "Failed letters and batches, by error category.", ['category'])
+DB_SECONDS = Histogram('db_seconds', "Latency of database calls.", ['operation'])
+TEMPLATE_CACHE = Counter('template_cache_requests_total', "Template cache lookups, by hit or miss.", ['result'])
+
+add_call_hook(lambda operation: DB_SECONDS.timer(operation=operation))
+
+
+def error_category(error):
+    """Category label of an exception, an "ErrorType: message" string or a plain category."""
+    if isinstance(error, BaseException):
+        return type(error).__name__
+    return str(error).split(':', 1)[0].strip() or 'Unknown'
+
+
+def count_error(error):
+    """Count a failure that stopped a batch or letter, e.g. an unreadable sheet."""
+    ERRORS.inc(category=error_category(error))
+
+
+def letter_done(letter_type, seconds, error=None):
+    """Record one finished letter: rendered in ``seconds``, or failed with ``error``."""
+    if not _state.enabled:
+        return
+    if error:
+        count_error(error)
+    else:
+        LETTERS.inc(letter_type=letter_type)
+        RENDER_SECONDS.observe(seconds, letter_type=letter_type)
+
+
+def exposition():
+    """All metrics in the Prometheus text format."""
+    with _lock:
+        lines = [line for metric in _metrics for line in metric.exposition()]
+    return '\n'.join(lines) + '\n'
+
+
+def write_file(path):
+    """Write the exposition to ``path`` atomically."""
+    partial = f"{path}.part"
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    with open(partial, 'w', encoding='utf-8') as f:
+        f.write(exposition())
+    os.replace(partial, path)
+
+
+class FileExporter:
+    """Rewrites the metrics file every ``interval`` seconds on a daemon thread."""
+
+    def __init__(self, path, interval=15):
+        self.path = path
+        self.interval = interval
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='metrics-file', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.write()
+
+    def write(self):
+        try:
+            write_file(self.path)
+        except OSError as e:
+            logger.error("Failed to write metrics to %s: %s", self.path, e)
+
+    def stop(self):
+        self.stopped.set()
+        self.write()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        payload = exposition().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MetricsServer:
+    """``GET /metrics`` on a loopback port, served from a daemon thread."""
+
+    def __init__(self, port, host='127.0.0.1'):
+        if host not in LOOPBACK_HOSTS:
+            raise ValueError(f"The metrics endpoint only listens on localhost, not {host}")
+        self.server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        self.port = self.server.server_address[1]
+        self.thread = threading.Thread(target=self.server.serve_forever, name='metrics-http', daemon=True)
+
+    def start(self):
+        self.thread.start()
+        logger.info("Metrics served on http://127.0.0.1:%s/metrics", self.port)
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def enabled():
+    return _state.enabled
+
+
+def start(file=None, interval=15, port=None, host='127.0.0.1'):
+    """Enable collection and start the file and/or HTTP exporters.
+
+    Returns the MetricsServer when a port is given. Raises OSError when the
+    port is taken.
+    """
+    _state.enabled = True
+    server = None
+    if file:
+        _exporters.append(FileExporter(file, interval).start())
+    if port is not None:
+        server = MetricsServer(port, host).start()
+        _exporters.append(server)
+    if not _state.exit_hook:
+        atexit.register(stop)
+        _state.exit_hook = True
+    return server
+
+
+def start_from_config(config=None):
+    """Start metrics from the ``metrics`` section of config.json; does nothing without one."""
+    if config is None:
+        try:
+            with open(CONFIG_FILE, 'r') as f:
+                config = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+    settings = config.get('metrics') if isinstance(config, dict) else None
+    if not settings:
+        return None
+    try:
+        return start(settings.get('file'), settings.get('interval', 15), settings.get('port'))
+    except (OSError, ValueError) as e:
+        logger.error("Failed to start metrics: %s", e)
+        return None
+
+
+def stop():
+    """Stop the exporters, writing the metrics file one last time."""
+    while _exporters:
+        _exporters.pop().stop()
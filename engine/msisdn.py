@@ -0,0 +1,170 @@
+"""Offline operator lookup for Indian mobile numbers.
+
+Built from a local MSISDN series file (``prefix,operator`` per line, e.g.
+``98450,Airtel``) and an optional ported-number file (``number,operator``)
+whose entries take precedence over the series. Prefixes of any length are
+flattened into sorted, non-overlapping ranges of the 10-digit number space,
+so single lookups are a bisect and bulk lookups one numpy searchsorted.
+The longest matching prefix wins.
+"""
+import bisect
+import csv
+import json
+import os
+from pathlib import Path
+import numpy as np
+from .errors import InputDataError
+from .identifiers import OK, normalize_identifiers
+from .templates import CONFIG_FILE
+from .tsp import TSP_NAMES
+
+NUMBER_SPACE = 10 ** 10
+DEFAULT_SERIES_FILE = os.path.join(Path(__file__).parent.parent, 'db', 'msisdn_series.csv')
+DEFAULT_PORTS_FILE = os.path.join(Path(__file__).parent.parent, 'db', 'msisdn_ports.csv')
+
+OPERATOR_ALIASES = {
+    'bharti airtel': 'Airtel',
+    'reliance jio': 'Jio',
+    'jio': 'Jio',
+    'vi': 'Vodafone',
+    'idea': 'Vodafone',
+    'vodafone idea': 'Vodafone',
+    'bsnl': 'BSNL',
+}
+
+
+def canonical_operator(name):
+    """Map an operator name from a series file to one of TSP_NAMES, or None."""
+    name = str(name).strip()
+    lowered = name.lower()
+    if lowered in OPERATOR_ALIASES:
+        return OPERATOR_ALIASES[lowered]
+    for tsp in TSP_NAMES:
+        if tsp.lower() == lowered:
+            return tsp
+    return None
+
+
+def to_msisdn(number):
+    """Return a number as a 10-digit int, dropping +91/91/0 prefixes, or None."""
+    digits = ''.join(ch for ch in str(number) if ch.isdigit())
+    if len(digits) == 12 and digits.startswith('91'):
+        digits = digits[2:]
+    elif len(digits) == 11 and digits.startswith('0'):
+        digits = digits[1:]
+    return int(digits) if len(digits) == 10 else None
+
+
+def _read_pairs(path):
+    """Yield (key, operator) rows of a two-column CSV, skipping a header or comments."""
+    with open(path, 'r', encoding='utf-8', newline='') as f:
+        for row in csv.reader(f):
+            if len(row) < 2 or not row[0].strip() or row[0].lstrip().startswith('#'):
+                continue
+            key = row[0].strip()
+            if key.lstrip('+').isdigit():
+                yield key, row[1]
+
+
+class MsisdnIndex:
+    def __init__(self, series, ports=None):
+        """``series`` maps digit prefixes to operators, ``ports`` full numbers to operators."""
+        self.operators = list(TSP_NAMES)
+        codes = {name: i for i, name in enumerate(self.operators)}
+
+        prefixes = sorted((p, codes[op]) for p, op in series.items() if op in codes and 0 < len(p) <= 10)
+        ranges = [(int(p) * 10 ** (10 - len(p)), (int(p) + 1) * 10 ** (10 - len(p)), len(p), code)
+                  for p, code in prefixes]
+        bounds = np.unique(np.array([b for r in ranges for b in r[:2]] + [0, NUMBER_SPACE], dtype=np.int64))
+        segment_codes = np.full(len(bounds), -1, dtype=np.int16)
+        # Paint shorter prefixes first so longer, more specific ones overwrite them
+        for start, end, _, code in sorted(ranges, key=lambda r: r[2]):
+            lo, hi = np.searchsorted(bounds, [start, end])
+            segment_codes[lo:hi] = code
+        self.bounds = bounds
+        self.codes = segment_codes
+        self._bounds_list = bounds.tolist()
+        self._codes_list = segment_codes.tolist()
+
+        ported = {to_msisdn(n): codes[op] for n, op in (ports or {}).items() if op in codes}
+        ported = sorted((n, code) for n, code in ported.items() if n is not None)
+        self.ported = np.array([n for n, _ in ported], dtype=np.int64)
+        self.ported_codes = np.array([c for _, c in ported], dtype=np.int16)
+        self._ported = dict(ported)
+
+    @classmethod
+    def from_files(cls, series_path, ports_path=None):
+        if not os.path.exists(series_path):
+            raise InputDataError(f"MSISDN series file not found: {series_path}")
+        series = {}
+        for prefix, operator in _read_pairs(series_path):
+            operator = canonical_operator(operator)
+            if operator:
+                series[prefix] = operator
+        ports = {}
+        if ports_path and os.path.exists(ports_path):
+            for number, operator in _read_pairs(ports_path):
+                number, operator = to_msisdn(number), canonical_operator(operator)
+                if number is not None and operator:
+                    ports[number] = operator
+        return cls(series, ports)
+
+    def lookup(self, number):
+        """Operator for one number, or None if it is not in any series."""
+        msisdn = to_msisdn(number)
+        if msisdn is None:
+            return None
+        code = self._ported.get(msisdn)
+        if code is None:
+            code = self._codes_list[bisect.bisect_right(self._bounds_list, msisdn) - 1]
+        return self.operators[code] if code >= 0 else None
+
+    def lookup_codes(self, numbers):
+        """Operator codes (index into ``operators``, -1 unknown) for an int64 array of 10-digit numbers."""
+        numbers = np.asarray(numbers, dtype=np.int64)
+        valid = (numbers >= 0) & (numbers < NUMBER_SPACE)
+        codes = self.codes[np.searchsorted(self.bounds, np.clip(numbers, 0, NUMBER_SPACE - 1), side='right') - 1]
+        codes = np.where(valid, codes, -1)
+        if len(self.ported):
+            pos = np.searchsorted(self.ported, numbers).clip(0, len(self.ported) - 1)
+            hit = self.ported[pos] == numbers
+            codes = np.where(hit, self.ported_codes[pos], codes)
+        return codes
+
+    def lookup_many(self, numbers):
+        """Operator names (None when unknown) for a list of numbers in any common format."""
+        normalized, codes = normalize_identifiers(numbers, 'mobile')
+        msisdns = np.where(codes == OK, normalized, '-1').astype(np.int64)
+        names = np.array(self.operators + [None], dtype=object)
+        return names[self.lookup_codes(msisdns)].tolist()
+
+    def split(self, numbers):
+        """Group numbers by operator; returns ({operator: [numbers]}, [unknown numbers])."""
+        groups, unknown = {}, []
+        for number, operator in zip(numbers, self.lookup_many(numbers)):
+            if operator:
+                groups.setdefault(operator, []).append(number)
+            else:
+                unknown.append(number)
+        return groups, unknown
+
+
+_index = None
+
+
+def load_index():
+    """The index for the series/ports files named in config.json (cached, reloaded when they change)."""
+    global _index
+    series_path, ports_path = DEFAULT_SERIES_FILE, DEFAULT_PORTS_FILE
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            config = json.load(f)
+        series_path = config.get('msisdn_series', series_path)
+        ports_path = config.get('msisdn_ports', ports_path)
+    except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+        pass
+    stamp = tuple(os.path.getmtime(p) if os.path.exists(p) else None for p in (series_path, ports_path))
+    key = (series_path, ports_path, stamp)
+    if _index is None or _index[0] != key:
+        _index = (key, MsisdnIndex.from_files(series_path, ports_path))
+    return _index[1]
@@ -0,0 +1,646 @@
+"""PDF output for letters.
+
+``document_to_pdf`` lays out a filled python-docx Document with reportlab, so
+letters can be written as PDF without Word. It follows the template's own
+structure rather than a fixed layout:
+
+* page size and margins come from the section;
+* paragraphs keep their alignment, indents, spacing and line spacing, and
+  runs their font size, bold, italic, underline and colour, with
+  paragraph and character styles resolved through ``basedOn``;
+* numbered and bulleted lists are numbered from numbering.xml;
+* tables keep their column widths, merged cells and borders;
+* pictures are drawn at their size, and floating pictures (the logo) have
+  the following text wrapped around them;
+* non-empty headers and footers are drawn on every page.
+
+Word fonts map to the nearest PDF base font (serif to Times, sans-serif to
+Helvetica, monospace to Courier). Text boxes, shapes and fields other than
+their last computed result are not drawn.
+"""
+import io
+import logging
+import os
+from docx.oxml.ns import qn
+from .errors import OutputError, RenderError
+from .timing import timed
+
+try:
+    from reportlab import rl_config
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_JUSTIFY, TA_LEFT, TA_RIGHT
+    from reportlab.lib.styles import ParagraphStyle
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+    from reportlab.platypus import (Image, ImageAndFlowables, PageBreak, Paragraph, SimpleDocTemplate, Spacer,
+                                    Table, TableStyle)
+    # Images are embedded as binary streams; the pure-Python ASCII85 encoder
+    # otherwise takes about a third of the time of a letter with a logo
+    rl_config.useA85 = 0
+    REPORTLAB_AVAILABLE = True
+except ImportError:
+    REPORTLAB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SANS_FONTS = ('arial', 'calibri', 'helvetica', 'verdana', 'segoe', 'tahoma', 'trebuchet', 'aptos', 'liberation sans')
+MONO_FONTS = ('courier', 'consolas', 'mono')
+ALIGNMENTS = {'center': 'center', 'right': 'right', 'end': 'right', 'both': 'justify', 'distribute': 'justify'}
+OFF_VALUES = ('0', 'false', 'off', 'none')
+TAB = '&nbsp;' * 4
+DEFAULT_CELL_PADDING = 5.4  # Word's default left/right cell margin of 108 twips
+
+W_P, W_R, W_TBL, W_T, W_VAL = qn('w:p'), qn('w:r'), qn('w:tbl'), qn('w:t'), qn('w:val')
+# Containers whose runs are part of the paragraph text
+RUN_CONTAINERS = {qn('w:hyperlink'), qn('w:ins'), qn('w:smartTag'), qn('w:sdt'), qn('w:sdtContent'),
+                  qn('w:fldSimple'), qn('w:customXml')}
+
+
+def _twips(value):
+    return int(value) / 20 if value not in (None, '') else None
+
+
+def _on(element):
+    """A w:b / w:i style toggle: present and not switched off."""
+    return element.get(W_VAL, 'true').lower() not in OFF_VALUES
+
+
+def pdf_font(name, bold=False, italic=False):
+    """The PDF base font closest to a Word font."""
+    lowered = (name or '').lower()
+    if any(font in lowered for font in MONO_FONTS):
+        family = ('Courier', 'Courier-Bold', 'Courier-Oblique', 'Courier-BoldOblique')
+    elif any(font in lowered for font in SANS_FONTS):
+        family = ('Helvetica', 'Helvetica-Bold', 'Helvetica-Oblique', 'Helvetica-BoldOblique')
+    else:
+        family = ('Times-Roman', 'Times-Bold', 'Times-Italic', 'Times-BoldItalic')
+    return family[bold + 2 * italic]
+
+
+def _run_props(r_pr, props):
+    """Update ``props`` with the run properties in a w:rPr element."""
+    if r_pr is None:
+        return props
+    for child in r_pr:
+        tag = child.tag
+        if tag == qn('w:rFonts'):
+            name = child.get(qn('w:ascii')) or child.get(qn('w:hAnsi'))
+            if name:
+                props['font'] = name
+        elif tag == qn('w:sz'):
+            props['size'] = int(child.get(W_VAL)) / 2
+        elif tag == qn('w:b'):
+            props['bold'] = _on(child)
+        elif tag == qn('w:i'):
+            props['italic'] = _on(child)
+        elif tag == qn('w:u'):
+            props['underline'] = child.get(W_VAL, 'single') not in OFF_VALUES
+        elif tag == qn('w:caps'):
+            props['caps'] = _on(child)
+        elif tag == qn('w:color'):
+            value = child.get(W_VAL)
+            props['color'] = None if not value or value == 'auto' else f'#{value}'
+        elif tag == qn('w:vertAlign'):
+            props['vert'] = child.get(W_VAL)
+    return props
+
+
+def _paragraph_props(p_pr, props):
+    """Update ``props`` with the paragraph properties in a w:pPr element."""
+    if p_pr is None:
+        return props
+    for child in p_pr:
+        tag = child.tag
+        if tag == qn('w:jc'):
+            props['align'] = ALIGNMENTS.get(child.get(W_VAL), 'left')
+        elif tag == qn('w:spacing'):
+            for key in ('before', 'after'):
+                if child.get(qn(f'w:{key}')) is not None:
+                    props[key] = _twips(child.get(qn(f'w:{key}')))
+            if child.get(qn('w:line')) is not None:
+                props['line'] = (int(child.get(qn('w:line'))), child.get(qn('w:lineRule'), 'auto'))
+        elif tag == qn('w:ind'):
+            for key, names in (('left', ('w:left', 'w:start')), ('right', ('w:right', 'w:end'))):
+                for name in names:
+                    if child.get(qn(name)) is not None:
+                        props[key] = _twips(child.get(qn(name)))
+            if child.get(qn('w:hanging')) is not None:
+                props['first'] = -_twips(child.get(qn('w:hanging')))
+            elif child.get(qn('w:firstLine')) is not None:
+                props['first'] = _twips(child.get(qn('w:firstLine')))
+        elif tag == qn('w:numPr'):
+            num_id, level = child.find(qn('w:numId')), child.find(qn('w:ilvl'))
+            if num_id is not None:
+                props['num'] = (num_id.get(W_VAL), int(level.get(W_VAL)) if level is not None else 0)
+        elif tag == qn('w:pageBreakBefore'):
+            props['page_break'] = _on(child)
+    return props
+
+
+def _to_roman(number):
+    numerals = ((1000, 'm'), (900, 'cm'), (500, 'd'), (400, 'cd'), (100, 'c'), (90, 'xc'),
+                (50, 'l'), (40, 'xl'), (10, 'x'), (9, 'ix'), (5, 'v'), (4, 'iv'), (1, 'i'))
+    text = ''
+    for value, numeral in numerals:
+        while number >= value:
+            text += numeral
+            number -= value
+    return text
+
+
+def _to_letters(number):
+    text = ''
+    while number > 0:
+        number, remainder = divmod(number - 1, 26)
+        text = chr(ord('a') + remainder) + text
+    return text
+
+
+def format_number(number, num_fmt):
+    if num_fmt == 'lowerLetter':
+        return _to_letters(number)
+    if num_fmt == 'upperLetter':
+        return _to_letters(number).upper()
+    if num_fmt == 'lowerRoman':
+        return _to_roman(number)
+    if num_fmt == 'upperRoman':
+        return _to_roman(number).upper()
+    return str(number)
+
+
+class Numbering:
+    """List labels for paragraphs with numbering, counted in document order."""
+
+    def __init__(self, doc):
+        self.levels = {}
+        self.counters = {}
+        try:
+            numbering = doc.part.numbering_part.element
+        except (KeyError, NotImplementedError):
+            return
+        abstracts = {}
+        for abstract in numbering.iterchildren(qn('w:abstractNum')):
+            abstracts[abstract.get(qn('w:abstractNumId'))] = self._read_levels(abstract)
+        for num in numbering.iterchildren(qn('w:num')):
+            abstract_ref = num.find(qn('w:abstractNumId'))
+            levels = dict(abstracts.get(abstract_ref.get(W_VAL), {})) if abstract_ref is not None else {}
+            for override in num.iterchildren(qn('w:lvlOverride')):
+                level = int(override.get(qn('w:ilvl')))
+                start = override.find(qn('w:startOverride'))
+                if level in levels and start is not None:
+                    levels[level] = dict(levels[level], start=int(start.get(W_VAL)))
+                lvl = override.find(qn('w:lvl'))
+                if lvl is not None:
+                    levels.update(self._read_levels(override))
+            self.levels[num.get(qn('w:numId'))] = levels
+
+    @staticmethod
+    def _read_levels(parent):
+        levels = {}
+        for lvl in parent.iterchildren(qn('w:lvl')):
+            num_fmt, text, start = lvl.find(qn('w:numFmt')), lvl.find(qn('w:lvlText')), lvl.find(qn('w:start'))
+            levels[int(lvl.get(qn('w:ilvl')))] = {
+                'format': num_fmt.get(W_VAL) if num_fmt is not None else 'decimal',
+                'text': text.get(W_VAL, '') if text is not None else '',
+                'start': int(start.get(W_VAL)) if start is not None else 1,
+                'props': _paragraph_props(lvl.find(qn('w:pPr')), {}),
+            }
+        return levels
+
+    def label(self, num_id, level):
+        """Return (label, level paragraph properties) and advance the counter."""
+        levels = self.levels.get(num_id)
+        if not levels or level not in levels:
+            return None, {}
+        counts = self.counters.setdefault(num_id, {})
+        counts[level] = counts.get(level, levels[level]['start'] - 1) + 1
+        for deeper in [lvl for lvl in counts if lvl > level]:
+            del counts[deeper]
+        definition = levels[level]
+        if definition['format'] == 'none':
+            return None, definition['props']
+        if definition['format'] == 'bullet':
+            # Bullets are usually Symbol/Wingdings private-use characters
+            return '•', definition['props']
+        text = definition['text']
+        for lvl in range(level, -1, -1):
+            if lvl in levels:
+                value = counts.get(lvl, levels[lvl]['start'])
+                text = text.replace(f'%{lvl + 1}', format_number(value, levels[lvl]['format']))
+        return text, definition['props']
+
+
+class Styles:
+    """Resolved paragraph, character and table styles of a document."""
+
+    def __init__(self, doc):
+        styles = doc.styles.element
+        self.styles = {s.get(qn('w:styleId')): s for s in styles.iterchildren(qn('w:style'))}
+        self.default_paragraph = next((s.get(qn('w:styleId')) for s in self.styles.values()
+                                       if s.get(qn('w:type')) == 'paragraph' and s.get(qn('w:default')) in ('1', 'true')), None)
+        defaults = styles.find(qn('w:docDefaults'))
+        self.defaults = {'font': None, 'size': 10.0, 'bold': False, 'italic': False, 'underline': False,
+                         'caps': False, 'color': None, 'vert': None, 'align': 'left', 'before': 0, 'after': 0,
+                         'line': (240, 'auto'), 'left': 0, 'right': 0, 'first': 0}
+        if defaults is not None:
+            _run_props(defaults.find(f"{qn('w:rPrDefault')}/{qn('w:rPr')}"), self.defaults)
+            _paragraph_props(defaults.find(f"{qn('w:pPrDefault')}/{qn('w:pPr')}"), self.defaults)
+        self._resolved = {}
+
+    def _chain(self, style_id):
+        chain, seen = [], set()
+        while style_id in self.styles and style_id not in seen:
+            seen.add(style_id)
+            chain.append(self.styles[style_id])
+            based_on = self.styles[style_id].find(qn('w:basedOn'))
+            style_id = based_on.get(W_VAL) if based_on is not None else None
+        return reversed(chain)
+
+    def paragraph(self, style_id):
+        """Paragraph and run properties of a paragraph style, on top of the document defaults."""
+        style_id = style_id or self.default_paragraph
+        key = ('p', style_id)
+        if key not in self._resolved:
+            props = dict(self.defaults)
+            for style in self._chain(style_id):
+                _paragraph_props(style.find(qn('w:pPr')), props)
+                _run_props(style.find(qn('w:rPr')), props)
+            self._resolved[key] = props
+        return self._resolved[key]
+
+    def character(self, style_id):
+        key = ('r', style_id)
+        if key not in self._resolved:
+            props = {}
+            for style in self._chain(style_id):
+                _run_props(style.find(qn('w:rPr')), props)
+            self._resolved[key] = props
+        return self._resolved[key]
+
+    def table_borders(self, style_id):
+        """The w:tblBorders element that applies through a table style, if any."""
+        borders = None
+        for style in self._chain(style_id):
+            found = style.find(f"{qn('w:tblPr')}/{qn('w:tblBorders')}")
+            if found is not None:
+                borders = found
+        return borders
+
+
+def _escape(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+
+def _markup(text, props):
+    text = _escape(text.upper() if props.get('caps') else text)
+    color = f' color="{props["color"]}"' if props.get('color') else ''
+    text = f'<font name="{pdf_font(props.get("font"), props.get("bold"), props.get("italic"))}" size="{props["size"]}"{color}>{text}</font>'
+    if props.get('underline'):
+        text = f'<u>{text}</u>'
+    if props.get('vert') == 'superscript':
+        text = f'<super>{text}</super>'
+    elif props.get('vert') == 'subscript':
+        text = f'<sub>{text}</sub>'
+    return text
+
+
+class PdfBuilder:
+    """Turns the body of one Document into reportlab flowables."""
+
+    def __init__(self, doc, part=None):
+        self.doc = doc
+        # The part pictures are related to: the document, or a header or footer
+        self.part = part or doc.part
+        self.styles = Styles(doc)
+        self.numbering = Numbering(doc)
+        self._paragraph_styles = {}
+        section = doc.sections[-1]
+        self.page_size = (section.page_width.pt, section.page_height.pt)
+        self.margins = (section.left_margin.pt, section.right_margin.pt, section.top_margin.pt,
+                        section.bottom_margin.pt)
+        self.frame_width = self.page_size[0] - self.margins[0] - self.margins[1]
+        self.section = section
+
+    def _runs(self, parent):
+        for child in parent:
+            if child.tag == W_R:
+                yield child
+            elif child.tag in RUN_CONTAINERS:
+                yield from self._runs(child)
+
+    def _image(self, drawing):
+        """(Image flowable, is floating) for a w:drawing holding a picture, else (None, False)."""
+        blip = drawing.find(f".//{qn('a:blip')}")
+        extent = drawing.find(f".//{qn('wp:extent')}")
+        if blip is None or extent is None:
+            return None, False
+        rid = blip.get(qn('r:embed'))
+        if rid not in self.part.rels:
+            return None, False
+        width, height = int(extent.get('cx')) / 12700, int(extent.get('cy')) / 12700
+        image = Image(io.BytesIO(self.part.related_parts[rid].blob), width=width, height=height)
+        return image, drawing.find(qn('wp:anchor')) is not None
+
+    def _paragraph_style(self, props, label=None):
+        size = props['size']
+        line, rule = props['line']
+        if rule == 'auto':
+            leading = size * 1.17 * line / 240
+        elif rule == 'exact':
+            leading = line / 20
+        else:
+            leading = max(size * 1.17, line / 20)
+        first = props['first']
+        key = (props.get('font'), props['align'], size, leading, props['left'], props['right'], first, props['before'], props['after'],
+               label is not None)
+        if key not in self._paragraph_styles:
+            self._paragraph_styles[key] = ParagraphStyle(
+                f'p{len(self._paragraph_styles)}',
+                fontName=pdf_font(props.get('font')), fontSize=size, leading=leading,
+                alignment={'center': TA_CENTER, 'right': TA_RIGHT, 'justify': TA_JUSTIFY}.get(props['align'], TA_LEFT),
+                leftIndent=props['left'], rightIndent=props['right'],
+                firstLineIndent=0 if label is not None else first,
+                bulletIndent=props['left'] + first if label is not None else 0,
+                bulletFontName=pdf_font(props.get('font')), bulletFontSize=size,
+                spaceBefore=props['before'], spaceAfter=props['after'],
+            )
+        return self._paragraph_styles[key]
+
+    def _content(self, p):
+        """Resolve one w:p into its properties, list label, (text, run properties) pieces and pictures."""
+        p_pr = p.find(qn('w:pPr'))
+        style = p_pr.find(qn('w:pStyle')) if p_pr is not None else None
+        props = dict(self.styles.paragraph(style.get(W_VAL) if style is not None else None))
+        _paragraph_props(p_pr, props)
+
+        label = None
+        if props.get('num'):
+            label, level_props = self.numbering.label(*props['num'])
+            for key in ('left', 'first'):
+                if key in level_props and not (p_pr is not None and p_pr.find(qn('w:ind')) is not None):
+                    props[key] = level_props[key]
+
+        pieces, inline, floating = [], [], []
+        page_break = False
+        for r in self._runs(p):
+            r_pr = r.find(qn('w:rPr'))
+            run_style = r_pr.find(qn('w:rStyle')) if r_pr is not None else None
+            run_props = dict(props)
+            if run_style is not None:
+                run_props.update(self.styles.character(run_style.get(W_VAL)))
+            _run_props(r_pr, run_props)
+            text = []
+            for child in r:
+                tag = child.tag
+                if tag == W_T:
+                    text.append(child.text or '')
+                elif tag == qn('w:tab'):
+                    text.append('\t')
+                elif tag in (qn('w:br'), qn('w:cr')):
+                    if child.get(qn('w:type')) == 'page':
+                        page_break = True
+                    else:
+                        text.append('\n')
+                elif tag == qn('w:noBreakHyphen'):
+                    text.append('-')
+                elif tag == qn('w:drawing'):
+                    image, is_floating = self._image(child)
+                    if image is not None:
+                        (floating if is_floating else inline).append(image)
+            text = ''.join(text)
+            if text:
+                pieces.append((text, run_props))
+
+        if pieces:
+            # Lines are as tall as their largest text
+            props['size'] = max(run_props['size'] for _, run_props in pieces)
+        else:
+            mark = p_pr.find(qn('w:rPr')) if p_pr is not None else None
+            if mark is not None:
+                _run_props(mark, props)
+        return props, label, pieces, page_break, inline, floating
+
+    def paragraph(self, p):
+        """Flowables for one w:p; also returns the pictures that float beside the following text."""
+        props, label, pieces, page_break, inline, floating = self._content(p)
+        paragraph_style = self._paragraph_style(props, label)
+        flowables = [PageBreak()] if props.get('page_break') else []
+        if pieces or label:
+            markup = ''.join(_markup(text, run_props) for text, run_props in pieces)
+            flowables.append(Paragraph(markup.replace('\t', TAB).replace('\n', '<br/>'), paragraph_style,
+                                       bulletText=label))
+        else:
+            # An empty paragraph still takes a line
+            flowables.append(Spacer(1, paragraph_style.leading + paragraph_style.spaceBefore
+                                    + paragraph_style.spaceAfter))
+        flowables.extend(inline)
+        if page_break:
+            flowables.append(PageBreak())
+        return flowables, floating
+
+    def _plain_cell(self, tc, width):
+        """(text, font, size, alignment) for a cell holding one line of plainly formatted text, else None.
+
+        Such cells (account numbers, dates) are drawn as strings; laying them
+        out as Paragraphs costs more than the rest of the table.
+        """
+        paragraphs = [child for child in tc if child.tag != qn('w:tcPr')]
+        if len(paragraphs) != 1 or paragraphs[0].tag != W_P:
+            return None
+        props, label, pieces, page_break, inline, floating = self._content(paragraphs[0])
+        if label or page_break or inline or floating or props.get('page_break') or len(pieces) > 1:
+            return None
+        if not pieces:
+            return '', pdf_font(props.get('font')), props['size'], props['align']
+        text, run_props = pieces[0]
+        if any(run_props.get(key) for key in ('underline', 'vert', 'caps', 'color')) or '\t' in text or '\n' in text:
+            return None
+        font = pdf_font(run_props.get('font'), run_props.get('bold'), run_props.get('italic'))
+        if stringWidth(text, font, run_props['size']) + props['left'] + props['right'] > width or props['align'] == 'justify':
+            return None
+        return text, font, run_props['size'], props['align']
+
+    def _borders(self, tbl_pr):
+        borders = tbl_pr.find(qn('w:tblBorders')) if tbl_pr is not None else None
+        style = tbl_pr.find(qn('w:tblStyle')) if tbl_pr is not None else None
+        inherited = self.styles.table_borders(style.get(W_VAL)) if style is not None else None
+        edges = {}
+        for source in (inherited, borders):
+            if source is None:
+                continue
+            for edge in source:
+                name = edge.tag.rsplit('}', 1)[-1]
+                name = {'start': 'left', 'end': 'right'}.get(name, name)
+                value = edge.get(W_VAL, 'nil')
+                edges[name] = None if value in ('nil', 'none') else max(int(edge.get(qn('w:sz'), 4)) / 8, 0.25)
+        return edges
+
+    def table(self, tbl, available_width):
+        """A reportlab Table for one w:tbl."""
+        tbl_pr = tbl.find(qn('w:tblPr'))
+        widths = [_twips(col.get(qn('w:w'))) or 0 for col in tbl.iterfind(f"{qn('w:tblGrid')}/{qn('w:gridCol')}")]
+        rows, commands, merge_starts = [], [], {}
+        for row_index, tr in enumerate(tbl.iterchildren(qn('w:tr'))):
+            row, column = [], 0
+            for tc in tr.iterchildren(qn('w:tc')):
+                tc_pr = tc.find(qn('w:tcPr'))
+                span = tc_pr.find(qn('w:gridSpan')) if tc_pr is not None else None
+                span = int(span.get(W_VAL)) if span is not None else 1
+                v_merge = tc_pr.find(qn('w:vMerge')) if tc_pr is not None else None
+                cell_width = sum(widths[column:column + span]) or available_width / max(len(widths), 1)
+                if v_merge is not None and v_merge.get(W_VAL, 'continue') == 'continue' and column in merge_starts:
+                    row.extend([''] * span)
+                    start_row = merge_starts[column]
+                    commands.append(('SPAN', (column, start_row), (column + span - 1, row_index)))
+                else:
+                    plain = self._plain_cell(tc, cell_width - 2 * DEFAULT_CELL_PADDING)
+                    if plain is not None:
+                        text, font, size, align = plain
+                        row.append(text)
+                        commands.extend([
+                            ('FONT', (column, row_index), (column, row_index), font, size, size * 1.17),
+                            ('ALIGN', (column, row_index), (column, row_index), align.upper()),
+                        ])
+                    else:
+                        row.append(self.blocks(tc, cell_width - 2 * DEFAULT_CELL_PADDING))
+                    row.extend([''] * (span - 1))
+                    if span > 1:
+                        commands.append(('SPAN', (column, row_index), (column + span - 1, row_index)))
+                    if v_merge is not None:
+                        merge_starts[column] = row_index
+                    else:
+                        merge_starts.pop(column, None)
+                column += span
+            rows.append(row)
+        if not rows:
+            return None
+        columns = max(len(row) for row in rows)
+        for row in rows:
+            row.extend([''] * (columns - len(row)))
+        widths = (widths + [0] * columns)[:columns]
+        if not all(widths):
+            widths = [available_width / columns] * columns
+        if sum(widths) > available_width:
+            scale = available_width / sum(widths)
+            widths = [w * scale for w in widths]
+
+        edges = self._borders(tbl_pr)
+        for name, cells in (('top', ('LINEABOVE', (0, 0), (-1, 0))), ('bottom', ('LINEBELOW', (0, -1), (-1, -1))),
+                            ('left', ('LINEBEFORE', (0, 0), (0, -1))), ('right', ('LINEAFTER', (-1, 0), (-1, -1))),
+                            ('insideH', ('LINEBELOW', (0, 0), (-1, -2))), ('insideV', ('LINEAFTER', (0, 0), (-2, -1)))):
+            if edges.get(name):
+                commands.append(cells + (edges[name], colors.black))
+        commands.extend([
+            ('VALIGN', (0, 0), (-1, -1), 'TOP'),
+            ('LEFTPADDING', (0, 0), (-1, -1), DEFAULT_CELL_PADDING),
+            ('RIGHTPADDING', (0, 0), (-1, -1), DEFAULT_CELL_PADDING),
+            ('TOPPADDING', (0, 0), (-1, -1), 0),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 0),
+        ])
+        jc = tbl_pr.find(qn('w:jc')) if tbl_pr is not None else None
+        align = {'center': 'CENTER', 'right': 'RIGHT', 'end': 'RIGHT'}.get(jc.get(W_VAL) if jc is not None else None, 'LEFT')
+        return Table(rows, colWidths=widths, style=TableStyle(commands), hAlign=align, repeatRows=0)
+
+    def blocks(self, parent, available_width):
+        """Flowables for the paragraphs and tables directly under ``parent``."""
+        flowables = []
+        # A floating picture and the paragraphs that wrap around it, up to the
+        # next table or page break
+        floating, wrapped = None, []
+        for child in parent:
+            if child.tag == W_P:
+                items, images = self.paragraph(child)
+                if images:
+                    self._float(flowables, floating, wrapped)
+                    floating, wrapped = images[0], []
+                    flowables.extend(images[1:])
+                if floating is not None and not any(isinstance(item, PageBreak) for item in items):
+                    wrapped.extend(items)
+                    continue
+                self._float(flowables, floating, wrapped)
+                floating = None
+                flowables.extend(items)
+            elif child.tag == W_TBL:
+                self._float(flowables, floating, wrapped)
+                floating = None
+                table = self.table(child, available_width)
+                if table is not None:
+                    flowables.append(table)
+            elif child.tag in (qn('w:sdt'), qn('w:sdtContent'), qn('w:customXml')):
+                self._float(flowables, floating, wrapped)
+                floating = None
+                flowables.extend(self.blocks(child, available_width))
+        self._float(flowables, floating, wrapped)
+        return flowables
+
+    @staticmethod
+    def _float(flowables, image, wrapped):
+        if image is not None:
+            flowables.append(ImageAndFlowables(image, wrapped, imageLeftPadding=0, imageRightPadding=6,
+                                               imageBottomPadding=4, imageSide='left'))
+
+    def story(self):
+        return self.blocks(self.doc.element.body, self.frame_width)
+
+    def page_decorations(self):
+        """onPage callback drawing the default header and footer, or None when both are empty."""
+        parts = []
+        for story, at_top in ((self.section.header, True), (self.section.footer, False)):
+            if story.is_linked_to_previous:
+                continue
+            element = story._element
+            if not ''.join(element.itertext()).strip() and element.find(f".//{qn('w:drawing')}") is None:
+                continue
+            parts.append((PdfBuilder(self.doc, story.part).blocks(element, self.frame_width), at_top))
+        if not parts:
+            return None
+        header_distance = self.section.header_distance.pt if self.section.header_distance is not None else 36
+        footer_distance = self.section.footer_distance.pt if self.section.footer_distance is not None else 36
+
+        def decorate(canvas, document):
+            canvas.saveState()
+            for flowables, at_top in parts:
+                heights = [f.wrap(self.frame_width, self.page_size[1])[1] for f in flowables]
+                y = self.page_size[1] - header_distance if at_top else footer_distance + sum(heights)
+                for flowable, height in zip(flowables, heights):
+                    y -= height
+                    flowable.drawOn(canvas, self.margins[0], y)
+            canvas.restoreState()
+        return decorate
+
+
+@timed('pdf')
+def document_to_pdf(doc, output=None):
+    """Write a python-docx Document as PDF.
+
+    ``output`` is a path or a file object; without it the PDF bytes are
+    returned. Raises RenderError when reportlab is missing or layout fails.
+    """
+    if not REPORTLAB_AVAILABLE:
+        raise RenderError("PDF output needs reportlab: pip install reportlab")
+    buffer = output if output is not None else io.BytesIO()
+    try:
+        builder = PdfBuilder(doc)
+        left, right, top, bottom = builder.margins
+        pdf = SimpleDocTemplate(buffer, pagesize=builder.page_size, leftMargin=left, rightMargin=right,
+                                topMargin=top, bottomMargin=bottom, title=doc.core_properties.title or '',
+                                author=doc.core_properties.author or '')
+        decorate = builder.page_decorations()
+        if decorate:
+            pdf.build(builder.story(), onFirstPage=decorate, onLaterPages=decorate)
+        else:
+            pdf.build(builder.story())
+    except OSError:
+        raise
+    except Exception as e:
+        raise RenderError(f"Failed to lay out PDF: {e}") from e
+    return buffer.getvalue() if output is None else output
+
+
+def save_pdf(doc, output_path):
+    try:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        document_to_pdf(doc, output_path)
+    except OSError as e:
+        raise OutputError(f"Failed to save letter to '{output_path}': {e}") from e
+    logger.debug("Saved letter: %s", output_path)
+    return output_path
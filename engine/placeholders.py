@@ -1,6 +1,4 @@
-from docx import Document
 from docx.oxml.ns import qn
-from docx.shared import Pt
 
 def replace_placeholder_in_paragraph(paragraph, replacements):
     """
@@ -0,0 +1,363 @@
+import io
+import logging
+import os
+from datetime import datetime
+from docx import Document
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.table import _Cell
+from .bank import clean_account_number
+from .errors import EngineError, InvalidRequestError, OutputError, RenderError, TemplateLoadError
+from .pdf import document_to_pdf, save_pdf
+from .placeholders import replace_placeholder_in_paragraph
+from .templates import template_path
+from .timing import span, timed
+
+logger = logging.getLogger(__name__)
+
+OUTPUT_FORMATS = ('docx', 'pdf')
+
+INTER_TABLE_HEADINGS = {
+    "WhatsApp": "WhatsApp Accounts",
+    "Facebook": "URLs",
+    "Instagram": "Instagram Accounts",
+    "Twitter": "Twitter Accounts",
+}
+
+
+def officer_replacements(officer):
+    return {
+        '{{Officer_Name}}': officer.get('OfficerName', 'Unknown Officer'),
+        '{{Officer_Designation}}': officer.get('Designation', 'Unknown Designation'),
+        '{{Officer_Phone}}': officer.get('Phone', 'N/A'),
+        '{{Officer_Email}}': officer.get('Email', 'N/A'),
+    }
+
+
+def ensure_dd_mm_yyyy(date_str):
+    """Accept DD-MM-YYYY or YYYY-MM-DD and return DD-MM-YYYY."""
+    if date_str and date_str != 'N/A':
+        try:
+            return datetime.strptime(date_str, "%Y-%m-%d").strftime("%d-%m-%Y")
+        except ValueError:
+            return date_str
+    return 'N/A'
+
+
+@timed('load_template')
+def load_template(path):
+    """Open a template from a path or from the bytes of a .docx file."""
+    try:
+        if isinstance(path, bytes):
+            return Document(io.BytesIO(path))
+        return Document(path)
+    except Exception as e:
+        name = 'template bytes' if isinstance(path, bytes) else path
+        raise TemplateLoadError(f"Failed to load template '{name}': {e}") from e
+
+
+def replace_in_document(doc, replacements):
+    for paragraph in doc.paragraphs:
+        replace_placeholder_in_paragraph(paragraph, replacements)
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for paragraph in cell.paragraphs:
+                    replace_placeholder_in_paragraph(paragraph, replacements)
+
+
+def bank_replacements(case, officer):
+    replacements = officer_replacements(officer)
+    replacements.update({
+        '{{Letter_Date}}': case.get('RequestDate', datetime.now().strftime("%d-%m-%Y")),
+        '{{Nodal_Officer}}': case.get('RecipientName', 'Nodal Officer'),
+        '{{Bank}}': case.get('Bank', 'Unknown Bank'),
+        '{{Crime_No_with_Section}}': case.get('CrimeNumber', 'N/A'),
+        '{{NCRP_ID}}': case.get('NCRP_ID', 'N/A'),
+        '{{Total_Amount}}': case.get('Total_Amount', 'N/A'),
+        '{{Date_From}}': case.get('Date_From', 'N/A'),
+        '{{Date_To}}': case.get('Date_To', 'N/A'),
+    })
+    return replacements
+
+
+def fill_table(table, rows):
+    """Write row values into a new table.
+
+    Goes through the row XML directly; table.cell() rescans the whole grid on
+    every call, which makes large tables quadratic.
+    """
+    for tr, values in zip(table._tbl.tr_lst, rows):
+        for tc, value in zip(tr.tc_lst, values):
+            if value is not None:
+                _Cell(tc, table).text = value
+
+
+@timed('build_table')
+def build_bank_accounts_table(doc, accounts):
+    account_table = doc.add_table(rows=len(accounts) + 1, cols=2)
+    account_table.style = 'Table Grid'
+    rows = [('Account Number', 'IFSC Code')]
+    rows.extend(
+        (clean_account_number(account.get('account_no', 'N/A')), str(account.get('ifsc_code', 'N/A')))
+        for account in accounts
+    )
+    fill_table(account_table, rows)
+    for tc in account_table._tbl.tr_lst[0].tc_lst:
+        for p in _Cell(tc, account_table).paragraphs:
+            for r in p.runs:
+                r.font.bold = True
+    return account_table
+
+
+def render_bank_letter(case, officer, path):
+    """Fill bank.docx for one bank and return the Document."""
+    doc = load_template(path)
+    replacements = bank_replacements(case, officer)
+    accounts = case.get('Accounts')
+    for paragraph in doc.paragraphs:
+        full_text = ''.join(run.text for run in paragraph.runs)
+        if '{{Accounts}}' in full_text and accounts:
+            for run in paragraph.runs:
+                run.text = ''
+            account_table = build_bank_accounts_table(doc, accounts)
+            paragraph._p.addnext(account_table._tbl)
+        else:
+            replace_placeholder_in_paragraph(paragraph, replacements)
+    for table in doc.tables:
+        for row in table.rows:
+            for cell in row.cells:
+                for paragraph in cell.paragraphs:
+                    replace_placeholder_in_paragraph(paragraph, replacements)
+    return doc
+
+
+def tsp_identifiers(case):
+    request_type = case.get('Request_Type')
+    if request_type in ["CAF", "CDR"]:
+        return case.get('MobileNo', ['N/A'])
+    if request_type == "IMEI CDR":
+        return case.get('IMEI_No', ['N/A'])
+    if request_type == "Aadhar linked numbers":
+        return case.get('Aadhar_No', ['N/A'])
+    if request_type == "PoS code":
+        return case.get('PoS_Code', ['N/A'])
+    return ['N/A']
+
+
+def tsp_replacements(case, officer):
+    date_ranges = case.get('Date_Ranges')
+    replacements = officer_replacements(officer)
+    replacements.update({
+        '{{Letter_Date}}': datetime.now().strftime("%d-%m-%Y"),
+        '{{Nodal_Officer}}': case.get('RecipientName', 'N/A'),
+        '{{Platform_Name}}': case.get('TSP', 'N/A'),
+        '{{Platform_Email}}': 'N/A',
+        '{{Crime_No_with_Section}}': case.get('CrimeNumber', 'N/A'),
+        '{{NCRP_ID}}': case.get('NCRP_ID', 'N/A'),
+        '{{Platform_Account_Table}}': ', '.join(tsp_identifiers(case)),
+        '{{Date_From}}': date_ranges[0][0] if date_ranges else 'N/A',
+        '{{Date_To}}': date_ranges[0][1] if date_ranges else 'N/A',
+        '{{Request_Type}}': case.get('Request_Type', 'N/A')
+    })
+    return replacements
+
+
+def set_grid_style(table):
+    """Use 'Table Grid', or draw the same single borders when the template lacks that style."""
+    try:
+        table.style = 'Table Grid'
+    except KeyError:
+        borders = OxmlElement('w:tblBorders')
+        for edge in ('top', 'left', 'bottom', 'right', 'insideH', 'insideV'):
+            border = OxmlElement(f'w:{edge}')
+            border.set(qn('w:val'), 'single')
+            border.set(qn('w:sz'), '4')
+            border.set(qn('w:space'), '0')
+            border.set(qn('w:color'), 'auto')
+            borders.append(border)
+        table._tbl.tblPr.append(borders)
+
+
+@timed('build_table')
+def build_date_ranges_table(doc, date_ranges):
+    table = doc.add_table(rows=len(date_ranges) + 1, cols=3)
+    set_grid_style(table)
+    rows = [('S.No', 'From Date', 'To Date')]
+    rows.extend((str(i), from_date, to_date) for i, (from_date, to_date) in enumerate(date_ranges, start=1))
+    fill_table(table, rows)
+    for tc in table._tbl.tr_lst[0].tc_lst:
+        for p in _Cell(tc, table).paragraphs:
+            for r in p.runs:
+                r.font.bold = True
+    return table
+
+
+def render_tsp_letter(case, officer, path):
+    """Fill the TSP template for one operator and request type.
+
+    With more than one date range, "from {{Date_From}} to {{Date_To}}" becomes
+    "for the periods listed below" followed by a table of the ranges.
+    """
+    doc = load_template(path)
+    replacements = tsp_replacements(case, officer)
+    date_ranges = case.get('Date_Ranges') or []
+    if len(date_ranges) > 1:
+        for paragraph in doc.paragraphs:
+            if '{{Date_From}}' in paragraph.text:
+                # One pass over the paragraph, so the phrase is replaced before its placeholders
+                replace_placeholder_in_paragraph(paragraph, dict(
+                    {'from {{Date_From}} to {{Date_To}}': 'for the periods listed below'}, **replacements
+                ))
+                paragraph._p.addnext(build_date_ranges_table(doc, date_ranges)._tbl)
+                break
+        else:
+            logger.warning("Date placeholder '{{Date_From}}' not found; only the first date range is shown.")
+    replace_in_document(doc, replacements)
+    return doc
+
+
+def inter_replacements(case, officer):
+    replacements = officer_replacements(officer)
+    replacements.update({
+        '{{Letter_Date}}': datetime.now().strftime("%d-%m-%Y"),
+        '{{Nodal_Officer}}': case.get('RecipientName', 'N/A'),
+        '{{Platform_Name}}': case.get('Platform', 'N/A'),
+        '{{Platform_Email}}': 'N/A',
+        '{{Crime_No_with_Section}}': case.get('CrimeNumber', 'N/A'),
+        '{{NCRP_ID}}': case.get('NCRP_ID', 'N/A'),
+        '{{Date_From}}': ensure_dd_mm_yyyy(case.get('Date_From', 'N/A')),
+        '{{Date_To}}': ensure_dd_mm_yyyy(case.get('Date_To', 'N/A'))
+    })
+    return replacements
+
+
+@timed('build_table')
+def build_inter_accounts_table(doc, platform, accounts, google_id_type="Gmail ID"):
+    """Two-column S.No/ID table, split into a second pair of columns after nine rows."""
+    col_title = INTER_TABLE_HEADINGS.get(platform, f"{google_id_type}s" if platform == "Google" else "Accounts")
+
+    left_block = accounts[:9]
+    right_block = accounts[9:]
+
+    cols = 2 if not right_block else 4
+    rows = 1 + max(len(left_block), len(right_block))
+
+    table = doc.add_table(rows=rows, cols=cols)
+    table.style = "Table Grid"
+
+    values = [["S.No", col_title] * (cols // 2)]
+    for i in range(rows - 1):
+        row = [str(i + 1), left_block[i]] if i < len(left_block) else [None, None]
+        if cols == 4:
+            row += [str(i + 10), right_block[i]] if i < len(right_block) else [None, None]
+        values.append(row)
+    fill_table(table, values)
+
+    return table
+
+
+def render_inter_letter(case, officer, path):
+    """Fill the intermediary template for one platform."""
+    doc = load_template(path)
+
+    placeholder = None
+    for para in doc.paragraphs:
+        if "{{Platform_Account_Table}}" in para.text:
+            placeholder = para
+            break
+
+    accounts = case.get('AccountID', [])
+    if accounts and placeholder is not None:
+        placeholder.text = placeholder.text.replace("{{Platform_Account_Table}}", "").strip()
+        tbl = build_inter_accounts_table(
+            doc, case.get("Platform", "N/A"), accounts, case.get('GoogleIdType', "Gmail ID")
+        )
+        placeholder._p.addnext(tbl._tbl)
+    elif accounts and placeholder is None:
+        logger.warning("Table placeholder '{{Platform_Account_Table}}' not found in template.")
+
+    replace_in_document(doc, inter_replacements(case, officer))
+    return doc
+
+
+RENDERERS = {
+    'Bank': render_bank_letter,
+    'TSP': render_tsp_letter,
+    'Intermediary': render_inter_letter,
+}
+
+
+TEMPLATE_KEYS = {
+    'Bank': None,
+    'TSP': 'Request_Type',
+    'Intermediary': 'Platform',
+}
+
+
+def resolve_template(letter_type, case, template_dir):
+    """Path of the template a case renders with."""
+    if letter_type not in TEMPLATE_KEYS:
+        raise InvalidRequestError(f"Unknown letter type: {letter_type}")
+    key = TEMPLATE_KEYS[letter_type]
+    return template_path(template_dir, letter_type, case.get(key) if key else None)
+
+
+@timed('save_docx')
+def save_document(doc, output_path):
+    try:
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        doc.save(output_path)
+    except OSError as e:
+        raise OutputError(f"Failed to save letter to '{output_path}': {e}") from e
+    logger.debug("Saved letter: %s", output_path)
+    return output_path
+
+
+def render_document(letter_type, case, officer, template):
+    """Fill the template for a case and return the python-docx Document.
+
+    ``template`` is a .docx path, the bytes of a .docx file, or the root
+    template directory, in which case the file is picked from the case's
+    request type or platform.
+    """
+    if letter_type not in RENDERERS:
+        raise InvalidRequestError(f"Unknown letter type: {letter_type}")
+    if isinstance(template, bytes) or (template and str(template).lower().endswith('.docx')):
+        path = template
+    else:
+        path = resolve_template(letter_type, case, template)
+    try:
+        with span('fill_template'):
+            return RENDERERS[letter_type](case, officer, path)
+    except EngineError:
+        raise
+    except Exception as e:
+        raise RenderError(f"Failed to fill {letter_type} template: {e}") from e
+
+
+def output_format_for(output_path):
+    """'pdf' for a .pdf path, else 'docx'."""
+    return 'pdf' if output_path and str(output_path).lower().endswith('.pdf') else 'docx'
+
+
+def render(letter_type, case, officer, template, output_path=None, output_format=None):
+    """Render one letter.
+
+    Writes the letter to ``output_path`` and returns the path, or returns the
+    file bytes when no path is given. ``output_format`` is 'docx' or 'pdf'
+    and defaults to the extension of ``output_path``. Raises EngineError
+    subclasses only.
+    """
+    output_format = output_format or output_format_for(output_path)
+    if output_format not in OUTPUT_FORMATS:
+        raise InvalidRequestError(f"Unknown output format: {output_format}")
+    doc = render_document(letter_type, case, officer, template)
+    if output_format == 'pdf':
+        return save_pdf(doc, output_path) if output_path else document_to_pdf(doc)
+    if output_path:
+        return save_document(doc, output_path)
+    with span('save_docx'):
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        return buffer.getvalue()
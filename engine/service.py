@@ -0,0 +1,358 @@
+"""Local HTTP generation service.
+
+Runs the letter engine behind a small HTTP API on the loopback interface so
+several officers on one machine share a worker pool, a template cache and a
+single database writer:
+
+    POST /jobs                      submit letters, returns {"id": ...}
+    GET  /jobs/<id>                 job status and per-letter results
+    GET  /jobs/<id>/download        the .docx (one letter) or a .zip (several)
+    GET  /jobs/<id>/letters/<n>     one letter of a job
+    GET  /health                    queue depth and template cache counters
+    GET  /metrics                   Prometheus metrics, when metrics are enabled
+
+Start it with ``python -m engine serve``.
+"""
+import asyncio
+import io
+import json
+import logging
+import os
+import re
+import time
+import uuid
+import zipfile
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urlsplit
+from db.database import create_database, fetch_officer, record_letter, save_case
+from . import logs, metrics
+from .batch import OUTPUT_ROOT
+from .errors import EngineError
+from .render import render, resolve_template
+from .templates import TemplateCache
+
+logger = logging.getLogger(__name__)
+
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+MAX_BODY = 20 * 1024 * 1024
+MAX_JOBS = 500
+RECIPIENT_KEYS = {'Bank': 'Bank', 'TSP': 'TSP', 'Intermediary': 'Platform'}
+REASONS = {200: 'OK', 202: 'Accepted', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           409: 'Conflict', 413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable'}
+
+
+def safe_name(recipient):
+    """The recipient as a file name part: no path separators, '..' or other unsafe characters."""
+    return re.sub(r'[^\w\-]+', '_', recipient).strip('_')
+
+
+def render_to_file(letter_type, case, officer, template, output_path):
+    """Process pool entry point; ``template`` is the cached template bytes."""
+    return render(letter_type, case, officer, template, output_path)
+
+
+class Job:
+    def __init__(self, officer_id, letters, record):
+        self.id = uuid.uuid4().hex[:12]
+        self.officer_id = officer_id
+        self.letters = letters
+        self.record = record
+        self.status = 'queued'
+        self.pending = len(letters)
+        self.created = time.time()
+        self.finished = None
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'status': self.status,
+            'generated': sum(1 for letter in self.letters if letter['status'] == 'ok'),
+            'failed': sum(1 for letter in self.letters if letter['status'] == 'failed'),
+            'letters': [
+                {key: letter[key] for key in ('letter_type', 'recipient', 'status', 'error')}
+                for letter in self.letters
+            ],
+        }
+
+
+class GenerationService:
+    def __init__(self, template_dir, output_dir=None, workers=2, queue_size=200, executor='process'):
+        self.template_dir = template_dir
+        self.output_dir = output_dir or os.path.join(OUTPUT_ROOT, 'service')
+        self.workers = workers
+        self.executor = executor
+        self.queue_size = queue_size
+        self.templates = TemplateCache()
+        self.jobs = OrderedDict()
+
+    # ---------------------------
+    # Lifecycle
+    # ---------------------------
+    async def run(self, host='127.0.0.1', port=8765, ready=None):
+        if host not in LOOPBACK_HOSTS:
+            raise ValueError(f"The generation service only listens on localhost, not {host}")
+        if self.executor == 'process':
+            self.pool = ProcessPoolExecutor(max_workers=self.workers, **logs.pool_options())
+        else:
+            self.pool = ThreadPoolExecutor(max_workers=self.workers)
+        # One thread owns every database call, so writes never contend
+        self.db_executor = ThreadPoolExecutor(max_workers=1)
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        await self.db_call(create_database)
+        server = await asyncio.start_server(self._handle, host, port)
+        self.port = server.sockets[0].getsockname()[1]
+        logger.info("Generation service listening on http://%s:%s", host, self.port)
+        if ready:
+            ready(self)
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            self.pool.shutdown(wait=False, cancel_futures=True)
+            self.db_executor.shutdown(wait=True)
+
+    async def db_call(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.db_executor, func, *args)
+
+    # ---------------------------
+    # Jobs
+    # ---------------------------
+    @staticmethod
+    def check_letters(letters):
+        """An error message for letters the engine cannot take, or None."""
+        if not isinstance(letters, list):
+            return "letters must be a list"
+        for index, letter in enumerate(letters):
+            if not isinstance(letter, dict):
+                return f"Letter {index} must be an object"
+            if letter.get('letter_type') not in RECIPIENT_KEYS:
+                return f"Letter {index}: unknown letter type {letter.get('letter_type')!r}"
+            if not isinstance(letter.get('case') or {}, dict):
+                return f"Letter {index}: case must be an object"
+        return None
+
+    async def submit(self, payload):
+        if not isinstance(payload, dict):
+            return 400, {'error': "The request body must be a JSON object"}
+        officer_id = payload.get('officer_id')
+        letters = payload.get('letters')
+        if letters is None and 'letter_type' in payload:
+            letters = [{'letter_type': payload['letter_type'], 'case': payload.get('case', {})}]
+        if not letters or officer_id is None:
+            return 400, {'error': "officer_id and at least one letter are required"}
+        error = self.check_letters(letters)
+        if error:
+            return 400, {'error': error}
+        if len(letters) > self.queue_size:
+            return 413, {'error': f"A job can have at most {self.queue_size} letters; split it into smaller jobs"}
+        if self.queue.qsize() + len(letters) > self.queue_size:
+            return 503, {'error': "Generation queue is full, try again later"}
+
+        officer = await self.db_call(fetch_officer, officer_id)
+        if not officer:
+            return 400, {'error': f"Officer {officer_id} not found"}
+
+        job = Job(officer_id, [], payload.get('record', True))
+        job_dir = os.path.join(self.output_dir, job.id)
+        for index, letter in enumerate(letters, start=1):
+            letter_type = letter.get('letter_type')
+            case = letter.get('case') or {}
+            recipient = str(case.get(RECIPIENT_KEYS.get(letter_type, ''), letter_type))
+            output_path = os.path.join(job_dir, f"Notice_{safe_name(recipient) or letter_type}_{index}.docx")
+            if os.path.dirname(os.path.realpath(output_path)) != os.path.realpath(job_dir):
+                return 400, {'error': f"Letter {index - 1}: invalid recipient {recipient!r}"}
+            job.letters.append({
+                'letter_type': letter_type,
+                'case': case,
+                'recipient': recipient,
+                'output_path': output_path,
+                'status': 'queued',
+                'error': None,
+            })
+        job.pending = len(job.letters)
+        self._remember(job)
+        metrics.BATCH_LETTERS.observe(len(job.letters))
+
+        if job.record:
+            # Each distinct case of the job, so every letter can be recorded against its own
+            cases = {}
+            for letter in job.letters:
+                key = (letter['case'].get('CrimeNumber'), letter['case'].get('NCRP_ID'))
+                if key[0] and key not in cases:
+                    cases[key] = letter
+            for letter in cases.values():
+                save_error = await self.db_call(save_case, letter['case'], officer_id, letter['letter_type'])
+                if save_error:
+                    logger.error("Service job %s: %s", job.id, save_error)
+        for letter in job.letters:
+            self.queue.put_nowait((job, letter, officer))
+        return 202, {'id': job.id, 'status': job.status}
+
+    def _remember(self, job):
+        self.jobs[job.id] = job
+        while len(self.jobs) > MAX_JOBS:
+            oldest = next(iter(self.jobs.values()))
+            if oldest.finished is None:
+                break
+            self.jobs.popitem(last=False)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            job, letter, officer = await self.queue.get()
+            context = {'batch_id': job.id, 'crime_number': letter['case'].get('CrimeNumber'),
+                       'ncrp_id': letter['case'].get('NCRP_ID'), 'recipient': letter['recipient']}
+            with logs.log_context(**context):
+                job.status = 'running'
+                letter['status'] = 'running'
+                start = time.perf_counter()
+                try:
+                    path = resolve_template(letter['letter_type'], letter['case'], self.template_dir)
+                    template = await asyncio.to_thread(self.templates.get, path)
+                    await loop.run_in_executor(
+                        self.pool, render_to_file, letter['letter_type'], letter['case'],
+                        officer, template, letter['output_path']
+                    )
+                    letter['status'] = 'ok'
+                    metrics.letter_done(letter['letter_type'], time.perf_counter() - start)
+                    if job.record:
+                        record_error = await self.db_call(
+                            record_letter, letter['case'], job.officer_id, letter['letter_type'],
+                            letter['recipient'], letter['output_path']
+                        )
+                        if record_error:
+                            logger.warning("Service job %s: letter not recorded: %s", job.id, record_error)
+                except EngineError as e:
+                    letter['status'] = 'failed'
+                    letter['error'] = f"{type(e).__name__}: {e}"
+                    logger.error("Service job %s: %s failed: %s", job.id, letter['recipient'], e)
+                except Exception as e:
+                    letter['status'] = 'failed'
+                    letter['error'] = f"{type(e).__name__}: {e}"
+                    logger.exception("Service job %s: unexpected error", job.id)
+                finally:
+                    if letter['error']:
+                        metrics.letter_done(letter['letter_type'], 0, letter['error'])
+                    job.pending -= 1
+                    if job.pending == 0:
+                        job.finished = time.time()
+                        job.status = 'failed' if all(l['status'] == 'failed' for l in job.letters) else 'done'
+                    self.queue.task_done()
+
+    # ---------------------------
+    # HTTP
+    # ---------------------------
+    async def _handle(self, reader, writer):
+        try:
+            request_line = await reader.readline()
+            if not request_line:
+                return
+            method, target = request_line.decode('latin-1').split()[:2]
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                name, _, value = line.decode('latin-1').partition(':')
+                headers[name.strip().lower()] = value.strip()
+            length = int(headers.get('content-length', 0))
+            if length > MAX_BODY:
+                response = self._json(413, {'error': "Request body too large"})
+            else:
+                body = await reader.readexactly(length) if length else b''
+                response = await self._route(method.upper(), urlsplit(target).path, body)
+        except (ValueError, asyncio.IncompleteReadError) as e:
+            response = self._json(400, {'error': f"Malformed request: {e}"})
+        except Exception as e:
+            logger.exception("Generation service request failed")
+            response = self._json(500, {'error': str(e)})
+        status, content_type, payload, extra = response
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                f"Content-Type: {content_type}",
+                f"Content-Length: {len(payload)}",
+                "Connection: close"]
+        head.extend(f"{k}: {v}" for k, v in extra.items())
+        writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + payload)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    def _json(self, status, data):
+        return status, 'application/json', json.dumps(data).encode('utf-8'), {}
+
+    async def _route(self, method, path, body):
+        parts = [p for p in path.split('/') if p]
+        if parts == ['health']:
+            return self._json(200, {
+                'status': 'ok',
+                'workers': self.workers,
+                'queued': self.queue.qsize(),
+                'template_cache': {'hits': self.templates.hits, 'misses': self.templates.misses},
+            })
+        if parts == ['metrics']:
+            if not metrics.enabled():
+                return self._json(404, {'error': "Metrics are disabled; start with --metrics-file or --metrics-port"})
+            return 200, metrics.CONTENT_TYPE, metrics.exposition().encode('utf-8'), {}
+        if parts == ['jobs']:
+            if method != 'POST':
+                return self._json(405, {'error': "Use POST to submit a job"})
+            status, data = await self.submit(json.loads(body or b'{}'))
+            return self._json(status, data)
+        if len(parts) >= 2 and parts[0] == 'jobs':
+            if method != 'GET':
+                return self._json(405, {'error': "Method not allowed"})
+            job = self.jobs.get(parts[1])
+            if not job:
+                return self._json(404, {'error': "Unknown job"})
+            if len(parts) == 2:
+                return self._json(200, job.to_dict())
+            if parts[2:] == ['download']:
+                return await self._download(job)
+            if len(parts) == 4 and parts[2] == 'letters' and parts[3].isdigit():
+                index = int(parts[3])
+                if not 0 <= index < len(job.letters):
+                    return self._json(404, {'error': "Unknown letter"})
+                return await self._download(job, index)
+        return self._json(404, {'error': "Not found"})
+
+    async def _download(self, job, index=None):
+        if job.finished is None:
+            return self._json(409, {'error': "Job is still running", 'status': job.status})
+        letters = [job.letters[index]] if index is not None else job.letters
+        letters = [letter for letter in letters if letter['status'] == 'ok']
+        if not letters:
+            return self._json(404, {'error': "No generated letters to download"})
+        if len(letters) == 1:
+            path = letters[0]['output_path']
+            data = await asyncio.to_thread(self._read, path)
+            return (200, 'application/vnd.openxmlformats-officedocument.wordprocessingml.document', data,
+                    {'Content-Disposition': f'attachment; filename="{os.path.basename(path)}"'})
+        data = await asyncio.to_thread(self._zip, [letter['output_path'] for letter in letters])
+        return 200, 'application/zip', data, {'Content-Disposition': f'attachment; filename="{job.id}.zip"'}
+
+    @staticmethod
+    def _read(path):
+        with open(path, 'rb') as f:
+            return f.read()
+
+    @staticmethod
+    def _zip(paths):
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as zf:
+            for path in paths:
+                zf.write(path, os.path.basename(path))
+        return buffer.getvalue()
+
+
+def serve(template_dir, host='127.0.0.1', port=8765, output_dir=None, workers=2, executor='process'):
+    service = GenerationService(template_dir, output_dir, workers, executor=executor)
+    try:
+        asyncio.run(service.run(host, port, ready=lambda s: print(f"Serving on http://{host}:{s.port}")))
+    except KeyboardInterrupt:
+        pass
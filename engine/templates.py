@@ -0,0 +1,112 @@
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from .errors import InvalidRequestError, TemplateNotFoundError
+from .metrics import TEMPLATE_CACHE
+
+CONFIG_FILE = 'config.json'
+
+# Sub-folder of the template directory used by each letter type
+TEMPLATE_SUBDIRS = {
+    'Bank': 'banks',
+    'TSP': 'tsp',
+    'Intermediary': 'inter',
+}
+
+BANK_TEMPLATE = "bank.docx"
+
+TSP_TEMPLATES = {
+    "CAF": "caf_template.docx",
+    "CDR": "cdr_template.docx",
+    "IMEI CDR": "imei_cdr_template.docx",
+    "Aadhar linked numbers": "aadhar_template.docx",
+    "PoS code": "pos_template.docx"
+}
+
+INTER_TEMPLATES = {
+    "Instagram": "instagram_template.docx",
+    "WhatsApp": "whatsapp_template.docx",
+    "Facebook": "facebook_template.docx",
+    "Telegram": "telegram_template.docx",
+    "Google": "google_template.docx",
+    "Twitter": "twitter_template.docx"
+}
+
+
+def default_template_dir():
+    """Template directory from config.json, falling back to the bundled templates."""
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            template_dir = json.load(f).get('template_dir')
+        if template_dir and os.path.isdir(template_dir):
+            return template_dir
+    except (FileNotFoundError, json.JSONDecodeError, AttributeError):
+        pass
+    if getattr(sys, 'frozen', False):
+        return os.path.join(sys._MEIPASS, 'templates')
+    return os.path.join(Path(__file__).parent.parent, 'templates')
+
+
+def template_filename(letter_type, key=None):
+    """Return the template file name for a letter type and TSP request type or platform."""
+    if letter_type == 'Bank':
+        return BANK_TEMPLATE
+    if letter_type == 'TSP':
+        filename = TSP_TEMPLATES.get(key)
+        if not filename:
+            raise InvalidRequestError(f"Invalid request type: {key}")
+        return filename
+    if letter_type == 'Intermediary':
+        return INTER_TEMPLATES.get(key, "inter_template.docx")
+    raise InvalidRequestError(f"Unknown letter type: {letter_type}")
+
+
+def template_path(template_dir, letter_type, key=None):
+    """Resolve a template in the selected directory, then in the PyInstaller bundle."""
+    if not template_dir:
+        raise TemplateNotFoundError("No template directory selected")
+    filename = template_filename(letter_type, key)
+    subdir = TEMPLATE_SUBDIRS[letter_type]
+    path = os.path.join(template_dir, subdir, filename)
+    if not os.path.exists(path) and getattr(sys, 'frozen', False):
+        path = os.path.join(sys._MEIPASS, 'templates', subdir, filename)
+    if not os.path.exists(path):
+        raise TemplateNotFoundError(
+            f"Template file '{filename}' not found in {os.path.join(template_dir, subdir)}"
+        )
+    return path
+
+
+class TemplateCache:
+    """Keeps template file contents in memory, keyed by path and mtime.
+
+    Editing a template on disk changes its mtime, so the next lookup reloads it.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, path):
+        mtime = os.path.getmtime(path)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry and entry[0] == mtime:
+                self.hits += 1
+                TEMPLATE_CACHE.inc(result='hit')
+                return entry[1]
+        with open(path, 'rb') as f:
+            data = f.read()
+        with self.lock:
+            self.misses += 1
+            self.entries[path] = (mtime, data)
+        TEMPLATE_CACHE.inc(result='miss')
+        return data
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
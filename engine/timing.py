@@ -0,0 +1,174 @@
+"""Per-stage timing of a batch and on-demand profiling.
+
+Stages are marked with ``span(name)`` or the ``@timed(name)`` decorator.
+While a StageTimer is active on the thread (``with StageTimer('bank'):``)
+each stage's time is added to it, minus the time of stages nested inside
+it, so the stages add up to the batch. With no active timer a span costs an
+attribute lookup. render_job carries its letter's stage times back in
+``result['stages']`` and run_jobs adds them to the caller's timer, so
+letters rendered in a process pool are counted too.
+
+``Profiler(name)`` runs cProfile over a block and writes
+``profile_<name>_<time>.prof`` and a readable ``.txt`` summary to the logs
+directory. cProfile only sees the thread it runs on, so profiled batches
+render their letters in-process.
+"""
+import cProfile
+import functools
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+from datetime import datetime
+from db.database import add_call_hook
+from .logs import LOG_DIR
+
+logger = logging.getLogger(__name__)
+
+PROFILE_LINES = 40
+
+_local = threading.local()
+
+
+class _Span:
+    __slots__ = ('name', 'timer', 'start', 'nested')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.timer = getattr(_local, 'timer', None)
+        if self.timer is not None:
+            self.nested = 0.0
+            self.timer.open_spans.append(self)
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        timer = self.timer
+        if timer is not None:
+            elapsed = time.perf_counter() - self.start
+            timer.open_spans.pop()
+            if timer.open_spans:
+                timer.open_spans[-1].nested += elapsed
+            timer.add(self.name, elapsed - self.nested)
+        return False
+
+
+def span(name):
+    """Context manager that times one stage into the thread's active StageTimer."""
+    return _Span(name)
+
+
+def timed(name):
+    """Decorator form of span()."""
+    def decorate(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with _Span(name):
+                return function(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def active_timer():
+    return getattr(_local, 'timer', None)
+
+
+# Database calls are stages of their own
+add_call_hook(span)
+
+
+class StageTimer:
+    """Seconds and call counts per stage for one batch.
+
+    Can be entered several times, also from different threads one after the
+    other (e.g. reading the sheet on the GUI thread and rendering on a
+    worker); the wall time of every entry is added up.
+    """
+
+    def __init__(self, name='batch'):
+        self.name = name
+        self.stages = {}
+        self.elapsed = 0.0
+        self.open_spans = []
+        self._entries = []
+
+    def __enter__(self):
+        self._entries.append((getattr(_local, 'timer', None), time.perf_counter()))
+        _local.timer = self
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        previous, start = self._entries.pop()
+        self.elapsed += time.perf_counter() - start
+        _local.timer = previous
+        return False
+
+    def add(self, stage, seconds, count=1):
+        entry = self.stages.get(stage)
+        if entry is None:
+            self.stages[stage] = [seconds, count]
+        else:
+            entry[0] += seconds
+            entry[1] += count
+
+    def merge(self, stages):
+        """Add stage times from as_dict(), e.g. a letter rendered in another process."""
+        for stage, entry in (stages or {}).items():
+            self.add(stage, entry['seconds'], entry['count'])
+
+    def as_dict(self):
+        return {stage: {'seconds': round(seconds, 4), 'count': count}
+                for stage, (seconds, count) in self.stages.items()}
+
+    def report(self):
+        """The breakdown as text, slowest stage first."""
+        total = sum(seconds for seconds, count in self.stages.values())
+        lines = [f"Stage breakdown for {self.name} ({self.elapsed:.2f} s):"]
+        for stage, (seconds, count) in sorted(self.stages.items(), key=lambda item: -item[1][0]):
+            share = seconds / total * 100 if total else 0.0
+            lines.append(f"  {stage:<16} {seconds:8.3f} s {share:5.1f}%  ({count}x)")
+        if self.elapsed > total:
+            lines.append(f"  {'other':<16} {self.elapsed - total:8.3f} s")
+        return '\n'.join(lines)
+
+
+class Profiler:
+    """cProfile a block when ``enabled``; ``path`` is the .prof file written afterwards."""
+
+    def __init__(self, name, enabled=True, log_dir=None):
+        self.name = name
+        self.enabled = enabled
+        self.log_dir = log_dir or LOG_DIR
+        self.path = None
+        self.profile = None
+
+    def __enter__(self):
+        if self.enabled:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profile is None:
+            return False
+        self.profile.disable()
+        stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        base = os.path.join(self.log_dir, f"profile_{self.name}_{stamp}")
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            self.profile.dump_stats(base + '.prof')
+            text = io.StringIO()
+            pstats.Stats(self.profile, stream=text).sort_stats('cumulative').print_stats(PROFILE_LINES)
+            with open(base + '.txt', 'w', encoding='utf-8') as f:
+                f.write(text.getvalue())
+        except OSError as e:
+            logger.error("Failed to write profile to %s.prof: %s", base, e)
+        else:
+            self.path = base + '.prof'
+            logger.info("Profile of %s written to %s", self.name, self.path)
+        self.profile = None
+        return False
@@ -0,0 +1,256 @@
+import re
+from datetime import datetime
+import pandas as pd
+from .bank import normalize_columns
+from .errors import InputDataError, InvalidRequestError
+from .identifiers import OK, error_message, first_error, normalize_identifiers
+from .intervals import merge_date_ranges, parse_date
+from .timing import timed
+
+TSP_NAMES = ["Airtel", "Jio", "Vodafone", "BSNL"]
+REQUEST_TYPES = ["CAF", "CDR", "IMEI CDR", "Aadhar linked numbers", "PoS code"]
+DATED_REQUEST_TYPES = ["CDR", "IMEI CDR"]
+# Pick the operator of each mobile number from the MSISDN series index
+AUTO_TSP = "Auto"
+AUTO_REQUEST_TYPES = ["CAF", "CDR"]
+
+# Identifier kind (see engine.identifiers) each request type asks about
+REQUEST_KINDS = {
+    "CAF": "mobile",
+    "CDR": "mobile",
+    "IMEI CDR": "imei",
+    "Aadhar linked numbers": "aadhaar",
+    "PoS code": "pos",
+}
+
+
+def validate_identifiers(request_type, identifiers):
+    """Return an error message for the first invalid identifier, else None."""
+    if request_type not in REQUEST_TYPES:
+        return f"Invalid request type: {request_type}"
+    identifiers = [i for i in identifiers if i]
+    if not identifiers:
+        return f"At least one {request_type.lower()} is required."
+    return first_error(identifiers, REQUEST_KINDS[request_type])
+
+
+def clean_identifiers(request_type, identifiers):
+    """Normalized identifiers without duplicates; invalid ones are kept as typed."""
+    identifiers = [str(i).strip() for i in identifiers if i]
+    if request_type not in REQUEST_KINDS or not identifiers:
+        return identifiers
+    normalized, codes = normalize_identifiers(identifiers, REQUEST_KINDS[request_type])
+    return list(dict.fromkeys(
+        value if code == OK else original
+        for original, value, code in zip(identifiers, normalized.tolist(), codes.tolist())
+    ))
+
+
+def validate_date_range(request_type, from_date, to_date):
+    if request_type not in DATED_REQUEST_TYPES:
+        return None
+    if not from_date or not to_date:
+        return "From and To dates are required."
+    if not re.match(r'^\d{2}-\d{2}-\d{4}$', from_date) or not re.match(r'^\d{2}-\d{2}-\d{4}$', to_date):
+        return "Dates must be in DD-MM-YYYY format."
+    start, end = parse_date(from_date), parse_date(to_date)
+    if not start or not end:
+        return "Dates must be valid calendar dates."
+    if start > end:
+        return f"From date {from_date} is after To date {to_date}."
+    return None
+
+
+def validate_date_ranges(request_type, ranges):
+    """Like validate_date_range for a list of (from_date, to_date) pairs."""
+    if request_type not in DATED_REQUEST_TYPES:
+        return None
+    if not ranges:
+        return "At least one date range is required."
+    for from_date, to_date in ranges:
+        error = validate_date_range(request_type, from_date, to_date)
+        if error:
+            return error
+    return None
+
+
+def build_tsp_case(crime_number, ncrp_id, tsp, request_type, identifiers, from_date=None, to_date=None,
+                   date_ranges=None):
+    """Case dict consumed by render_tsp_letter.
+
+    ``date_ranges`` (a list of (from_date, to_date) pairs) replaces the single
+    from/to pair; overlapping and adjacent ranges are merged.
+    """
+    identifiers = clean_identifiers(request_type, identifiers)
+    if request_type in DATED_REQUEST_TYPES:
+        date_ranges = merge_date_ranges(date_ranges or [(from_date, to_date)]) or [(from_date, to_date)]
+    else:
+        date_ranges = []
+    return {
+        'CrimeNumber': crime_number,
+        'NCRP_ID': ncrp_id,
+        'RecipientName': 'N/A',
+        'RequestDate': datetime.now().strftime("%d-%m-%Y"),
+        'TSP': tsp or 'N/A',
+        'MobileNo': identifiers if request_type in ["CAF", "CDR"] else [],
+        'Address': 'N/A',
+        'Date_Ranges': date_ranges,
+        'LetterType': 'TSP',
+        'Request_Type': request_type,
+        'IMEI_No': identifiers if request_type == "IMEI CDR" else [],
+        'Aadhar_No': identifiers if request_type == "Aadhar linked numbers" else [],
+        'PoS_Code': identifiers if request_type == "PoS code" else []
+    }
+
+
+@timed('group_cases')
+def build_tsp_cases_by_operator(crime_number, ncrp_id, request_type, identifiers, from_date, to_date, index,
+                                date_ranges=None):
+    """Split mobile numbers by operator with an MsisdnIndex.
+
+    Returns (cases, unknown): one case per operator found, plus the numbers
+    that are not in any series.
+    """
+    if request_type not in AUTO_REQUEST_TYPES:
+        raise InvalidRequestError(f"Automatic TSP detection only works for {' and '.join(AUTO_REQUEST_TYPES)} requests")
+    groups, unknown = index.split([i for i in identifiers if i])
+    cases = [
+        build_tsp_case(crime_number, ncrp_id, tsp, request_type, groups[tsp], from_date, to_date, date_ranges)
+        for tsp in TSP_NAMES if tsp in groups
+    ]
+    return cases, unknown
+
+
+# Bulk import: one row per identifier, grouped into one letter per
+# (TSP, request type, merged date ranges)
+IMPORT_COLUMNS = ['identifier', 'tsp', 'request_type', 'from_date', 'to_date']
+IMPORT_ALIASES = {
+    'number': 'identifier', 'mobile_no': 'identifier', 'phone_no': 'identifier',
+    'operator': 'tsp', 'type': 'request_type', 'date_from': 'from_date', 'date_to': 'to_date',
+}
+DATE_FORMATS = ["%d-%m-%Y", "%Y-%m-%d", "%d/%m/%Y", "%Y-%m-%d %H:%M:%S"]
+
+
+def normalize_date(value):
+    """Return a date cell as DD-MM-YYYY, or the original text if it does not parse."""
+    value = str(value).strip() if value is not None else ''
+    if not value or value.lower() == 'nan':
+        return None
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt).strftime("%d-%m-%Y")
+        except ValueError:
+            continue
+    return value
+
+
+@timed('read_excel')
+def read_tsp_sheet(path):
+    """Read a CSV/Excel sheet of (identifier, TSP, request type, from date, to date) rows."""
+    try:
+        if path.lower().endswith('.csv'):
+            df = pd.read_csv(path, dtype=str)
+        else:
+            df = pd.read_excel(path, sheet_name=0, dtype=str)
+    except FileNotFoundError:
+        raise InputDataError("Spreadsheet not found")
+    except Exception as e:
+        raise InputDataError(f"Failed to read spreadsheet: {e}")
+    df = normalize_columns(df).rename(columns=IMPORT_ALIASES)
+    missing = {'identifier', 'tsp', 'request_type'} - set(df.columns)
+    if missing:
+        raise InputDataError(f"Missing required columns: {', '.join(sorted(missing))}")
+    for column in IMPORT_COLUMNS:
+        if column not in df.columns:
+            df[column] = None
+    df = df[IMPORT_COLUMNS].dropna(subset=['identifier'])
+    if df.empty:
+        raise InputDataError("The spreadsheet has no identifiers")
+    return df
+
+
+def has_auto_tsp(df):
+    return df['tsp'].fillna('').str.strip().str.lower().eq(AUTO_TSP.lower()).any()
+
+
+def group_tsp_rows(df, index=None):
+    """Return (groups, errors); each group is (tsp, request_type, date_ranges, identifiers).
+
+    Date ranges given for the same identifier on several rows are merged, and
+    identifiers with the same merged ranges share a group.
+
+    Rows with an unknown TSP or request type, an invalid identifier or a
+    missing date range are reported by sheet row number and left out. Rows
+    whose TSP is "Auto" get their operator from ``index`` (an MsisdnIndex).
+    """
+    tsp_lookup = {name.lower(): name for name in TSP_NAMES}
+    if index is not None:
+        tsp_lookup[AUTO_TSP.lower()] = AUTO_TSP
+    type_lookup = {name.lower(): name for name in REQUEST_TYPES}
+    df = df.copy()
+    df['tsp'] = df['tsp'].fillna('').str.strip().str.lower().map(tsp_lookup)
+    df['request_type'] = df['request_type'].fillna('').str.strip().str.lower().map(type_lookup)
+
+    row_errors = {}
+    identifiers_ok = pd.Series(True, index=df.index)
+    for request_type, kind in REQUEST_KINDS.items():
+        rows = df.index[df['request_type'] == request_type]
+        if not len(rows):
+            continue
+        normalized, codes = normalize_identifiers(df.loc[rows, 'identifier'].tolist(), kind)
+        df.loc[rows, 'identifier'] = normalized
+        bad = codes != OK
+        identifiers_ok[rows[bad]] = False
+        for line, code in zip(rows[bad], codes[bad]):
+            row_errors[line] = error_message(kind, code)
+
+    auto = (df['tsp'] == AUTO_TSP) & identifiers_ok
+    if auto.any():
+        df.loc[auto, 'tsp'] = index.lookup_many(df.loc[auto, 'identifier'].tolist())
+        df.loc[auto & ~df['request_type'].isin(AUTO_REQUEST_TYPES), 'tsp'] = None
+        for line in df.index[auto & df['tsp'].isna() & df['request_type'].isin(AUTO_REQUEST_TYPES)]:
+            row_errors[line] = "operator not found in the number series"
+    df.loc[df['tsp'] == AUTO_TSP, 'tsp'] = None
+
+    valid = df['tsp'].notna() & df['request_type'].notna() & identifiers_ok
+    for line in df.index[~valid]:
+        row_errors.setdefault(line, "unknown TSP or request type")
+
+    dated = df['request_type'].isin(DATED_REQUEST_TYPES)
+    df['from_date'] = df['from_date'].map(normalize_date).where(dated, None)
+    df['to_date'] = df['to_date'].map(normalize_date).where(dated, None)
+    for line in df.index[valid & dated]:
+        from_date, to_date = (None if pd.isna(v) else v for v in df.loc[line, ['from_date', 'to_date']])
+        error = validate_date_range(df.at[line, 'request_type'], from_date, to_date)
+        if error:
+            row_errors[line] = error
+            valid[line] = False
+
+    # Merge the date ranges of each identifier, then give identifiers that end
+    # up with the same set of ranges one letter
+    ranges = {}
+    for tsp, request_type, identifier, from_date, to_date in df.loc[
+            valid, ['tsp', 'request_type', 'identifier', 'from_date', 'to_date']].itertuples(index=False):
+        key = (tsp, request_type, identifier)
+        ranges.setdefault(key, [])
+        if request_type in DATED_REQUEST_TYPES:
+            ranges[key].append((from_date, to_date))
+    letters = {}
+    for (tsp, request_type, identifier), pairs in ranges.items():
+        merged = tuple(merge_date_ranges(pairs))
+        letters.setdefault((tsp, request_type, merged), []).append(identifier)
+    groups = [(tsp, request_type, list(merged), identifiers)
+              for (tsp, request_type, merged), identifiers in letters.items()]
+    errors = [f"Row {line + 2}: {message}" for line, message in sorted(row_errors.items())]
+    return groups, errors
+
+
+@timed('group_cases')
+def build_tsp_import_cases(df, crime_number, ncrp_id, index=None):
+    """Return (cases, errors), one case per TSP / request type / set of date ranges."""
+    groups, errors = group_tsp_rows(df, index)
+    cases = [
+        build_tsp_case(crime_number, ncrp_id, tsp, request_type, identifiers, date_ranges=date_ranges)
+        for tsp, request_type, date_ranges, identifiers in groups
+    ]
+    return cases, errors
@@ -0,0 +1,223 @@
+"""Canonical form and platform of pasted URLs and account IDs.
+
+``classify(value)`` returns ``(platform, id_type, canonical)``:
+
+* URLs get an https scheme, lower-case host without ``www.``/``m.``
+  prefixes, one domain for sites with several (fb.com -> facebook.com,
+  twitter.com -> x.com, ...), no tracking parameters (utm_*, fbclid, igshid,
+  ... everywhere, and platform-specific ones such as Twitter's ``s``/``t``
+  only on that platform) and no trailing slash; handle paths are lower-cased
+  where the platform treats them case-insensitively. Link shims such as
+  ``l.facebook.com/l.php?u=...`` are replaced by the URL they point to.
+* ``@handle`` and ``ig:handle``-style IDs become profile URLs when the
+  platform is known from a prefix or from ``default_platform``.
+* Gmail addresses, Android advertising IDs and Google/YouTube URLs are
+  Google, with id_type ``Gmail ID``, ``GAID`` or ``URL``; phone numbers and
+  wa.me links are WhatsApp.
+
+Values that match nothing get platform None.
+"""
+import re
+from urllib.parse import parse_qsl, unquote, urlencode, urlsplit
+from .identifiers import OK, normalize_identifiers
+
+PLATFORM_DOMAINS = {
+    "Facebook": ["facebook.com", "fb.com", "fb.me", "fb.watch", "messenger.com"],
+    "Instagram": ["instagram.com", "instagr.am"],
+    "Twitter": ["x.com", "twitter.com", "t.co"],
+    "Telegram": ["t.me", "telegram.me", "telegram.dog"],
+    "WhatsApp": ["wa.me", "whatsapp.com", "api.whatsapp.com", "chat.whatsapp.com"],
+    "Google": ["google.com", "gmail.com", "youtube.com", "youtu.be", "goo.gl", "blogspot.com"],
+}
+DOMAIN_PLATFORMS = {domain: platform for platform, domains in PLATFORM_DOMAINS.items() for domain in domains}
+# Alternative domains of the same site
+DOMAIN_ALIASES = {
+    'fb.com': 'facebook.com',
+    'twitter.com': 'x.com',
+    'instagr.am': 'instagram.com',
+    'telegram.me': 't.me',
+    'telegram.dog': 't.me',
+}
+# Sub-domains that are only a device or language variant of the main site
+VARIANT_PREFIXES = ('www.', 'm.', 'mobile.', 'mbasic.', 'web.', 'touch.', 'lm.', 'l.')
+# Sub-domains that are a different service and keep their own host
+KEEP_HOSTS = {'chat.whatsapp.com', 'api.whatsapp.com', 'drive.google.com', 'docs.google.com',
+              'play.google.com', 'maps.google.com', 'photos.google.com', 'sites.google.com'}
+# Platforms whose usernames are case-insensitive
+CASE_INSENSITIVE = {"Facebook", "Instagram", "Twitter", "Telegram"}
+# Hosts whose first path segment can be a username; shorteners (t.co, fb.me,
+# fb.watch) carry case-sensitive codes and are left as they are
+USERNAME_HOSTS = {'facebook.com', 'instagram.com', 'x.com', 't.me'}
+USERNAME_SEGMENT = re.compile(r'^[A-Za-z0-9_.]{1,64}$')
+
+# Query parameters that only track the click, removed on every site
+TRACKING_PARAMS = {'fbclid', 'gclid', 'dclid', 'igshid', 'igsh', 'mibextid', 'mc_cid', 'mc_eid'}
+TRACKING_PREFIXES = ('utm_',)
+# Parameters that track only on a given platform; elsewhere (and YouTube's ``t``,
+# a timestamp) they mean something and are kept
+PLATFORM_TRACKING_PARAMS = {
+    "Facebook": {'rdid', 'share_url', 'sfnsn', 'ref', 'refsrc', 'hc_ref', 'hc_location', 'notif_id', 'notif_t',
+                 'app', 's', 'wtsid', 'extid', 'paipv', 'eav', 'sk', 'context', 'entry_point'},
+    "Instagram": {'ref', 'hl', 'img_index'},
+    "Twitter": {'s', 't', 'ref_src', 'ref_url'},
+    "Google": {'si', 'feature', 'usp', 'hl'},
+}
+PLATFORM_TRACKING_PREFIXES = {
+    "Facebook": ('__', 'fb_'),
+    "Instagram": ('ig_',),
+}
+# Link shims that redirect to the URL in a query parameter: host -> parameter
+REDIRECT_HOSTS = {'l.facebook.com': 'u', 'lm.facebook.com': 'u', 'l.messenger.com': 'u', 'l.instagram.com': 'u'}
+
+HANDLE_PREFIXES = {
+    'fb': "Facebook", 'facebook': "Facebook",
+    'ig': "Instagram", 'insta': "Instagram", 'instagram': "Instagram",
+    'tw': "Twitter", 'twitter': "Twitter", 'x': "Twitter",
+    'tg': "Telegram", 'telegram': "Telegram",
+    'wa': "WhatsApp", 'whatsapp': "WhatsApp",
+}
+HANDLE_PATTERN = re.compile(r'^@?([A-Za-z0-9_.]{1,64})$')
+GMAIL_PATTERN = re.compile(r'^[A-Za-z0-9._%+-]+@(gmail|googlemail)\.com$', re.IGNORECASE)
+EMAIL_PATTERN = re.compile(r'^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$')
+GAID_PATTERN = re.compile(r'^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$', re.IGNORECASE)
+PHONE_PATTERN = re.compile(r'^\+?[\d\s().-]{8,20}$')
+URL_PATTERN = re.compile(r'^(https?://)?([a-z0-9-]+\.)+[a-z]{2,}(:\d+)?([/?#]|$)', re.IGNORECASE)
+
+
+def _canonical_host(host):
+    host = host.lower().rstrip('.')
+    if host.endswith(':80') or host.endswith(':443'):
+        host = host.rsplit(':', 1)[0]
+    if host in KEEP_HOSTS:
+        return host, DOMAIN_PLATFORMS.get(host) or DOMAIN_PLATFORMS.get(host.split('.', 1)[1])
+    stripped = host
+    while stripped.startswith(VARIANT_PREFIXES) and stripped.count('.') > 1:
+        stripped = stripped.split('.', 1)[1]
+    # Regional Google domains (google.co.in) and any sub-domain of a known domain
+    if re.match(r'^google\.(co\.)?[a-z]{2,3}$', stripped):
+        return 'google.com', "Google"
+    parts = stripped.split('.')
+    for i in range(len(parts) - 1):
+        domain = '.'.join(parts[i:])
+        if domain in DOMAIN_PLATFORMS:
+            platform = DOMAIN_PLATFORMS[domain]
+            if i == 0:
+                return DOMAIN_ALIASES.get(domain, domain), platform
+            return stripped, platform
+    return stripped, None
+
+
+def _is_tracking(param, platform):
+    param = param.lower()
+    return (param in TRACKING_PARAMS or param.startswith(TRACKING_PREFIXES)
+            or param in PLATFORM_TRACKING_PARAMS.get(platform, ())
+            or param.startswith(PLATFORM_TRACKING_PREFIXES.get(platform, ())))
+
+
+def _redirect_target(parts):
+    """The URL a link shim such as l.facebook.com/l.php?u=... points to, or None."""
+    param = REDIRECT_HOSTS.get(parts.netloc.split('@')[-1].lower())
+    if not param:
+        return None
+    target = dict(parse_qsl(parts.query)).get(param, '').strip()
+    return target if URL_PATTERN.match(target) else None
+
+
+def canonical_url(url):
+    """Return (platform, canonical URL) for a URL; platform is None for unknown sites."""
+    text = url.strip()
+    if not re.match(r'^https?://', text, re.IGNORECASE):
+        text = 'https://' + text
+    parts = urlsplit(text)
+    target = _redirect_target(parts)
+    if target:
+        return canonical_url(target)
+    host, platform = _canonical_host(parts.netloc.split('@')[-1])
+    query = [(k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not _is_tracking(k, platform)]
+    path = re.sub(r'/{2,}', '/', unquote(parts.path)).rstrip('/')
+
+    if platform == "WhatsApp" and host in ('wa.me', 'api.whatsapp.com'):
+        # wa.me/919876543210 and api.whatsapp.com/send?phone=... name a phone number
+        number = dict(query).get('phone') or path.lstrip('/')
+        if number and sum(ch.isdigit() for ch in number) >= 10:
+            return platform, canonical_phone(number)
+    if platform in CASE_INSENSITIVE and host in USERNAME_HOSTS and path:
+        # Only the username is case-insensitive; post codes and Telegram
+        # invite links (t.me/+code, t.me/joinchat/code) are not
+        segments = path.split('/')
+        if (len(segments) == 2 or platform == "Twitter") and USERNAME_SEGMENT.match(segments[1]):
+            segments[1] = segments[1].lower()
+        path = '/'.join(segments)
+    canonical = f"https://{host}{path}"
+    if query:
+        canonical += '?' + urlencode(query)
+    return platform, canonical
+
+
+def canonical_phone(number):
+    """10-digit Indian mobile number, or the number as typed (digits and a leading +) otherwise."""
+    normalized, codes = normalize_identifiers([number], 'mobile')
+    if codes[0] == OK:
+        return str(normalized[0])
+    digits = re.sub(r'[^\d+]', '', number)
+    return digits if digits.startswith('+') else '+' + digits
+
+
+def profile_url(platform, handle):
+    handle = handle.lstrip('@')
+    if platform in CASE_INSENSITIVE:
+        handle = handle.lower()
+    if platform == "WhatsApp":
+        return canonical_phone(handle)
+    return f"https://{PLATFORM_DOMAINS[platform][0]}/{handle}"
+
+
+def classify(value, default_platform=None):
+    """Return (platform, id_type, canonical) for one pasted URL or ID."""
+    text = str(value).strip().strip('<>"\'')
+    if not text:
+        return None, None, text
+    if GMAIL_PATTERN.match(text):
+        return "Google", "Gmail ID", text.lower()
+    if GAID_PATTERN.match(text):
+        return "Google", "GAID", text.lower()
+    if EMAIL_PATTERN.match(text):
+        if default_platform == "Google":
+            return "Google", "Gmail ID", text.lower()
+        return None, None, text
+    if PHONE_PATTERN.match(text) and sum(ch.isdigit() for ch in text) >= 10:
+        return "WhatsApp", None, canonical_phone(text)
+
+    prefix, _, rest = text.partition(':')
+    if rest and prefix.lower() in HANDLE_PREFIXES and HANDLE_PATTERN.match(rest.strip()):
+        platform = HANDLE_PREFIXES[prefix.lower()]
+        return platform, None, profile_url(platform, rest.strip())
+
+    if URL_PATTERN.match(text):
+        platform, canonical = canonical_url(text)
+        return platform, "URL" if platform == "Google" else None, canonical
+
+    match = HANDLE_PATTERN.match(text)
+    if match and default_platform in PLATFORM_DOMAINS and default_platform != "Google":
+        return default_platform, None, profile_url(default_platform, match.group(1))
+    return None, None, text
+
+
+def classify_many(values, default_platform=None, platforms=None):
+    """Group values by platform, dropping duplicates after canonicalization.
+
+    Returns ({(platform, id_type): [canonical, ...]}, [unclassified values]).
+    Platforms not in ``platforms`` (when given) count as unclassified.
+    """
+    groups, unknown, seen = {}, [], set()
+    for value in values:
+        platform, id_type, canonical = classify(value, default_platform)
+        if not platform or (platforms is not None and platform not in platforms):
+            if str(value).strip():
+                unknown.append(str(value).strip())
+            continue
+        if (platform, canonical) in seen:
+            continue
+        seen.add((platform, canonical))
+        groups.setdefault((platform, id_type), []).append(canonical)
+    return groups, unknown
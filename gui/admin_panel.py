@@ -1,20 +1,15 @@
-import pathlib
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import sqlite3
+import re
 import bcrypt
-import pandas as pd
 from db.database import connect_db
+from db.export import DATASETS, export_dataset
+from .virtual_list import Debouncer, SQLitePageSource, VirtualTreeview
 import logging
 
-# Set up logging
-log_dir = pathlib.Path.home() / 'Documents' / 'LetterGeneratorLogs'
-log_dir.mkdir(parents=True, exist_ok=True)
-logging.basicConfig(
-    filename=log_dir / 'admin_panel.log',
-    level=logging.DEBUG,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+logger = logging.getLogger(__name__)
+
 
 class AdminPanel:
     def __init__(self, root):
@@ -35,19 +30,22 @@ class AdminPanel:
         self.search_var = tk.StringVar()
         self.search_entry = ttk.Entry(search_frame, textvariable=self.search_var, font=("Segoe UI", 10))
         self.search_entry.pack(side="left", padx=5, fill="x", expand=True)
-        self.search_entry.bind("<KeyRelease>", self.filter_officers)
+        self.search_entry.bind("<KeyRelease>", Debouncer(self.search_entry, self.filter_officers))
         tk.Label(search_frame, text="Filter by:", font=("Segoe UI", 10, "bold"), bg="#f4f6f9", fg="#333").pack(side="left", padx=5)
         self.filter_var = tk.StringVar(value="Username")
         filter_combo = ttk.Combobox(search_frame, textvariable=self.filter_var, values=["Username", "Designation"], state="readonly", width=12)
         filter_combo.pack(side="left", padx=5)
         filter_combo.bind("<<ComboboxSelected>>", self.filter_officers)
 
-        # Officer Treeview
-        self.tree = ttk.Treeview(root, columns=("Id", "Username", "Name", "Designation", "Phone", "Email"), show="headings", height=12)
-        for col in self.tree["columns"]:
-            self.tree.heading(col, text=col)
-            self.tree.column(col, anchor="center")
-        self.tree.pack(padx=20, pady=10, fill="both", expand=True)
+        # Officer list (only the visible rows are materialised)
+        self.officer_source = SQLitePageSource(
+            "Officers", ("Id", "Username", "OfficerName", "Designation", "Phone", "Email")
+        )
+        self.officer_list = VirtualTreeview(
+            root, ("Id", "Username", "Name", "Designation", "Phone", "Email"), self.officer_source, height=12
+        )
+        self.officer_list.pack(padx=20, pady=10, fill="both", expand=True)
+        self.tree = self.officer_list.tree
 
         # Button Frame
         button_frame = tk.Frame(root, bg="#f4f6f9")
@@ -56,7 +54,8 @@ class AdminPanel:
         ttk.Button(button_frame, text="✏️ Edit Officer", command=self.edit_officer_dialog).pack(side="left", padx=10)
         ttk.Button(button_frame, text="🗑️ Delete Selected", command=self.delete_selected).pack(side="left", padx=10)
         ttk.Button(button_frame, text="🔄 Refresh", command=self.load_officers).pack(side="left", padx=10)
-        ttk.Button(button_frame, text="📄 Export to CSV", command=self.export_to_csv).pack(side="left", padx=10)
+        ttk.Button(button_frame, text="📄 Export", command=self.export_dialog).pack(side="left", padx=10)
+        ttk.Button(button_frame, text="📁 Case History", command=self.show_case_history).pack(side="left", padx=10)
         ttk.Button(button_frame, text="🔑 Change Admin Password", command=self.change_admin_password).pack(side="left", padx=10)
         ttk.Button(button_frame, text="🚪 Logout", command=self.logout).pack(side="left", padx=10)
 
@@ -68,61 +67,56 @@ class AdminPanel:
         style.configure("TButton", font=("Segoe UI", 10, "bold"), padding=8)
         style.configure("TCombobox", font=("Segoe UI", 10), padding=5)
         style.configure("TEntry", font=("Segoe UI", 10), padding=5)
-        logging.debug("AdminPanel initialized")
+        logger.debug("AdminPanel initialized")
 
     def load_officers(self):
-        """Load all officers into the Treeview."""
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+        """Load officers into the Treeview."""
+        self.search_var.set("")
+        self.officer_source.set_filter()
+        self.refresh_officers()
+
+    def refresh_officers(self):
+        """Re-read the officer source and redraw the visible rows."""
         try:
-            conn = connect_db()
-            if not conn:
-                messagebox.showerror("Error", "Failed to connect to database")
-                logging.error("Failed to connect to database")
-                return
-            cursor = conn.cursor()
-            cursor.execute("SELECT Id, Username, OfficerName, Designation, Phone, Email FROM Officers")
-            for row in cursor.fetchall():
-                self.tree.insert("", "end", values=row)
-            logging.debug(f"Loaded {len(self.tree.get_children())} officers")
+            self.officer_list.refresh()
+            logger.debug("Loaded %s officers", len(self.officer_source))
         except sqlite3.OperationalError as e:
             messagebox.showerror("Error", f"Database operation failed: {e}")
-            logging.error(f"Database operation failed: {e}")
+            logger.error("Database operation failed: %s", e)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load officers: {e}")
-            logging.error(f"Failed to load officers: {e}")
-        finally:
-            if conn:
-                conn.close()
+            logger.error("Failed to load officers: %s", e)
 
     def filter_officers(self, event=None):
         """Filter officers based on search term and column."""
         search_term = self.search_var.get().lower()
         filter_by = self.filter_var.get()
-        column_index = {"Username": 1, "Designation": 3}[filter_by]
-        for row in self.tree.get_children():
-            self.tree.delete(row)
+        if filter_by not in ("Username", "Designation"):
+            return
+        if search_term:
+            self.officer_source.set_filter(f"LOWER({filter_by}) LIKE ?", (f"%{search_term}%",))
+        else:
+            self.officer_source.set_filter()
+        self.refresh_officers()
+        logger.debug("Filtered officers by %s: %s", filter_by, search_term)
+
+    def show_case_history(self):
+        """Open a window listing every registered case."""
+        win = tk.Toplevel(self.root)
+        win.title("Case History")
+        win.geometry("700x450")
+        win.configure(bg="#f4f6f9")
+        win.transient(self.root)
+
+        source = SQLitePageSource("Cases", ("Id", "CrimeNumber", "NCRP_ID", "CreatedAt"))
+        case_list = VirtualTreeview(win, ("Id", "Crime Number", "NCRP ID", "Created At"), source, height=15)
+        case_list.pack(padx=20, pady=10, fill="both", expand=True)
         try:
-            conn = connect_db()
-            if not conn:
-                messagebox.showerror("Error", "Failed to connect to database")
-                logging.error("Failed to connect to database")
-                return
-            cursor = conn.cursor()
-            query = f"SELECT Id, Username, OfficerName, Designation, Phone, Email FROM Officers WHERE LOWER({filter_by}) LIKE ?"
-            cursor.execute(query, (f"%{search_term}%",))
-            for row in cursor.fetchall():
-                self.tree.insert("", "end", values=row)
-            logging.debug(f"Filtered officers by {filter_by}: {search_term}")
-        except sqlite3.OperationalError as e:
-            messagebox.showerror("Error", f"Database operation failed: {e}")
-            logging.error(f"Database operation failed: {e}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to filter officers: {e}")
-            logging.error(f"Failed to filter officers: {e}")
-        finally:
-            if conn:
-                conn.close()
+            case_list.refresh()
+            logger.debug("Loaded case history: %s cases", len(source))
+        except sqlite3.Error as e:
+            messagebox.showerror("Error", f"Database operation failed: {e}", parent=win)
+            logger.error("Failed to load case history: %s", e)
 
     def add_officer_dialog(self):
         """Open dialog to add a new officer."""
@@ -160,14 +154,14 @@ class AdminPanel:
             values = {f: e.get().strip() for f, e in entries.items()}
             if not all(values.values()):
                 messagebox.showwarning("Validation", "All fields are required.")
-                logging.warning("Add officer failed: All fields are required")
+                logger.warning("Add officer failed: All fields are required")
                 return
             hashed_pw = bcrypt.hashpw(values["Password"].encode("utf-8"), bcrypt.gensalt())
             try:
                 conn = connect_db()
                 if not conn:
                     messagebox.showerror("Error", "Failed to connect to database")
-                    logging.error("Failed to connect to database")
+                    logger.error("Failed to connect to database")
                     return
                 cursor = conn.cursor()
                 cursor.execute(
@@ -176,22 +170,22 @@ class AdminPanel:
                 )
                 conn.commit()
                 messagebox.showinfo("Success", "Officer added successfully.")
-                logging.debug(f"Added officer: {values['Username']}")
+                logger.debug("Added officer: %s", values['Username'])
                 win.destroy()
                 self.load_officers()
             except sqlite3.IntegrityError as e:
                 messagebox.showerror("Error", f"Username '{values['Username']}' already exists. Please choose a different username.")
-                logging.error(f"Add officer failed: Username '{values['Username']}' already exists - {e}")
+                logger.error("Add officer failed: Username '%s' already exists - %s", values['Username'], e)
             except sqlite3.OperationalError as e:
                 if "database is locked" in str(e):
                     messagebox.showerror("Error", "Database is locked. Please try again later.")
-                    logging.error("Database is locked during add officer")
+                    logger.error("Database is locked during add officer")
                 else:
                     messagebox.showerror("Error", f"Database operation failed: {e}")
-                    logging.error(f"Database operation failed: {e}")
+                    logger.error("Database operation failed: %s", e)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to add officer: {e}")
-                logging.error(f"Failed to add officer: {e}")
+                logger.error("Failed to add officer: %s", e)
             finally:
                 if conn:
                     conn.close()
@@ -210,28 +204,28 @@ class AdminPanel:
         selected = self.tree.selection()
         if not selected:
             messagebox.showwarning("No Selection", "Select an officer to edit.")
-            logging.warning("Edit officer failed: No officer selected")
+            logger.warning("Edit officer failed: No officer selected")
             return
         officer_id = self.tree.item(selected[0])['values'][0]
         try:
             conn = connect_db()
             if not conn:
                 messagebox.showerror("Error", "Failed to connect to database")
-                logging.error("Failed to connect to database")
+                logger.error("Failed to connect to database")
                 return
             cursor = conn.cursor()
             cursor.execute("SELECT Username, OfficerName, Designation, Phone, Email FROM Officers WHERE Id = ?", (officer_id,))
             officer_data = cursor.fetchone()
             if not officer_data:
                 messagebox.showerror("Error", "Officer not found.")
-                logging.error(f"Officer not found for ID: {officer_id}")
+                logger.error("Officer not found for ID: %s", officer_id)
                 return
         except sqlite3.OperationalError as e:
             messagebox.showerror("Error", f"Database operation failed: {e}")
-            logging.error(f"Database operation failed: {e}")
+            logger.error("Database operation failed: %s", e)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to load officer data: {e}")
-            logging.error(f"Failed to load officer data: {e}")
+            logger.error("Failed to load officer data: %s", e)
         finally:
             if conn:
                 conn.close()
@@ -274,13 +268,13 @@ class AdminPanel:
             values = {f: e.get().strip() for f, e in entries.items()}
             if not all(values.values()):
                 messagebox.showwarning("Validation", "All fields are required.")
-                logging.warning("Edit officer failed: All fields are required")
+                logger.warning("Edit officer failed: All fields are required")
                 return
             try:
                 conn = connect_db()
                 if not conn:
                     messagebox.showerror("Error", "Failed to connect to database")
-                    logging.error("Failed to connect to database")
+                    logger.error("Failed to connect to database")
                     return
                 cursor = conn.cursor()
                 if password_entry.get().strip():
@@ -296,22 +290,22 @@ class AdminPanel:
                     )
                 conn.commit()
                 messagebox.showinfo("Success", "Officer updated successfully.")
-                logging.debug(f"Updated officer ID: {officer_id}")
+                logger.debug("Updated officer ID: %s", officer_id)
                 win.destroy()
                 self.load_officers()
             except sqlite3.IntegrityError as e:
                 messagebox.showerror("Error", f"Username '{values['Username']}' already exists. Please choose a different username.")
-                logging.error(f"Edit officer failed: Username '{values['Username']}' already exists - {e}")
+                logger.error("Edit officer failed: Username '%s' already exists - %s", values['Username'], e)
             except sqlite3.OperationalError as e:
                 if "database is locked" in str(e):
                     messagebox.showerror("Error", "Database is locked. Please try again later.")
-                    logging.error("Database is locked during edit officer")
+                    logger.error("Database is locked during edit officer")
                 else:
                     messagebox.showerror("Error", f"Database operation failed: {e}")
-                    logging.error(f"Database operation failed: {e}")
+                    logger.error("Database operation failed: %s", e)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to update officer: {e}")
-                logging.error(f"Failed to update officer: {e}")
+                logger.error("Failed to update officer: %s", e)
             finally:
                 if conn:
                     conn.close()
@@ -323,13 +317,13 @@ class AdminPanel:
         selected = self.tree.selection()
         if not selected:
             messagebox.showwarning("No Selection", "Select an officer to delete.")
-            logging.warning("Delete officer failed: No officer selected")
+            logger.warning("Delete officer failed: No officer selected")
             return
         officer_id = self.tree.item(selected[0])['values'][0]
         username = self.tree.item(selected[0])['values'][1]
         if username == 'admin':
             messagebox.showerror("Error", "The admin account cannot be deleted.")
-            logging.error("Attempted to delete admin account")
+            logger.error("Attempted to delete admin account")
             return
         confirm = messagebox.askyesno("Confirm", "Are you sure you want to delete the selected officer?")
         if not confirm:
@@ -338,56 +332,93 @@ class AdminPanel:
             conn = connect_db()
             if not conn:
                 messagebox.showerror("Error", "Failed to connect to database")
-                logging.error("Failed to connect to database")
+                logger.error("Failed to connect to database")
                 return
             cursor = conn.cursor()
             cursor.execute("DELETE FROM Officers WHERE Id = ?", (officer_id,))
             conn.commit()
-            self.tree.delete(selected[0])
+            self.refresh_officers()
             messagebox.showinfo("Success", "Officer deleted successfully.")
-            logging.debug(f"Deleted officer ID: {officer_id}")
+            logger.debug("Deleted officer ID: %s", officer_id)
         except sqlite3.OperationalError as e:
             if "database is locked" in str(e):
                 messagebox.showerror("Error", "Database is locked. Please try again later.")
-                logging.error("Database is locked during delete officer")
+                logger.error("Database is locked during delete officer")
             else:
                 messagebox.showerror("Error", f"Database operation failed: {e}")
-                logging.error(f"Database operation failed: {e}")
+                logger.error("Database operation failed: %s", e)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to delete officer: {e}")
-            logging.error(f"Failed to delete officer: {e}")
+            logger.error("Failed to delete officer: %s", e)
         finally:
             if conn:
                 conn.close()
 
-    def export_to_csv(self):
-        """Export officer list to CSV."""
-        file_path = filedialog.asksaveasfilename(defaultextension=".csv", filetypes=[("CSV Files", "*.csv")])
-        if not file_path:
-            return
+    def export_dialog(self):
+        """Open dialog to export officers, cases or letters to CSV/Excel."""
+        win = tk.Toplevel(self.root)
+        win.title("Export Data")
+        win.geometry("400x380")
+        win.configure(bg="#f4f6f9")
+        win.transient(self.root)
+        win.grab_set()
+        win.resizable(False, False)
+
+        officers = {"All officers": None}
+        conn = None
         try:
             conn = connect_db()
-            if not conn:
-                messagebox.showerror("Error", "Failed to connect to database")
-                logging.error("Failed to connect to database")
-                return
-            cursor = conn.cursor()
-            cursor.execute("SELECT Id, Username, OfficerName, Designation, Phone, Email FROM Officers")
-            data = cursor.fetchall()
-            df = pd.DataFrame(data, columns=["Id", "Username", "OfficerName", "Designation", "Phone", "Email"])
-            df.to_csv(file_path, index=False)
-            messagebox.showinfo("Success", f"Officer list exported to {file_path}")
-            logging.debug(f"Exported officer list to {file_path}")
-        except sqlite3.OperationalError as e:
-            messagebox.showerror("Error", f"Database operation failed: {e}")
-            logging.error(f"Database operation failed: {e}")
-        except Exception as e:
-            messagebox.showerror("Error", f"Failed to export to CSV: {e}")
-            logging.error(f"Failed to export to CSV: {e}")
+            if conn:
+                for officer_id, username, name in conn.execute("SELECT Id, Username, OfficerName FROM Officers ORDER BY Username"):
+                    officers[f"{username} ({name})"] = officer_id
+        except sqlite3.Error as e:
+            logger.error("Failed to load officers for export filter: %s", e)
         finally:
             if conn:
                 conn.close()
 
+        tk.Label(win, text="Data:", bg="#f4f6f9", font=("Segoe UI", 10, "bold")).pack(pady=(10, 2), padx=10, anchor="w")
+        dataset_var = tk.StringVar(value="Officers")
+        ttk.Combobox(win, textvariable=dataset_var, values=list(DATASETS), state="readonly").pack(fill="x", padx=10)
+
+        tk.Label(win, text="Officer:", bg="#f4f6f9", font=("Segoe UI", 10, "bold")).pack(pady=(10, 2), padx=10, anchor="w")
+        officer_var = tk.StringVar(value="All officers")
+        ttk.Combobox(win, textvariable=officer_var, values=list(officers), state="readonly").pack(fill="x", padx=10)
+
+        tk.Label(win, text="From Date (YYYY-MM-DD, optional):", bg="#f4f6f9", font=("Segoe UI", 10, "bold")).pack(pady=(10, 2), padx=10, anchor="w")
+        from_entry = ttk.Entry(win, font=("Segoe UI", 10))
+        from_entry.pack(fill="x", padx=10)
+        tk.Label(win, text="To Date (YYYY-MM-DD, optional):", bg="#f4f6f9", font=("Segoe UI", 10, "bold")).pack(pady=(10, 2), padx=10, anchor="w")
+        to_entry = ttk.Entry(win, font=("Segoe UI", 10))
+        to_entry.pack(fill="x", padx=10)
+
+        def run_export():
+            dates = [from_entry.get().strip() or None, to_entry.get().strip() or None]
+            for value in dates:
+                if value and not re.match(r'^\d{4}-\d{2}-\d{2}$', value):
+                    messagebox.showerror("Error", "Dates must be in YYYY-MM-DD format.", parent=win)
+                    return
+            dataset = dataset_var.get()
+            file_path = filedialog.asksaveasfilename(
+                parent=win, defaultextension=".csv", initialfile=f"{dataset.lower()}.csv",
+                filetypes=[("CSV Files", "*.csv"), ("Excel Files", "*.xlsx")]
+            )
+            if not file_path:
+                return
+            try:
+                count = export_dataset(dataset, file_path, dates[0], dates[1], officers.get(officer_var.get()))
+                messagebox.showinfo("Success", f"Exported {count} {dataset.lower()} rows to {file_path}", parent=win)
+                logger.debug("Exported %s to %s", dataset, file_path)
+                win.destroy()
+            except sqlite3.OperationalError as e:
+                messagebox.showerror("Error", f"Database operation failed: {e}", parent=win)
+                logger.error("Database operation failed: %s", e)
+            except Exception as e:
+                messagebox.showerror("Error", f"Failed to export: {e}", parent=win)
+                logger.error("Failed to export %s: %s", dataset, e)
+
+        ttk.Button(win, text="Export", command=run_export).pack(pady=15)
+
     def change_admin_password(self):
         """Open dialog to change admin password."""
         win = tk.Toplevel(self.root)
@@ -408,35 +439,35 @@ class AdminPanel:
         def save():
             if new_password.get() != confirm_password.get():
                 messagebox.showerror("Error", "Passwords do not match.")
-                logging.error("Change admin password failed: Passwords do not match")
+                logger.error("Change admin password failed: Passwords do not match")
                 return
             if not new_password.get():
                 messagebox.showerror("Error", "Password cannot be empty.")
-                logging.error("Change admin password failed: Password is empty")
+                logger.error("Change admin password failed: Password is empty")
                 return
             try:
                 hashed_pw = bcrypt.hashpw(new_password.get().encode("utf-8"), bcrypt.gensalt())
                 conn = connect_db()
                 if not conn:
                     messagebox.showerror("Error", "Failed to connect to database")
-                    logging.error("Failed to connect to database")
+                    logger.error("Failed to connect to database")
                     return
                 cursor = conn.cursor()
                 cursor.execute("UPDATE Officers SET Password = ? WHERE Username = 'admin'", (hashed_pw,))
                 conn.commit()
                 messagebox.showinfo("Success", "Admin password updated successfully.")
-                logging.debug("Admin password updated successfully")
+                logger.debug("Admin password updated successfully")
                 win.destroy()
             except sqlite3.OperationalError as e:
                 if "database is locked" in str(e):
                     messagebox.showerror("Error", "Database is locked. Please try again later.")
-                    logging.error("Database is locked during change admin password")
+                    logger.error("Database is locked during change admin password")
                 else:
                     messagebox.showerror("Error", f"Database operation failed: {e}")
-                    logging.error(f"Database operation failed: {e}")
+                    logger.error("Database operation failed: %s", e)
             except Exception as e:
                 messagebox.showerror("Error", f"Failed to update password: {e}")
-                logging.error(f"Failed to update password: {e}")
+                logger.error("Failed to update password: %s", e)
             finally:
                 if conn:
                     conn.close()
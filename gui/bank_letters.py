@@ -1,28 +1,25 @@
 from pathlib import Path
-import sys
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import pandas as pd
 import os
-from docx import Document
-from db.database import connect_db, save_case, validate_case
-from datetime import datetime
-from .utils import replace_placeholder_in_paragraph
-import re
+from db.database import failed_groups, record_batch_errors, save_case, record_letter
+from engine import logs, metrics
+from engine.bank import build_bank_cases, read_bank_sheet
+from engine.batch import bank_jobs, bank_output_path
+from engine.bundle import export_bundle
+from engine.errors import BatchIssue, EngineError, InputDataError, TemplateNotFoundError
+from engine.merge import export_merged
+from engine.templates import template_path
 import logging
 
+logger = logging.getLogger(__name__)
+
 class BankLetters:
     def __init__(self, parent, app):
         self.parent = parent
         self.app = app
-        log_dir = os.path.join(Path.home(), 'Documents', 'LetterGeneratorLogs')
-        os.makedirs(log_dir, exist_ok=True)
-        logging.basicConfig(
-            filename=os.path.join(log_dir, 'bank_letters.log'),
-            level=logging.DEBUG,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
-        logging.debug("BankLetters initialized")
+        logger.debug("BankLetters initialized")
         self.bank_template_dir = None   # will be set each time a letter is generated
         self.setup_ui()
 
@@ -48,6 +45,20 @@ class BankLetters:
         self.generate_button.pack(pady=5)
         self.app.ToolTip(self.generate_button, "Generate letters from the selected Excel file ", self.app)
 
+        self.export_zip_button = ttk.Button(
+            bank_inner, text="Export ZIP", command=self.export_zip,
+            style="TButton", state="disabled"
+        )
+        self.export_zip_button.pack(pady=5)
+        self.app.ToolTip(self.export_zip_button, "Write all letters into one ZIP archive with a manifest", self.app)
+
+        self.print_file_button = ttk.Button(
+            bank_inner, text="Print File", command=self.export_print_file,
+            style="TButton", state="disabled"
+        )
+        self.print_file_button.pack(pady=5)
+        self.app.ToolTip(self.print_file_button, "Write all letters into one .docx, each starting on a new page", self.app)
+
         self.view_letters_bank_button = ttk.Button(
             bank_inner, text="View Letters", command=self.view_letters_bank,
             style="TButton", state="disabled"
@@ -59,330 +70,273 @@ class BankLetters:
             bank_inner, text="", font=("Segoe UI", 10), bg="white", fg=self.app.success_color
         )
         self.bank_status_label.pack(pady=5)
-        logging.debug("BankLetters UI setup complete")
-
-    def format_inr(self, amount):
-        try:
-            amount = float(re.sub(r'[^\d.]', '', str(amount)))
-        except:
-            return str(amount)
-        s = f"{amount:,.2f}"
-        s = s.split('.')
-        x = s[0]
-        if len(x) > 3:
-            x = x[:-3].replace(',', '')[::-1]
-            x = ','.join([x[i:i+2] for i in range(0, len(x), 2)])[::-1] + ',' + s[0][-3:]
-        else:
-            x = s[0]
-        return f"₹{x}/-"
-
-    def clean_account_number(self, x):
-        try:
-            if isinstance(x, float) and x.is_integer():
-                return str(int(x))
-            if isinstance(x, str) and x.replace('.', '', 1).isdigit():
-                f = float(x)
-                if f.is_integer():
-                    return str(int(f))
-                return str(f)
-            return str(x)
-        except Exception:
-            return str(x)
+        logger.debug("BankLetters UI setup complete")
 
     def select_excel(self):
         self.selected_file = filedialog.askopenfilename(filetypes=[("Excel files", "*.xlsx *.xls")])
         if self.selected_file:
             try:
-                df = pd.read_excel(self.selected_file, sheet_name=0)
-                df.columns = [col.strip().lower().replace(' ', '_') for col in df.columns]
-                required_columns = {
-                    'account_no', 'ifsc_code', 'transaction_amount', 'date_from',
-                    'date_to', 'transaction_id_/_utr_number2', 'bank/fis'
-                }
-                missing_columns = required_columns - set(df.columns)
-                if missing_columns:
-                    self.bank_status_label.config(text=f"Invalid Excel: Missing columns {', '.join(missing_columns)}", fg=self.app.error_color)
-                    self.generate_button.config(state="disabled")
-                    messagebox.showerror("Error", f"Missing required columns: {', '.join(missing_columns)}")
-                    logging.error(f"Missing Excel columns: {missing_columns}")
-                    return
-                if df.empty:
-                    self.bank_status_label.config(text="Invalid Excel: Sheet is empty", fg=self.app.error_color)
-                    self.generate_button.config(state="disabled")
-                    messagebox.showerror("Error", "Excel sheet is empty")
-                    logging.error("Excel sheet is empty")
-                    return
+                read_bank_sheet(self.selected_file)
                 self.excel_label.config(text=f"Selected: {os.path.basename(self.selected_file)}")
                 self.app.update_button_states()
-                logging.debug(f"Selected Excel file: {self.selected_file}")
-            except pd.errors.EmptyDataError:
-                self.bank_status_label.config(text="Invalid Excel: File is empty or corrupted", fg=self.app.error_color)
+                logger.debug("Selected Excel file: %s", self.selected_file)
+            except InputDataError as e:
+                self.bank_status_label.config(text=f"Invalid Excel: {str(e)}", fg=self.app.error_color)
                 self.generate_button.config(state="disabled")
-                messagebox.showerror("Error", "Excel file is empty or corrupted")
-                logging.error("Excel file is empty or corrupted")
-            except Exception as e:
-                self.bank_status_label.config(text=f"Invalid Excel file: {str(e)}", fg=self.app.error_color)
-                self.generate_button.config(state="disabled")
-                messagebox.showerror("Error", f"Failed to read Excel file: {str(e)}")
-                logging.error(f"Failed to read Excel file: {str(e)}")
+                self.export_zip_button.config(state="disabled")
+                self.print_file_button.config(state="disabled")
+                messagebox.showerror("Error", str(e))
+                logger.error("Invalid Excel file: %s", e)
         else:
             self.excel_label.config(text="No file selected")
             self.generate_button.config(state="disabled")
-            logging.debug("No Excel file selected")
+            self.export_zip_button.config(state="disabled")
+            self.print_file_button.config(state="disabled")
+            logger.debug("No Excel file selected")
 
-    def process_excel(self):
-        logging.debug("Starting bank letter generation")
+    def process_excel(self, only_groups=None):
+        """Generate the letters of the selected sheet; ``only_groups`` limits them to those banks."""
+        logger.debug("Starting bank letter generation")
         if not self.app.crime_number or not self.app.ncrp_id:
             self.bank_status_label.config(text="Please enter both crime number and NCRP ID.", fg=self.app.error_color)
-            logging.error("Bank letter generation failed: Missing crime number or NCRP ID")
+            logger.error("Bank letter generation failed: Missing crime number or NCRP ID")
             return
-# Note: Removed check for ncrp_id to allow any value (including empty)
-
 
         if not self.selected_file:
             self.bank_status_label.config(text="Please select an Excel file", fg=self.app.error_color)
-            logging.error("No Excel file selected")
+            logger.error("No Excel file selected")
             return
 
         if not self.app.template_dir:
             self.bank_status_label.config(text="No valid template directory selected.", fg=self.app.error_color)
-            logging.error("No template directory selected")
+            logger.error("No template directory selected")
             messagebox.showerror("Error", "Please select a valid template directory using 'Template Directory' in the header.")
             return
 
-        # Always pick up the folder the user selected in the header
         self.bank_template_dir = os.path.join(self.app.template_dir, "banks")
-
-        # 1) Try the user-selected folder first
-        template_path = os.path.join(self.bank_template_dir, "bank.docx")
-
-        # 2) Fallback for the PyInstaller EXE – only if the first path is missing
-        if not os.path.exists(template_path) and getattr(sys, "frozen", False):
-            template_path = os.path.join(
-                sys._MEIPASS,               # temp folder created by PyInstaller
-                "templates", "banks", "bank.docx"
-            )
-
-        # 3) Final check – abort with a clear, user-friendly message
-        if not os.path.exists(template_path):
+        try:
+            template_path(self.app.template_dir, 'Bank')
+        except TemplateNotFoundError as e:
             err_msg = (
-                "Template file 'bank.docx' not found in:\n"
-                f"  {self.bank_template_dir}\n\n"
+                f"{str(e)}\n\n"
                 "Make sure the folder you chose with “Template Directory” "
                 "contains a sub-folder named  banks  and that banks\\bank.docx exists."
             )
             self.bank_status_label.config(text=err_msg, fg=self.app.error_color)
-            logging.error(f"Template file not found: {template_path}")
+            logger.error("Template file not found: %s", e)
             messagebox.showerror("Template Missing", err_msg)
             return
 
-        # Proceed with loading the document (rest of your code here)
-        try:
-            df = pd.read_excel(self.selected_file, sheet_name=0)
-            if df.empty:
-                raise ValueError("The Excel sheet is empty")
-            df.columns = [col.strip().lower().replace(' ', '_') for col in df.columns]
-            required_columns = {'account_no', 'ifsc_code', 'transaction_amount', 'date_from', 'date_to', 'transaction_id_/_utr_number2', 'bank/fis'}
-            missing_columns = required_columns - set(df.columns)
-            if missing_columns:
-                self.bank_status_label.config(text=f"Missing required columns: {', '.join(missing_columns)}", fg=self.app.error_color)
-                messagebox.showerror("Error", f"Missing required columns: {', '.join(missing_columns)}")
-                logging.error(f"Missing columns: {missing_columns}")
+        timer, profiler = self.app.batch_timing('bank')
+        with timer, profiler:
+            try:
+                df = read_bank_sheet(self.selected_file)
+                cases, errors = build_bank_cases(df, self.app.crime_number, self.app.ncrp_id)
+                # Number the letters by the bank's place in the sheet, as bank_jobs does, so a
+                # re-run of some banks keeps their file names and reuses the CLI's outputs
+                cases = [(index, bank_name, case) for index, (bank_name, case) in enumerate(cases, start=1)]
+            except InputDataError as e:
+                metrics.count_error(e)
+                self.bank_status_label.config(text=f"Invalid Excel data: {str(e)}", fg=self.app.error_color)
+                logger.error("Invalid Excel data: %s", e)
+                messagebox.showerror("Error", f"Invalid Excel data: {str(e)}")
                 return
-            total_amount = df['transaction_amount'].apply(lambda x: float(re.sub(r'[^\d.]', '', str(x))) if pd.notnull(x) else 0).sum()
-            errors = []
+            if only_groups is not None:
+                cases = [(index, bank_name, case) for index, bank_name, case in cases
+                         if str(bank_name) in only_groups or case['Bank'] in only_groups]
+                errors = [error for error in errors if getattr(error, 'group', None) in only_groups]
+
+            metrics.BATCH_LETTERS.observe(len(cases))
             success_count = 0
-            max_letters = 200
+            reused_count = 0
             self.progress_bar.pack()
-            grouped = df.groupby('bank/fis')
-            self.progress_bar['maximum'] = min(len(grouped), max_letters)
+            self.progress_bar['maximum'] = len(cases)
             self.progress_bar['value'] = 0
-            for bank_name, group in grouped:
-                unique_accounts = group[['account_no', 'ifsc_code']].drop_duplicates(subset=['account_no'])
-                case = {
-                    'CrimeNumber': self.app.crime_number,
-                    'NCRP_ID': self.app.ncrp_id,
-                    'Total_Amount': self.format_inr(total_amount),
-                    'Bank': str(bank_name).strip() or 'Unknown Bank',
-                    'RequestDate': datetime.now().strftime("%d-%m-%Y"),
-                    'RecipientName': 'Nodal Officer',
-                    'Address': 'N/A',
-                    'Date_From': group['date_from'].dropna().min().strftime('%d-%m-%Y') if pd.notnull(group['date_from'].dropna().min()) else 'N/A',
-                    'Date_To': group['date_to'].dropna().max().strftime('%d-%m-%Y') if pd.notnull(group['date_to'].dropna().max()) else 'N/A',
-                    'Accounts': unique_accounts.to_dict('records')
-                }
-                validation_errors = validate_case({
-                    'CrimeNumber': case['CrimeNumber'],
-                    'NCRP_ID': case['NCRP_ID'],
-                    'AccountNumber': case['Accounts'][0]['account_no'] if case['Accounts'] else 'N/A',
-                    'IFSCCode': case['Accounts'][0]['ifsc_code'] if case['Accounts'] else 'N/A',
-                    'TransactionAmount': total_amount,
-                    'TransactionID': group['transaction_id_/_utr_number2'].iloc[0] if not group['transaction_id_/_utr_number2'].empty else 'N/A',
-                    'Bank': case['Bank'],
-                    'RequestDate': case['RequestDate'],
-                    'RecipientName': case['RecipientName'],
-                    'Address': case['Address'],
-                    'Date_From': case['Date_From'],
-                    'Date_To': case['Date_To']
-                })
-                if validation_errors:
-                    errors.append(f"Bank {bank_name}: Validation warnings - {'; '.join(validation_errors)}")
-                    logging.error(f"Validation errors for bank {bank_name}: {validation_errors}")
-                    continue
+            for index, bank_name, case in cases:
                 save_error = save_case({'CrimeNumber': self.app.crime_number, 'NCRP_ID': self.app.ncrp_id}, self.app.officer['Id'], 'Bank')
                 if save_error:
-                    errors.append(f"Bank {bank_name}: Database error - {save_error}")
-                    logging.error(f"Database error for bank {bank_name}: {save_error}")
+                    errors.append(BatchIssue(f"Bank {bank_name}: Database error - {save_error}",
+                                             bank_name, 'save', 'DatabaseError'))
+                    logger.error("Database error for bank %s: %s", bank_name, save_error)
                     continue
-                output_path = os.path.join(Path.home(), 'Documents', 'GeneratedLetters', 'bank', f"Notice_{case['Bank'].replace(' ', '_')}_{success_count + 1}.docx")
+                output_path = bank_output_path(case, index)
                 try:
-                    self.generate_word_letter(case, output_path)
+                    input_hash, unchanged = self.app.check_letter('Bank', case, output_path)
+                    if unchanged:
+                        reused_count += 1
+                        logger.debug("Letter for bank %s is unchanged: %s", bank_name, output_path)
+                    else:
+                        self.generate_word_letter(case, output_path)
+                        record_error = record_letter(case, self.app.officer['Id'], 'Bank', case['Bank'], output_path,
+                                                     input_hash)
+                        if record_error:
+                            logger.warning("Letter for bank %s not recorded: %s", bank_name, record_error)
+                        logger.debug("Generated letter for bank %s: %s", bank_name, output_path)
                     success_count += 1
                     self.progress_bar['value'] = success_count
                     self.app.root.update_idletasks()
-                    logging.debug(f"Generated letter for bank {bank_name}: {output_path}")
-                except Exception as e:
-                    errors.append(f"Bank {bank_name}: Failed to generate letter - {str(e)}")
-                    logging.error(f"Failed to generate letter for bank {bank_name}: {str(e)}")
-                if success_count >= max_letters:
-                    break
-            self.progress_bar.pack_forget()
-            if success_count > 0:
-                messagebox.showinfo("Success", f"Generated {success_count} letters in 'GeneratedLetters/bank' folder")
-                self.view_letters_bank_button.config(state="normal")
-                self.bank_status_label.config(text=f"Processed {success_count} cases. {len(errors)} issues", fg=self.app.success_color)
-                logging.debug(f"Processed {success_count} bank letters with {len(errors)} errors")
-            else:
-                self.bank_status_label.config(text=f"No letters generated. {len(errors)} issues", fg=self.app.error_color)
-                logging.warning(f"No bank letters generated. {len(errors)} errors")
-            if errors:
-                self.app.show_error_log(errors)
-        except FileNotFoundError:
-            self.bank_status_label.config(text="Excel file not found", fg=self.app.error_color)
-            logging.error("Excel file not found")
-            messagebox.showerror("Error", "Excel file not found")
-        except ValueError as e:
-            self.bank_status_label.config(text=f"Invalid Excel data: {str(e)}", fg=self.app.error_color)
-            logging.error(f"Invalid Excel data: {str(e)}")
-            messagebox.showerror("Error", f"Invalid Excel data: {str(e)}")
-        except pd.errors.EmptyDataError:
-            self.bank_status_label.config(text="Excel file is empty or corrupted", fg=self.app.error_color)
-            logging.error("Excel file is empty or corrupted")
-            messagebox.showerror("Error", "Excel file is empty or corrupted")
-        except Exception as e:
-            self.bank_status_label.config(text=f"Error: {str(e)}", fg=self.app.error_color)
-            logging.error(f"Unexpected error: {str(e)}")
-            messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}")
+                except EngineError as e:
+                    errors.append(BatchIssue(f"Bank {bank_name}: Failed to generate letter - {str(e)}",
+                                             bank_name, 'render', type(e).__name__))
+                    logger.error("Failed to generate letter for bank %s: %s", bank_name, e)
+        self.progress_bar.pack_forget()
+        timings = self.app.timing_summary(timer, profiler)
+        if success_count > 0:
+            messagebox.showinfo("Success", f"Generated {success_count} letters in 'GeneratedLetters/bank' folder\n"
+                                           f"{reused_count} unchanged and kept, {success_count - reused_count} regenerated"
+                                           f"\n\n{timings}")
+            self.view_letters_bank_button.config(state="normal")
+            self.bank_status_label.config(text=f"Processed {success_count} cases. {len(errors)} issues", fg=self.app.success_color)
+            logger.debug("Processed %s bank letters (%s reused) with %s errors", success_count, reused_count, len(errors))
+        else:
+            self.bank_status_label.config(text=f"No letters generated. {len(errors)} issues", fg=self.app.error_color)
+            logger.warning("No bank letters generated. %s errors", len(errors))
+        if errors:
+            self.report_errors(errors)
 
-    def generate_word_letter(self, case, output_path):
-        # 1. Look in the folder chosen by the user
-        template_path = os.path.join(self.bank_template_dir, "bank.docx")
+    def report_errors(self, errors):
+        """Store the batch's errors and open them in the error viewer."""
+        batch_id = logs.current_context().get('batch_id') or logs.new_batch_id()
+        case_key = {'CrimeNumber': self.app.crime_number, 'NCRP_ID': self.app.ncrp_id}
+        record_error = record_batch_errors(batch_id, case_key, self.app.officer['Id'], 'Bank', errors,
+                                           getattr(self, 'selected_file', None))
+        if record_error:
+            logger.warning("Errors of batch %s not recorded: %s", batch_id, record_error)
+            self.app.show_error_log(errors)
+            return
+        self.app.show_batch_errors(batch_id, rerun=self.rerun_failed)
 
-            # Add these debug lines
-        print(f"DEBUG: bank_template_dir = {self.bank_template_dir}")
-        print(f"DEBUG: template_path = {template_path}")
-        print(f"DEBUG: os.path.exists(template_path) = {os.path.exists(template_path)}")
-        print(f"DEBUG: sys.frozen = {getattr(sys, 'frozen', False)}")
+    def rerun_failed(self, batch_id):
+        """Generate the letters of the banks that failed in ``batch_id`` again, from the same sheet."""
+        failed = failed_groups(batch_id)
+        if not failed or not failed['Groups']:
+            messagebox.showinfo("Re-run", "No failed banks to generate again.")
+            return
+        if failed['LetterType'] != 'Bank':
+            messagebox.showerror("Re-run", f"Batch {batch_id} is not a bank letter batch.")
+            return
+        if (failed['CrimeNumber'], failed['NCRP_ID']) != (self.app.crime_number, self.app.ncrp_id):
+            messagebox.showerror("Re-run", f"Batch {batch_id} belongs to case {failed['CrimeNumber']} "
+                                           f"({failed['NCRP_ID']}). Enter those case details first.")
+            return
+        if not failed['SourcePath'] or not os.path.exists(failed['SourcePath']):
+            messagebox.showerror("Re-run", f"The Excel file of batch {batch_id} is no longer available.")
+            return
+        self.selected_file = failed['SourcePath']
+        self.excel_label.config(text=f"Selected: {os.path.basename(self.selected_file)}")
+        logger.info("Re-running %s failed banks of batch %s", len(failed['Groups']), batch_id)
+        self.process_excel(only_groups=set(failed['Groups']))
 
-        # 2. If it is not there and we are running from a PyInstaller exe,
-        #    fall back to the copy that may have been embedded in the bundle.
-        if not os.path.exists(template_path) and getattr(sys, "frozen", False):
-            template_path = os.path.join(
-                sys._MEIPASS,               # noqa:  (set by PyInstaller)
-                "templates", "banks", "bank.docx"
-            )
-            print(f"DEBUG: Fallback template_path = {template_path}")
-            print(f"DEBUG: Fallback exists = {os.path.exists(template_path)}")
+    def export_zip(self):
+        """Render every bank letter straight into one ZIP archive on a worker thread."""
+        self._export(self.export_zip_button, export_bundle, ".zip", "ZIP archives")
+
+    def export_print_file(self):
+        """Render every bank letter into one print-ready .docx on a worker thread."""
+        self._export(self.print_file_button, export_merged, ".docx", "Word documents")
+
+    def _export(self, button, export, extension, file_type):
+        if not self.app.crime_number or not self.app.ncrp_id or not getattr(self, 'selected_file', None):
+            self.bank_status_label.config(text="Please enter the case details and select an Excel file.", fg=self.app.error_color)
+            return
+        if not self.app.template_dir:
+            messagebox.showerror("Error", "Please select a valid template directory using 'Template Directory' in the header.")
+            return
+        default_name = f"{self.app.crime_number.replace('/', '_')}_bank_letters{extension}"
+        bundle_path = filedialog.asksaveasfilename(
+            title="Save letters as", defaultextension=extension, initialfile=default_name,
+            filetypes=[(file_type, f"*{extension}")]
+        )
+        if not bundle_path:
+            return
 
-        # 3. Final check – abort with a clear message if the file is still missing
-        if not os.path.exists(template_path):
-            err_msg = (f"Template file 'bank.docx' not found.\n\n"
-                    f"Searched in:\n • {self.bank_template_dir}\n"
-                    "Make sure that directory contains banks\\bank.docx.")
-            self.bank_status_label.config(text=err_msg, fg=self.app.error_color)
-            logging.error(f"Template file not found: {template_path}")
-            messagebox.showerror("Template Missing", err_msg)
-            raise FileNotFoundError(f"Template file not found: {template_path}")
-        try:
-            doc = Document(template_path)
-        except Exception as e:
-            self.bank_status_label.config(text=f"Failed to load template: {str(e)}", fg=self.app.error_color)
-            logging.error(f"Failed to load template: {str(e)}")
-            messagebox.showerror("Error", f"Failed to load template: {str(e)}")
-            raise
         self.app.fetch_officer_details()
-        replacements = {
-            '{{Officer_Name}}': self.app.officer.get('OfficerName', 'Unknown Officer'),
-            '{{Officer_Designation}}': self.app.officer.get('Designation', 'Unknown Designation'),
-            '{{Officer_Phone}}': self.app.officer.get('Phone', 'N/A'),
-            '{{Officer_Email}}': self.app.officer.get('Email', 'N/A'),
-            '{{Letter_Date}}': case.get('RequestDate', datetime.now().strftime("%d-%m-%Y")),
-            '{{Nodal_Officer}}': case.get('RecipientName', 'Nodal Officer'),
-            '{{Bank}}': case.get('Bank', 'Unknown Bank'),
-            '{{Crime_No_with_Section}}': case.get('CrimeNumber', 'N/A'),
-            '{{NCRP_ID}}': case.get('NCRP_ID', 'N/A'),
-            '{{Total_Amount}}': case.get('Total_Amount', 'N/A'),
-            '{{Date_From}}': case.get('Date_From', 'N/A'),
-            '{{Date_To}}': case.get('Date_To', 'N/A'),
-        }
-        logging.debug(f"Replacements for {case['Bank']}: {replacements}")
-        table_inserted = False
-        for paragraph in doc.paragraphs:
-            full_text = ''.join(run.text for run in paragraph.runs)
-            if '{{Accounts}}' in full_text and case.get('Accounts'):
-                logging.debug(f"Found {{Accounts}} in paragraph")
-                for run in paragraph.runs:
-                    run.text = ''
-                try:
-                    account_table = doc.add_table(rows=len(case['Accounts']) + 1, cols=2)
-                    account_table.style = 'Table Grid'
-                    headers = ['Account Number', 'IFSC Code']
-                    for idx, header in enumerate(headers):
-                        cell = account_table.cell(0, idx)
-                        cell.text = header
-                        for p in cell.paragraphs:
-                            for r in p.runs:
-                                r.font.bold = True
-                    for i, account in enumerate(case['Accounts'], start=1):
-                        account_table.cell(i, 0).text = self.clean_account_number(account.get('account_no', 'N/A'))
-                        account_table.cell(i, 1).text = account.get('ifsc_code', 'N/A')
-                    paragraph._p.addnext(account_table._tbl)
-                    table_inserted = True
-                    logging.debug(f"Inserted table for {{Accounts}} with {len(case['Accounts'])} rows")
-                except Exception as e:
-                    logging.error(f"Failed to insert table: {str(e)}")
-                    self.bank_status_label.config(text=f"Failed to insert table: {str(e)}", fg=self.app.error_color)
-                    raise
-            else:
-                replace_placeholder_in_paragraph(paragraph, replacements)
-                logging.debug(f"Post-replacement paragraph text: {paragraph.text}")
-        if not table_inserted:
-            logging.debug(f"No table inserted (Accounts: {len(case.get('Accounts', []))})")
-        for table in doc.tables:
-            for row in table.rows:
-                for cell in row.cells:
-                    for paragraph in cell.paragraphs:
-                        replace_placeholder_in_paragraph(paragraph, replacements)
-                        logging.debug(f"Post-replacement table cell paragraph text: {paragraph.text}")
+        officer = dict(self.app.officer)
+        timer, profiler = self.app.batch_timing('bank_export')
         try:
-            os.makedirs(os.path.dirname(output_path), exist_ok=True)
-            doc.save(output_path)
-            logging.debug(f"Saved bank letter: {output_path}")
-        except Exception as e:
-            self.bank_status_label.config(text=f"Failed to save letter: {str(e)}", fg=self.app.error_color)
-            logging.error(f"Failed to save letter: {str(e)}")
-            messagebox.showerror("Error", f"Failed to save letter to '{output_path}': {str(e)}")
-            raise
+            with timer:
+                jobs, errors = bank_jobs(self.selected_file, self.app.crime_number, self.app.ncrp_id,
+                                         officer, self.app.template_dir)
+        except EngineError as e:
+            self.bank_status_label.config(text=f"Invalid Excel data: {str(e)}", fg=self.app.error_color)
+            logger.error("Invalid Excel data: %s", e)
+            return
+        if not jobs:
+            self.bank_status_label.config(text=f"No letters generated. {len(errors)} issues", fg=self.app.error_color)
+            if errors:
+                self.report_errors(errors)
+            return
+        case_key = {'CrimeNumber': self.app.crime_number, 'NCRP_ID': self.app.ncrp_id}
+        with timer:
+            save_error = save_case(case_key, officer['Id'], 'Bank')
+        if save_error:
+            self.bank_status_label.config(text=f"Database error: {save_error}", fg=self.app.error_color)
+            return
+
+        button.config(state="disabled")
+        self.progress_bar.pack()
+        self.progress_bar['maximum'] = len(jobs)
+        self.progress_bar['value'] = 0
+        # A profiled batch renders in-process, where cProfile can see it
+        workers = 1 if profiler.enabled else min(len(jobs), os.cpu_count() or 1)
+
+        def progress(result):
+            self.parent.after(0, self.progress_bar.step, 1)
+
+        def work():
+            try:
+                with timer, profiler:
+                    results = export(jobs, bundle_path, workers, on_result=progress)
+            except EngineError as e:
+                results = []
+                errors.append(BatchIssue(str(e), '', 'render', type(e).__name__))
+            except Exception as e:
+                # e.g. a broken worker pool; report it instead of leaving the button disabled
+                logger.error("Bank export failed: %s", e)
+                results = []
+                errors.append(BatchIssue(f"Export failed: {e}", '', 'render', type(e).__name__))
+            self.parent.after(0, lambda: self._export_finished(button, case_key, officer, bundle_path, results, errors,
+                                                               timer, profiler))
+
+        threading.Thread(target=work, daemon=True).start()
+
+    def _export_finished(self, button, case_key, officer, bundle_path, results, errors, timer, profiler):
+        generated = 0
+        with timer:
+            for result in results:
+                if result['status'] == 'ok':
+                    generated += 1
+                    record_error = record_letter(case_key, officer['Id'], 'Bank', result['recipient'], result['output_path'])
+                    if record_error:
+                        logger.warning("Letter for bank %s not recorded: %s", result['recipient'], record_error)
+                else:
+                    errors.append(BatchIssue(f"Bank {result['recipient']}: Failed to generate letter - {result['error']}",
+                                             result['recipient'], 'render', result['error'].split(':', 1)[0]))
+        self.progress_bar.pack_forget()
+        button.config(state="normal")
+        timings = self.app.timing_summary(timer, profiler)
+        if generated:
+            messagebox.showinfo("Success", f"Wrote {generated} letters to {bundle_path}\n\n{timings}")
+            self.bank_status_label.config(text=f"Exported {generated} letters. {len(errors)} issues", fg=self.app.success_color)
+        else:
+            self.bank_status_label.config(text=f"No letters generated. {len(errors)} issues", fg=self.app.error_color)
+        logger.debug("Exported %s bank letters to %s with %s errors", generated, bundle_path, len(errors))
+        if errors:
+            self.report_errors(errors)
+
+    def generate_word_letter(self, case, output_path):
+        """Render one bank letter; raises EngineError on failure."""
+        return self.app.render_letter('Bank', case, output_path)
 
     def view_letters_bank(self):
         folder_path = os.path.join(Path.home(), 'Documents', 'GeneratedLetters', 'bank')
         try:
             if os.path.exists(folder_path):
                 os.startfile(folder_path)
-                logging.debug(f"Opened bank letters folder: {folder_path}")
+                logger.debug("Opened bank letters folder: %s", folder_path)
             else:
                 messagebox.showwarning("Warning", "No letters generated or folder not found")
-                logging.warning(f"Bank letters folder not found: {folder_path}")
+                logger.warning("Bank letters folder not found: %s", folder_path)
         except Exception as e:
             messagebox.showerror("Error", f"Failed to open folder: {str(e)}")
-            logging.error(f"Failed to open bank letters folder: {str(e)}")
\ No newline at end of file
+            logger.error("Failed to open bank letters folder: %s", e)
\ No newline at end of file
@@ -0,0 +1,142 @@
+import sqlite3
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import logging
+from db.database import connect_db
+from db.export import export_dataset
+from .virtual_list import Debouncer, SQLitePageSource, VirtualTreeview
+
+logger = logging.getLogger(__name__)
+
+ALL = "All"
+STAGES = (ALL, "validate", "save", "render", "warning")
+RECENT_BATCHES = 50
+
+
+def recent_batches(limit=RECENT_BATCHES):
+    """Batch ids that recorded errors, newest first."""
+    conn = connect_db()
+    if not conn:
+        return []
+    try:
+        rows = conn.execute(
+            "SELECT BatchId FROM BatchErrors GROUP BY BatchId ORDER BY MAX(Id) DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [row[0] for row in rows]
+    except sqlite3.Error as e:
+        logger.error("Failed to list error batches: %s", e)
+        return []
+    finally:
+        conn.close()
+
+
+class BatchErrorViewer:
+    """Paged, filterable list of the errors stored for generation batches.
+
+    ``rerun(batch_id)``, when given, is offered as a button that generates
+    the letters of the batch's failed groups again.
+    """
+
+    def __init__(self, parent, batch_id=None, rerun=None, bg="#f4f6f9"):
+        self.rerun = rerun
+        self.window = tk.Toplevel(parent)
+        self.window.title("Batch Errors")
+        self.window.geometry("900x450")
+        self.window.configure(bg=bg)
+        self.window.transient(parent)
+
+        filters = tk.Frame(self.window, bg=bg)
+        filters.pack(fill="x", padx=10, pady=(10, 0))
+        tk.Label(filters, text="Batch:", font=("Segoe UI", 10, "bold"), bg=bg).pack(side="left", padx=5)
+        batches = recent_batches()
+        if batch_id and batch_id not in batches:
+            batches.insert(0, batch_id)
+        self.batch_var = tk.StringVar(value=batch_id or (batches[0] if batches else ALL))
+        batch_combo = ttk.Combobox(filters, textvariable=self.batch_var, values=[ALL] + batches,
+                                   state="readonly", width=12)
+        batch_combo.pack(side="left", padx=5)
+        batch_combo.bind("<<ComboboxSelected>>", self.apply_filter)
+
+        tk.Label(filters, text="Stage:", font=("Segoe UI", 10, "bold"), bg=bg).pack(side="left", padx=5)
+        self.stage_var = tk.StringVar(value=ALL)
+        stage_combo = ttk.Combobox(filters, textvariable=self.stage_var, values=STAGES, state="readonly", width=10)
+        stage_combo.pack(side="left", padx=5)
+        stage_combo.bind("<<ComboboxSelected>>", self.apply_filter)
+
+        tk.Label(filters, text="Search:", font=("Segoe UI", 10, "bold"), bg=bg).pack(side="left", padx=5)
+        self.search_var = tk.StringVar()
+        search_entry = ttk.Entry(filters, textvariable=self.search_var, font=("Segoe UI", 10))
+        search_entry.pack(side="left", padx=5, fill="x", expand=True)
+        search_entry.bind("<KeyRelease>", Debouncer(search_entry, self.apply_filter))
+
+        self.source = SQLitePageSource("BatchErrors", ("Id", "BatchId", "GroupKey", "Stage", "ErrorClass", "Message"))
+        self.error_list = VirtualTreeview(
+            self.window, ("Id", "Batch", "Group", "Stage", "Error", "Message"), self.source, height=14
+        )
+        for column, width in (("Id", 60), ("Batch", 80), ("Group", 140), ("Stage", 70), ("Error", 140)):
+            self.error_list.tree.column(column, width=width, stretch=False)
+        self.error_list.tree.column("Message", width=400, anchor="w")
+        self.error_list.pack(padx=10, pady=10, fill="both", expand=True)
+
+        bottom = tk.Frame(self.window, bg=bg)
+        bottom.pack(fill="x", padx=10, pady=(0, 10))
+        self.status_label = tk.Label(bottom, text="", font=("Segoe UI", 9), bg=bg, anchor="w")
+        self.status_label.pack(side="left", fill="x", expand=True)
+        ttk.Button(bottom, text="Export CSV", command=self.export_csv).pack(side="right", padx=5)
+        if rerun:
+            self.rerun_button = ttk.Button(bottom, text="Re-run Failed", command=self.rerun_failed)
+            self.rerun_button.pack(side="right", padx=5)
+
+        self.apply_filter()
+
+    def current_filter(self):
+        """(where, params) for the chosen batch, stage and search text."""
+        clauses = []
+        params = []
+        if self.batch_var.get() != ALL:
+            clauses.append("BatchId = ?")
+            params.append(self.batch_var.get())
+        if self.stage_var.get() != ALL:
+            clauses.append("Stage = ?")
+            params.append(self.stage_var.get())
+        search = self.search_var.get().strip().lower()
+        if search:
+            clauses.append("(LOWER(Message) LIKE ? OR LOWER(GroupKey) LIKE ?)")
+            params.extend([f"%{search}%"] * 2)
+        return " AND ".join(clauses), params
+
+    def apply_filter(self, event=None):
+        self.source.set_filter(*self.current_filter())
+        try:
+            self.error_list.refresh()
+        except sqlite3.Error as e:
+            messagebox.showerror("Error", f"Database operation failed: {e}", parent=self.window)
+            logger.error("Failed to load batch errors: %s", e)
+            return
+        self.status_label.config(text=f"{len(self.source)} errors")
+        if self.rerun:
+            self.rerun_button.config(state="normal" if self.batch_var.get() != ALL else "disabled")
+
+    def export_csv(self):
+        path = filedialog.asksaveasfilename(
+            parent=self.window, title="Export errors", defaultextension=".csv",
+            initialfile=f"batch_errors_{self.batch_var.get()}.csv", filetypes=[("CSV files", "*.csv")]
+        )
+        if not path:
+            return
+        where, params = self.current_filter()
+        try:
+            count = export_dataset('BatchErrors', path, where=where, where_params=params)
+        except (sqlite3.Error, ConnectionError, OSError) as e:
+            messagebox.showerror("Error", f"Failed to export: {e}", parent=self.window)
+            logger.error("Failed to export batch errors: %s", e)
+            return
+        self.status_label.config(text=f"Exported {count} errors to {path}")
+        logger.debug("Exported %s batch errors to %s", count, path)
+
+    def rerun_failed(self):
+        batch_id = self.batch_var.get()
+        if batch_id == ALL:
+            return
+        self.window.destroy()
+        self.rerun(batch_id)
@@ -0,0 +1,175 @@
+import logging
+import os
+import re
+import time
+import tkinter as tk
+from tkinter import ttk, filedialog, messagebox
+import pandas as pd
+from engine.identifiers import OK, error_message, looks_like_header, normalize_identifiers, split_identifiers
+from .virtual_list import VirtualTreeview
+
+logger = logging.getLogger(__name__)
+
+
+class ListSource:
+    """In-memory row source for VirtualTreeview; rows are numbered on the fly."""
+
+    def __init__(self):
+        self.items = []
+
+    def __len__(self):
+        return len(self.items)
+
+    def rows(self, start, count):
+        return [(i + 1,) + item for i, item in enumerate(self.items[start:start + count], start)]
+
+
+class IdentifierList(tk.Frame):
+    """Entry plus virtualized list of identifiers.
+
+    Pasted or typed text is split on newlines, commas, semicolons and spaces,
+    normalized and de-duplicated in one pass; only the visible rows exist as
+    Treeview items, so thousands of identifiers stay responsive. ``kind`` is an
+    engine.identifiers kind (or None for free text such as URLs); invalid
+    values are kept but flagged in the Status column. Values for which
+    ``passthrough`` returns True are kept as typed without validation.
+    """
+
+    def __init__(self, parent, app, label="Identifier", kind=None, height=8, on_change=None, **kwargs):
+        super().__init__(parent, bg="white", **kwargs)
+        self.app = app
+        self.kind = kind
+        self.passthrough = None
+        self.on_change = on_change
+        self.source = ListSource()
+        self.keys = set()
+
+        entry_row = tk.Frame(self, bg="white")
+        entry_row.pack(fill="x", pady=(0, 5))
+        self.entry = ttk.Entry(entry_row)
+        self.entry.pack(side="left", fill="x", expand=True, padx=(0, 5))
+        self.entry.bind("<Return>", lambda e: self.add_from_entry())
+        self.entry.bind("<<Paste>>", self._on_paste)
+        self.app.ToolTip(self.entry, "Type or paste identifiers; separate several with new lines, commas or spaces", self.app)
+        ttk.Button(entry_row, text="Add", command=self.add_from_entry).pack(side="left", padx=2)
+        ttk.Button(entry_row, text="Paste", command=self.paste_clipboard).pack(side="left", padx=2)
+        ttk.Button(entry_row, text="Load File", command=self.load_file).pack(side="left", padx=2)
+
+        self.list_view = VirtualTreeview(self, ("No.", label, "Status"), self.source, height=height)
+        self.list_view.tree.column("No.", width=50, stretch=False)
+        self.list_view.tree.column("Status", width=220, anchor="w")
+        self.list_view.tree.bind("<Delete>", lambda e: self.delete_selected())
+        self.list_view.pack(fill="both", expand=True)
+
+        action_row = tk.Frame(self, bg="white")
+        action_row.pack(fill="x", pady=(5, 0))
+        ttk.Button(action_row, text="Delete", command=self.delete_selected).pack(side="left", padx=2)
+        ttk.Button(action_row, text="Clear", command=self.clear).pack(side="left", padx=2)
+        self.count_label = tk.Label(action_row, text="", bg="white", fg=self.app.text_color)
+        self.count_label.pack(side="right", padx=5)
+        self._update(notify=False)
+
+    def set_kind(self, kind, label, passthrough=None):
+        """Switch to another identifier kind; clears the list."""
+        self.kind = kind
+        self.passthrough = passthrough
+        self.list_view.tree.heading("#2", text=label)
+        self.clear()
+
+    def values(self):
+        return [value for value, _ in self.source.items]
+
+    def invalid_count(self):
+        return sum(1 for _, status in self.source.items if status)
+
+    def add_from_entry(self):
+        self.add_text(self.entry.get())
+        self.entry.delete(0, "end")
+
+    def paste_clipboard(self):
+        try:
+            self.add_text(self.clipboard_get())
+        except tk.TclError:
+            pass
+
+    def load_file(self):
+        """Add every identifier in a text, CSV or Excel file; a header row is skipped."""
+        path = filedialog.askopenfilename(
+            title="Select a list of identifiers",
+            filetypes=[("Lists", "*.txt *.csv *.xlsx *.xls"), ("All files", "*.*")]
+        )
+        if not path:
+            return
+        try:
+            if path.lower().endswith(('.xlsx', '.xls')):
+                df = pd.read_excel(path, sheet_name=0, header=None, dtype=str)
+                if len(df) and looks_like_header(df.iloc[0].tolist(), self.kind):
+                    df = df.iloc[1:]
+                self.add_values(df.stack().tolist())
+            else:
+                with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+                    text = f.read()
+                first_line, _, rest = text.partition('\n')
+                if looks_like_header(re.split(r'[,;\t]', first_line), self.kind):
+                    text = rest
+                self.add_text(text)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read {os.path.basename(path)}: {e}")
+            logger.error("Failed to load identifiers from %s: %s", path, e)
+
+    def _on_paste(self, event):
+        self.paste_clipboard()
+        return "break"
+
+    def add_text(self, text):
+        return self.add_values(split_identifiers(text, self.kind))
+
+    def add_values(self, values):
+        """Append new values in one pass; returns how many were added."""
+        start = time.perf_counter()
+        values = [str(v).strip() for v in values if str(v).strip()]
+        if not values:
+            return 0
+        rows = [(value, '') for value in values]
+        if self.kind:
+            checked = [i for i, value in enumerate(values) if not (self.passthrough and self.passthrough(value))]
+            normalized, codes = normalize_identifiers([values[i] for i in checked], self.kind)
+            for i, value, code in zip(checked, normalized.tolist(), codes.tolist()):
+                rows[i] = (value, '') if code == OK else (values[i], error_message(self.kind, code))
+        added = 0
+        for row in rows:
+            if row[0] not in self.keys:
+                self.keys.add(row[0])
+                self.source.items.append(row)
+                added += 1
+        self.list_view._scroll_to(len(self.source))
+        self._update()
+        logger.debug("Added %s of %s identifiers in %.3fs", added, len(values), time.perf_counter() - start)
+        return added
+
+    def delete_selected(self):
+        values = self.list_view.selected_values()
+        if not values:
+            return
+        index = int(values[0]) - 1
+        if 0 <= index < len(self.source.items):
+            value, _ = self.source.items.pop(index)
+            self.keys.discard(value)
+        self.list_view.selected_key = None
+        self.list_view.refresh()
+        self._update()
+
+    def clear(self):
+        self.source.items.clear()
+        self.keys.clear()
+        self.list_view.selected_key = None
+        self.list_view.top = 0
+        self.list_view.refresh()
+        self._update()
+
+    def _update(self, notify=True):
+        total = len(self.source)
+        invalid = self.invalid_count()
+        self.count_label.config(text=f"{total} entries" + (f", {invalid} invalid" if invalid else ""))
+        if notify and self.on_change:
+            self.on_change()
@@ -0,0 +1,186 @@
+"""Log viewer window over engine.logview.
+
+The list shows the tail of the chosen log straight away. Typing a regex,
+picking a level or entering a batch id starts an incremental search that
+scans one chunk of the file per event-loop turn, so the window stays usable
+on logs of any size; results appear as they are found and only the matching
+lines can be exported.
+"""
+import os
+import re
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+import logging
+from engine.logview import LEVELS, LogFile, LogSearch, log_files, parse_line
+from .virtual_list import VirtualTreeview
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ("Time", "Level", "Batch", "Message")
+SEARCH_DELAY_MS = 400
+ALL_LEVELS = "All"
+
+
+class LogSource:
+    """VirtualTreeview source over line offsets in a LogFile."""
+
+    def __init__(self):
+        self.log = None
+        self.offsets = []
+
+    def set(self, log, offsets):
+        self.log = log
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def rows(self, start, count):
+        if self.log is None:
+            return []
+        return [parse_line(line) for line in self.log.lines(self.offsets, start, count)]
+
+
+class LogViewer:
+    def __init__(self, parent, bg="#f4f6f9"):
+        self.window = tk.Toplevel(parent)
+        self.window.title("Logs")
+        self.window.geometry("1000x550")
+        self.window.configure(bg=bg)
+        self.search = None
+        self.pending = None
+        self.paths = log_files()
+
+        controls = tk.Frame(self.window, bg=bg)
+        controls.pack(fill="x", padx=10, pady=(10, 0))
+        self.file_var = tk.StringVar(value=os.path.basename(self.paths[0]) if self.paths else "")
+        file_combo = ttk.Combobox(controls, textvariable=self.file_var, state="readonly", width=18,
+                                  values=[os.path.basename(path) for path in self.paths])
+        file_combo.pack(side="left", padx=5)
+        file_combo.bind("<<ComboboxSelected>>", lambda e: self.show_tail())
+
+        tk.Label(controls, text="Search:", font=("Segoe UI", 10, "bold"), bg=bg).pack(side="left", padx=5)
+        self.pattern_var = tk.StringVar()
+        pattern_entry = ttk.Entry(controls, textvariable=self.pattern_var, font=("Segoe UI", 10))
+        pattern_entry.pack(side="left", padx=5, fill="x", expand=True)
+        pattern_entry.bind("<KeyRelease>", self.schedule_search)
+        pattern_entry.bind("<Return>", lambda e: self.start_search())
+
+        tk.Label(controls, text="Level:", font=("Segoe UI", 10, "bold"), bg=bg).pack(side="left", padx=5)
+        self.level_var = tk.StringVar(value=ALL_LEVELS)
+        level_combo = ttk.Combobox(controls, textvariable=self.level_var, state="readonly", width=10,
+                                   values=(ALL_LEVELS,) + LEVELS)
+        level_combo.pack(side="left", padx=5)
+        level_combo.bind("<<ComboboxSelected>>", lambda e: self.start_search())
+
+        tk.Label(controls, text="Batch:", font=("Segoe UI", 10, "bold"), bg=bg).pack(side="left", padx=5)
+        self.batch_var = tk.StringVar()
+        batch_entry = ttk.Entry(controls, textvariable=self.batch_var, font=("Segoe UI", 10), width=10)
+        batch_entry.pack(side="left", padx=5)
+        batch_entry.bind("<KeyRelease>", self.schedule_search)
+
+        self.source = LogSource()
+        self.log_list = VirtualTreeview(self.window, COLUMNS, self.source, height=18)
+        self.log_list.tree.column("Time", width=170, stretch=False)
+        self.log_list.tree.column("Level", width=70, stretch=False)
+        self.log_list.tree.column("Batch", width=80, stretch=False)
+        self.log_list.tree.column("Message", width=600, anchor="w")
+        self.log_list.pack(padx=10, pady=10, fill="both", expand=True)
+
+        bottom = tk.Frame(self.window, bg=bg)
+        bottom.pack(fill="x", padx=10, pady=(0, 10))
+        self.status_label = tk.Label(bottom, text="", font=("Segoe UI", 9), bg=bg, anchor="w")
+        self.status_label.pack(side="left", fill="x", expand=True)
+        ttk.Button(bottom, text="Export Matches", command=self.export).pack(side="right", padx=5)
+        ttk.Button(bottom, text="Tail", command=self.show_tail).pack(side="right", padx=5)
+
+        self.window.bind("<Destroy>", self._on_destroy)
+        self.show_tail()
+
+    def current_log(self):
+        name = self.file_var.get()
+        for path in self.paths:
+            if os.path.basename(path) == name:
+                return LogFile(path)
+        return None
+
+    def cancel_search(self):
+        if self.pending is not None:
+            self.window.after_cancel(self.pending)
+            self.pending = None
+        self.search = None
+
+    def show_tail(self):
+        """Show the last lines of the chosen log and scroll to the newest."""
+        self.cancel_search()
+        log = self.current_log()
+        if log is None:
+            self.status_label.config(text="No log files yet")
+            return
+        offsets = log.tail()
+        self.source.set(log, offsets)
+        self.log_list._scroll_to(len(offsets))
+        self.status_label.config(text=f"Last {len(offsets)} lines of {self.file_var.get()} "
+                                      f"({log.size() / (1024 * 1024):.1f} MB)")
+
+    def schedule_search(self, event=None):
+        """Restart the search once typing pauses."""
+        self.cancel_search()
+        self.pending = self.window.after(SEARCH_DELAY_MS, self.start_search)
+
+    def start_search(self):
+        self.cancel_search()
+        pattern = self.pattern_var.get()
+        level = self.level_var.get()
+        batch_id = self.batch_var.get().strip()
+        if not pattern and level == ALL_LEVELS and not batch_id:
+            self.show_tail()
+            return
+        log = self.current_log()
+        if log is None:
+            return
+        try:
+            self.search = LogSearch(log, pattern, [level] if level != ALL_LEVELS else None, batch_id)
+        except re.error as e:
+            self.status_label.config(text=f"Invalid pattern: {e}")
+            return
+        self.source.set(log, self.search.matches)
+        self.log_list._scroll_to(0)
+        self.pending = self.window.after(0, self._search_step, self.search)
+
+    def _search_step(self, search):
+        if search is not self.search:
+            return
+        search.step()
+        # Redraw so new matches and the scrollbar show up as the scan goes
+        self.log_list._scroll_to(self.log_list.top)
+        if search.done:
+            self.pending = None
+            note = f" (stopped at {len(search.matches)})" if search.truncated else ""
+            self.status_label.config(text=f"{len(search.matches)} matching lines{note}")
+            logger.debug("Log search finished: %s matches", len(search.matches))
+        else:
+            self.status_label.config(text=f"Searching... {search.progress:.0%}, {len(search.matches)} matches")
+            self.pending = self.window.after(1, self._search_step, search)
+
+    def export(self):
+        """Save the lines currently listed (tail or matches) to a file."""
+        if self.source.log is None or not len(self.source):
+            messagebox.showinfo("Export", "There are no lines to export.", parent=self.window)
+            return
+        path = filedialog.asksaveasfilename(parent=self.window, defaultextension=".log",
+                                            filetypes=[("Log files", "*.log"), ("All files", "*.*")])
+        if not path:
+            return
+        try:
+            count = self.source.log.export(self.source.offsets, path)
+        except OSError as e:
+            messagebox.showerror("Export", f"Failed to export log lines: {e}", parent=self.window)
+            logger.error("Failed to export log lines to %s: %s", path, e)
+            return
+        self.status_label.config(text=f"Exported {count} lines to {path}")
+        logger.info("Exported %s log lines to %s", count, path)
+
+    def _on_destroy(self, event):
+        if event.widget is self.window:
+            self.cancel_search()
@@ -4,9 +4,13 @@ from tkinter import ttk, messagebox
 import bcrypt
 from db.database import connect_db
 from gui.admin_panel import AdminPanel
+from gui.stall_watchdog import watch
 import sqlite3
 import os
 import sys
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 # Writable database path (in user's Documents folder)
@@ -58,7 +62,7 @@ class LoginWindow:
             self.logo_canvas.create_image(150, 50, image=self.logo)
         except tk.TclError as e:
             tk.Label(self.logo_canvas, text="Logo Not Found", font=("Arial", 12), bg="white", fg="gray").pack()
-            print(f"Logo load error: {str(e)}")
+            logger.error("Logo load error: %s", e)
 
         header_frame = tk.Frame(container, bg="#003087")
         header_frame.pack(fill="x")
@@ -292,7 +296,7 @@ class LoginWindow:
         reset_popup.bind('<Return>', lambda event: reset_password())
 
     def login(self):
-        print("Login button clicked!")
+        logger.debug("Login button clicked")
         if self.after_id is not None:
             self.root.after_cancel(self.after_id)
             self.after_id = None
@@ -322,6 +326,7 @@ class LoginWindow:
                 if bcrypt.checkpw(password.encode('utf-8'), stored_hash):
                     self.root.destroy()
                     new_root = tk.Tk()
+                    watch(new_root)
                     username = self.officer[1]  # Username is at index 1
                     if username.lower() == "admin":
                         AdminPanel(new_root)
@@ -7,11 +7,21 @@ from db.database import connect_db
 from .bank_letters import BankLetters
 from .inter_letters import InterLetters
 from .tsp_letters import TSPLetters
+from .log_viewer import LogViewer
+from .batch_errors import BatchErrorViewer
+from engine import incremental, logs, metrics
+from engine.client import ServiceClient
+from engine.errors import EngineError
+from engine.render import render
+from engine.timing import Profiler, StageTimer
 import os
 from pathlib import Path
 import json
 import logging
 import sys
+import time
+
+logger = logging.getLogger(__name__)
 
 CONFIG_FILE = 'config.json'  # Config file to store user settings persistently
 
@@ -56,15 +66,7 @@ class LetterGeneratorApp:
         self.root.minsize(800, 600)
         self.root.resizable(True, True)
 
-        # Initialize logging
-        log_dir = os.path.join(Path.home(), 'Documents', 'LetterGeneratorLogs')
-        os.makedirs(log_dir, exist_ok=True)
-        logging.basicConfig(
-            filename=os.path.join(log_dir, 'app.log'),
-            level=logging.DEBUG,
-            format='%(asctime)s - %(levelname)s - %(message)s'
-        )
-        logging.debug("LetterGeneratorApp initialized")
+        logger.debug("LetterGeneratorApp initialized")
 
         # Initialize default theme colors
         self.default_colors = {
@@ -91,6 +93,7 @@ class LetterGeneratorApp:
         self.date_from = None
         self.date_to = None
         self.profile_window = None
+        self.profile_next_batch = False
 
         # Initialize template directory
         self.config_dir = os.path.join(Path.home(), 'Documents', 'LetterGenerator')
@@ -105,11 +108,12 @@ class LetterGeneratorApp:
 
         self.config = self.load_config()
         self.template_dir = self.config.get('template_dir', "")
+        metrics.start_from_config(self.config)
 
         if not self.template_dir:
-            print("Template directory not set yet.")
+            logger.info("Template directory not set yet")
         else:
-            print(f"Loaded template directory: {self.template_dir}")
+            logger.info("Loaded template directory: %s", self.template_dir)
 
         # Center the window
         self.root.update_idletasks()
@@ -144,7 +148,7 @@ class LetterGeneratorApp:
         right_header.pack(side=tk.TOP, anchor="e", pady=0, padx=10)
 
 
-        # Buttons container frame using grid to arrange buttons in 2x2 grid
+        # Buttons container frame using grid to arrange buttons in two columns
         buttons_frame = tk.Frame(right_header, bg=self.header_bg)
         buttons_frame.pack(anchor="ne")
 
@@ -185,6 +189,23 @@ class LetterGeneratorApp:
         self.logout_button.grid(row=1, column=1, padx=5, pady=5)
         self.ToolTip(self.logout_button, "Logout", self)
 
+        # Row 3
+        self.logs_button = ttk.Button(
+            buttons_frame, text="Logs",
+            command=self.show_logs,
+            style="TButton", width=button_width
+        )
+        self.logs_button.grid(row=2, column=0, padx=5, pady=5)
+        self.ToolTip(self.logs_button, "View and search the application logs (Ctrl+L)", self)
+
+        self.batch_errors_button = ttk.Button(
+            buttons_frame, text="Batch Errors",
+            command=self.show_batch_errors,
+            style="TButton", width=button_width
+        )
+        self.batch_errors_button.grid(row=2, column=1, padx=5, pady=5)
+        self.ToolTip(self.batch_errors_button, "Review, export and re-run the errors of past batches", self)
+
         # Optionally make the columns expand equally for better alignment
         buttons_frame.grid_columnconfigure(0, weight=1)
         buttons_frame.grid_columnconfigure(1, weight=1)
@@ -195,6 +216,8 @@ class LetterGeneratorApp:
         self.root.bind('<Control-c>', lambda e: self.set_case_details())
         self.root.bind('<Control-t>', lambda e: self.next_tab())
         self.root.bind('<Control-T>', lambda e: self.prev_tab())
+        self.root.bind('<Control-P>', lambda e: self.arm_batch_profiling())
+        self.root.bind('<Control-l>', lambda e: self.show_logs())
 
         # Main Frame with Tabs
         self.notebook = ttk.Notebook(self.root)
@@ -263,12 +286,12 @@ class LetterGeneratorApp:
                     any(f.endswith('.docx') for f in os.listdir(os.path.join(template_dir, 'inter'))) and
                     any(f.endswith('.docx') for f in os.listdir(os.path.join(template_dir, 'tsp')))):
                     self.template_dir = template_dir
-                    logging.debug(f"Loaded template directory: {template_dir}")
+                    logger.debug("Loaded template directory: %s", template_dir)
                     return
                 else:
-                    logging.debug(f"Invalid template directory: {template_dir}")
+                    logger.debug("Invalid template directory: %s", template_dir)
         except (FileNotFoundError, json.JSONDecodeError, KeyError) as e:
-            logging.debug(f"Config file issue: {str(e)}")
+            logger.debug("Config file issue: %s", e)
         self.template_dir = None
 
     def prompt_template_dir(self):
@@ -282,39 +305,39 @@ class LetterGeneratorApp:
             initialdir=os.path.join(Path.home(), 'Documents')
         )
         if not template_dir:
-            logging.warning("User cancelled template directory selection")
+            logger.warning("User cancelled template directory selection")
             return None
         # Verify the template directory contains required subdirectories and files
         subdirs = ['banks', 'inter', 'tsp']
         if not all(os.path.isdir(os.path.join(template_dir, subdir)) for subdir in subdirs):
-            logging.error(f"Selected directory {template_dir} lacks required subdirectories")
+            logger.error("Selected directory %s lacks required subdirectories", template_dir)
             messagebox.showerror(
                 "Error",
                 "Selected directory must contain 'banks', 'inter', and 'tsp' subdirectories."
             )
             return None
         if not os.path.exists(os.path.join(template_dir, 'banks', 'bank.docx')):
-            logging.error(f"Selected directory {template_dir}/banks lacks bank.docx")
+            logger.error("Selected directory %s/banks lacks bank.docx", template_dir)
             messagebox.showerror(
                 "Error",
                 "The 'banks' subdirectory must contain 'bank.docx'."
             )
             return None
         if not any(f.endswith('.docx') for f in os.listdir(os.path.join(template_dir, 'inter'))):
-            logging.error(f"Selected directory {template_dir}/inter lacks .docx templates")
+            logger.error("Selected directory %s/inter lacks .docx templates", template_dir)
             messagebox.showerror(
                 "Error",
                 "The 'inter' subdirectory must contain at least one .docx template."
             )
             return None
         if not any(f.endswith('.docx') for f in os.listdir(os.path.join(template_dir, 'tsp'))):
-            logging.error(f"Selected directory {template_dir}/tsp lacks .docx templates")
+            logger.error("Selected directory %s/tsp lacks .docx templates", template_dir)
             messagebox.showerror(
                 "Error",
                 "The 'tsp' subdirectory must contain at least one .docx template."
             )
             return None
-        logging.debug(f"User selected template directory: {template_dir}")
+        logger.debug("User selected template directory: %s", template_dir)
         return template_dir
 
     def save_template_dir(self, template_dir):
@@ -322,9 +345,9 @@ class LetterGeneratorApp:
         try:
             with open(self.config_file, 'w') as f:
                 json.dump({'template_dir': template_dir}, f)
-            logging.debug(f"Saved template directory to config: {template_dir}")
+            logger.debug("Saved template directory to config: %s", template_dir)
         except Exception as e:
-            logging.error(f"Failed to save template directory to config: {str(e)}")
+            logger.error("Failed to save template directory to config: %s", e)
             messagebox.showerror("Error", f"Failed to save template directory: {str(e)}")
 
     def change_template_dir(self):
@@ -410,6 +433,9 @@ class LetterGeneratorApp:
         prev_tab = (current - 1) % self.notebook.index("end")
         self.notebook.select(prev_tab)
 
+    def show_logs(self):
+        LogViewer(self.root, bg=self.bg_color)
+
     def show_help(self):
         help_window = tk.Toplevel(self.root)
         help_window.title("Help - Letter Generator")
@@ -445,7 +471,7 @@ class LetterGeneratorApp:
         ## Bank Letters
         - Select an Excel file with a 'Layer1' sheet containing columns: account_no, ifsc_code, transaction_amount, date_from, date_to, transaction_id_/_utr_number2, bank/fis.
         - Click "Generate Letters" (Ctrl+G) to create letters in the 'generated_letters/bank' folder.
-        - View errors in the error log window if issues occur.
+        - Issues are saved and shown in the Batch Errors window; filter them, export them to CSV, or click "Re-run Failed" to generate only the failed banks again.
 
         ## Intermediary Letters
         - Select a platform (e.g., WhatsApp, Google) and enter URLs or IDs.
@@ -463,6 +489,8 @@ class LetterGeneratorApp:
         - Ctrl+G: Generate bank letters (when enabled).
         - Ctrl+T: Switch to next tab.
         - Ctrl+Shift+T: Switch to previous tab.
+        - Ctrl+Shift+P: Profile the next batch; the profile is saved in Documents/LetterGeneratorLogs.
+        - Ctrl+L: Open the log viewer; search by text, level or batch id and export the matching lines.
 
         ## Tips
         - Ensure the template directory contains 'banks', 'inter', and 'tsp' subdirectories with required .docx files.
@@ -474,7 +502,10 @@ class LetterGeneratorApp:
 
     def update_button_states(self):
         has_case = self.crime_number and self.ncrp_id
-        self.bank_letters.generate_button.config(state="normal" if has_case and getattr(self.bank_letters, 'selected_file', None) else "disabled")
+        bank_state = "normal" if has_case and getattr(self.bank_letters, 'selected_file', None) else "disabled"
+        self.bank_letters.generate_button.config(state=bank_state)
+        self.bank_letters.export_zip_button.config(state=bank_state)
+        self.bank_letters.print_file_button.config(state=bank_state)
         self.inter_letters.inter_generate_button.config(state="normal" if has_case else "disabled")
         self.tsp_letters.tsp_generate_button.config(state="normal" if has_case else "disabled")
 
@@ -613,6 +644,7 @@ class LetterGeneratorApp:
             self.ncrp_id = None
             self.case_details_label.config(text="Case Details: Not Set")
             self.update_button_states()
+        logs.set_context(crime_number=self.crime_number, ncrp_id=self.ncrp_id)
 
     def toggle_profile(self):
         if self.profile_window and self.profile_window.winfo_exists():
@@ -737,16 +769,73 @@ class LetterGeneratorApp:
                         'Email': officer_data[4]
                     })
             except Exception as e:
-                logging.error(f"Error fetching officer details: {str(e)}")
+                logger.error("Error fetching officer details: %s", e)
             finally:
                 conn.close()
 
+    def render_letter(self, letter_type, case, output_path):
+        """Render one letter with the current officer profile and template directory.
+
+        When config.json has a ``service_url`` the letter is generated by the
+        local generation service instead; the GUI still records the letter itself.
+        """
+        start = time.perf_counter()
+        try:
+            service_url = self.config.get('service_url')
+            if service_url:
+                result = ServiceClient(service_url).render(letter_type, case, self.officer['Id'], output_path,
+                                                           record=False)
+            else:
+                self.fetch_officer_details()
+                result = render(letter_type, case, self.officer, self.template_dir, output_path)
+        except Exception as e:
+            metrics.letter_done(letter_type, 0, e)
+            raise
+        metrics.letter_done(letter_type, time.perf_counter() - start)
+        return result
+
+    def check_letter(self, letter_type, case, output_path):
+        """(input hash, unchanged) for a letter about to be written; see engine.incremental.
+
+        Unchanged letters already exist at ``output_path`` with the same inputs and need not be rendered.
+        """
+        self.fetch_officer_details()
+        try:
+            return incremental.check(letter_type, case, self.officer, self.template_dir, output_path)
+        except EngineError as e:
+            # The render reports the problem
+            logger.debug("No input hash for %s: %s", output_path, e)
+            return None, False
+
+    def arm_batch_profiling(self):
+        """Ctrl+Shift+P: run cProfile over the next batch."""
+        self.profile_next_batch = True
+        messagebox.showinfo("Profiling", "The next batch will be profiled. The profile is saved in "
+                                         "Documents/LetterGeneratorLogs.")
+
+    def batch_timing(self, name):
+        """(StageTimer, Profiler) for one batch; the profiler only runs when profiling was armed.
+
+        Also starts a new batch id for the log records.
+        """
+        profile, self.profile_next_batch = self.profile_next_batch, False
+        logs.set_context(batch_id=logs.new_batch_id())
+        return StageTimer(name), Profiler(name, profile)
+
+    def timing_summary(self, timer, profiler):
+        """Log the stage breakdown of a finished batch and return it for the completion dialog."""
+        text = timer.report()
+        if profiler.path:
+            text += f"\nProfile written to {profiler.path}"
+        logger.info(text)
+        return text
+
     def save_config(self, config_data):
         try:
             with open(CONFIG_FILE, 'w') as f:
                 json.dump(config_data, f)
         except Exception as e:
-            print(f"Error saving config: {e}")
+            logger.error("Error saving config: %s", e)
 
     def load_config(self):
         if not os.path.exists(CONFIG_FILE):
@@ -755,10 +844,13 @@ class LetterGeneratorApp:
             with open(CONFIG_FILE, 'r') as f:
                 return json.load(f)
         except Exception as e:
-            print(f"Error loading config: {e}")
+            logger.error("Error loading config: %s", e)
             return {}
 
 
+    def show_batch_errors(self, batch_id=None, rerun=None):
+        BatchErrorViewer(self.root, batch_id, rerun or self.bank_letters.rerun_failed, bg=self.bg_color)
+
     def show_error_log(self, errors):
         error_window = tk.Toplevel(self.root)
         error_window.title("Error Log")
@@ -0,0 +1,161 @@
+"""Detects freezes of the Tk event loop and records where the main thread was.
+
+A heartbeat ``after()`` callback stamps the time every HEARTBEAT_MS. A
+watchdog thread checks the stamp; when the event loop has not run the
+heartbeat for longer than the threshold, it samples the main thread's stack
+until the loop recovers. Each stall is logged with its duration and stack,
+and stalls are grouped by the innermost application function that was
+running (e.g. ``gui/login_window.py:login``) into a worst-offenders report,
+written to the logs directory at exit.
+
+The threshold is ``stall_threshold_ms`` in config.json (default 500);
+0 turns the watchdog off.
+"""
+import atexit
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from engine.logs import LOG_DIR
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = 'config.json'
+ROOT = str(Path(__file__).resolve().parent.parent)
+HEARTBEAT_MS = 100
+DEFAULT_THRESHOLD_MS = 500
+REPORT_LINES = 15
+
+_watchdog = None
+
+
+def stall_site(stack):
+    """``path:function`` of the innermost frame in the application's own code."""
+    for frame in reversed(stack):
+        path = os.path.abspath(frame.filename)
+        if path.startswith(ROOT) and path != os.path.abspath(__file__) and 'site-packages' not in path:
+            return f"{os.path.relpath(path, ROOT).replace(os.sep, '/')}:{frame.name}"
+    if stack:
+        return f"{os.path.basename(stack[-1].filename)}:{stack[-1].name}"
+    return 'unknown'
+
+
+class StallWatchdog:
+    """Watches the event loop of the attached Tk root from a daemon thread."""
+
+    def __init__(self, threshold_ms=DEFAULT_THRESHOLD_MS, log_dir=None):
+        self.threshold = threshold_ms / 1000
+        self.heartbeat = HEARTBEAT_MS / 1000
+        self.log_dir = log_dir or LOG_DIR
+        self.root = None
+        self.last_beat = time.monotonic()
+        self.main_ident = threading.main_thread().ident
+        # site -> [stalls, total seconds, worst seconds, stack of the worst]
+        self.offenders = {}
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name='stall-watchdog', daemon=True)
+
+    def attach(self, root):
+        """Watch ``root``; a new root (e.g. after login) replaces the previous one."""
+        self.root = root
+        self.last_beat = time.monotonic()
+        root.bind('<Destroy>', lambda event: self._detach(event, root), add='+')
+        root.after(HEARTBEAT_MS, self._beat, root)
+        if not self.thread.is_alive():
+            self.thread.start()
+
+    def _detach(self, event, root):
+        if event.widget is root and self.root is root:
+            self.root = None
+
+    def _beat(self, root):
+        if self.root is not root:
+            return
+        self.last_beat = time.monotonic()
+        root.after(HEARTBEAT_MS, self._beat, root)
+
+    def _sample(self):
+        frame = sys._current_frames().get(self.main_ident)
+        return traceback.extract_stack(frame) if frame is not None else []
+
+    def _run(self):
+        poll = max(0.02, self.threshold / 4)
+        while not self.stopped.wait(poll):
+            beat = self.last_beat
+            if self.root is None or time.monotonic() - beat <= self.heartbeat + self.threshold:
+                continue
+            samples = []
+            while self.last_beat == beat and self.root is not None and not self.stopped.is_set():
+                samples.append(self._sample())
+                self.stopped.wait(poll)
+            if self.last_beat != beat:
+                self._record(self.last_beat - beat - self.heartbeat, samples)
+
+    def _record(self, seconds, samples):
+        sites = Counter(stall_site(stack) for stack in samples)
+        site = sites.most_common(1)[0][0]
+        stack = next(stack for stack in samples if stall_site(stack) == site)
+        entry = self.offenders.setdefault(site, [0, 0.0, 0.0, None])
+        entry[0] += 1
+        entry[1] += seconds
+        if seconds >= entry[2]:
+            entry[2] = seconds
+            entry[3] = stack
+        logger.warning("UI stalled for %.2f s in %s\n%s", seconds, site,
+                       ''.join(traceback.format_list(stack)).rstrip())
+
+    def report(self):
+        """The worst offenders by total stall time, as text."""
+        lines = ["UI stalls by total time:"]
+        ranked = sorted(self.offenders.items(), key=lambda item: -item[1][1])
+        for site, (count, total, worst, stack) in ranked[:REPORT_LINES]:
+            lines.append(f"  {site:<50} {total:7.2f} s  {count:4d}x  worst {worst:.2f} s")
+        for site, (count, total, worst, stack) in ranked[:3]:
+            lines.append("")
+            lines.append(f"Worst stall in {site} ({worst:.2f} s):")
+            lines.append(''.join(traceback.format_list(stack)).rstrip())
+        return '\n'.join(lines)
+
+    def stop(self):
+        """Stop watching and write the report, if there were any stalls."""
+        self.stopped.set()
+        if not self.offenders:
+            return None
+        text = self.report()
+        logger.info(text)
+        path = os.path.join(self.log_dir, f"stall_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt")
+        try:
+            os.makedirs(self.log_dir, exist_ok=True)
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text + '\n')
+        except OSError as e:
+            logger.error("Failed to write stall report to %s: %s", path, e)
+            return None
+        return path
+
+
+def configured_threshold():
+    try:
+        with open(CONFIG_FILE, 'r') as f:
+            return int(json.load(f).get('stall_threshold_ms', DEFAULT_THRESHOLD_MS))
+    except (FileNotFoundError, json.JSONDecodeError, AttributeError, TypeError, ValueError):
+        return DEFAULT_THRESHOLD_MS
+
+
+def watch(root):
+    """Watch ``root`` with the process-wide watchdog, starting it on first use."""
+    global _watchdog
+    if _watchdog is None:
+        threshold = configured_threshold()
+        if threshold <= 0:
+            return None
+        _watchdog = StallWatchdog(threshold)
+        atexit.register(_watchdog.stop)
+    _watchdog.attach(root)
+    return _watchdog
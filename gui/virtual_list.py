@@ -0,0 +1,274 @@
+import sqlite3
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+import logging
+from db.database import connect_db
+
+logger = logging.getLogger(__name__)
+
+# Pause in typing after which a search box filters its list
+FILTER_DELAY_MS = 250
+
+
+class SQLitePageSource:
+    """Row source that reads a table page by page using keyset pagination.
+
+    reload() only counts the matching rows. The first key of each page is
+    looked up when the page is first needed, starting from the nearest page
+    whose first key is already known, and kept as an anchor so the page can
+    be fetched again with ``WHERE key >= ? LIMIT n`` instead of an OFFSET scan.
+    """
+
+    def __init__(self, table, columns, key='Id', where='', params=(), page_size=200, cache_pages=8):
+        self.table = table
+        self.columns = tuple(columns)
+        self.key = key
+        self.where = where
+        self.params = tuple(params)
+        self.page_size = page_size
+        self.cache_pages = cache_pages
+        self.conn = None
+        # page number -> key of its first row
+        self.anchors = {}
+        self.total = 0
+        self.pages = OrderedDict()
+
+    def _connection(self):
+        if self.conn is None:
+            self.conn = connect_db()
+            if not self.conn:
+                self.conn = None
+                raise sqlite3.OperationalError("Failed to connect to database")
+        return self.conn
+
+    def set_filter(self, where='', params=()):
+        """Change the WHERE clause; takes effect on the next reload()."""
+        self.where = where
+        self.params = tuple(params)
+
+    def reload(self):
+        """Count the matching rows and drop the anchors and cached pages."""
+        where = f" WHERE {self.where}" if self.where else ""
+        self.total = self._connection().execute(f"SELECT COUNT(*) FROM {self.table}{where}", self.params).fetchone()[0]
+        self.anchors = {}
+        self.pages.clear()
+        logger.debug("%s: %s rows", self.table, self.total)
+
+    def _anchor(self, number):
+        """Key of the first row of page ``number``, or None past the end."""
+        if number in self.anchors:
+            return self.anchors[number]
+        known = [page for page in self.anchors if page < number]
+        base = max(known) if known else None
+        clauses = [f"{self.key} >= ?"] if base is not None else []
+        params = (self.anchors[base],) if base is not None else ()
+        if self.where:
+            clauses.append(f"({self.where})")
+            params += self.params
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        skip = (number - (base if base is not None else 0)) * self.page_size
+        row = self._connection().execute(
+            f"SELECT {self.key} FROM {self.table}{where} ORDER BY {self.key} LIMIT 1 OFFSET ?", params + (skip,)
+        ).fetchone()
+        if row is None:
+            return None
+        self.anchors[number] = row[0]
+        return row[0]
+
+    def _page(self, number):
+        if number in self.pages:
+            self.pages.move_to_end(number)
+            return self.pages[number]
+        anchor = self._anchor(number)
+        if anchor is None:
+            return []
+        where = f" AND ({self.where})" if self.where else ""
+        cursor = self._connection().execute(
+            f"SELECT {', '.join(self.columns)} FROM {self.table} "
+            f"WHERE {self.key} >= ?{where} ORDER BY {self.key} LIMIT ?",
+            (anchor,) + self.params + (self.page_size,)
+        )
+        rows = cursor.fetchall()
+        self.pages[number] = rows
+        if len(self.pages) > self.cache_pages:
+            self.pages.popitem(last=False)
+        return rows
+
+    def __len__(self):
+        return self.total
+
+    def rows(self, start, count):
+        """Return up to ``count`` rows starting at row index ``start``."""
+        result = []
+        end = min(start + count, self.total)
+        while start < end:
+            number, offset = divmod(start, self.page_size)
+            page = self._page(number)[offset:offset + (end - start)]
+            if not page:
+                break
+            result.extend(page)
+            start += len(page)
+        return result
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
+
+
+class Debouncer:
+    """Calls ``callback`` once input has paused for ``delay`` ms.
+
+    Bind it to a search box's <KeyRelease> so a burst of keystrokes filters
+    the list once instead of on every key.
+    """
+
+    def __init__(self, widget, callback, delay=FILTER_DELAY_MS):
+        self.widget = widget
+        self.callback = callback
+        self.delay = delay
+        self.pending = None
+
+    def __call__(self, event=None):
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+        self.pending = self.widget.after(self.delay, self._run)
+
+    def _run(self):
+        self.pending = None
+        if self.widget.winfo_exists():
+            self.callback()
+
+
+class VirtualTreeview(tk.Frame):
+    """Treeview that only holds the rows currently visible.
+
+    The widget keeps a fixed pool of items and rewrites their values as the
+    user scrolls, so scrolling cost does not depend on the size of the source.
+    A source needs ``__len__`` and ``rows(start, count)``; ``reload()`` is
+    called on refresh when present.
+    """
+
+    def __init__(self, parent, columns, source, height=12, key_index=0, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.source = source
+        self.key_index = key_index
+        self.top = 0
+        self.visible = height
+        self.selected_key = None
+
+        self.tree = ttk.Treeview(self, columns=columns, show="headings", height=height, selectmode="browse")
+        for col in columns:
+            self.tree.heading(col, text=col)
+            self.tree.column(col, anchor="center")
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_mousewheel)
+        self.tree.bind("<Button-4>", self._on_mousewheel)
+        self.tree.bind("<Button-5>", self._on_mousewheel)
+        self.tree.bind("<Up>", lambda e: self._on_arrow(-1))
+        self.tree.bind("<Down>", lambda e: self._on_arrow(1))
+        self.tree.bind("<Prior>", lambda e: self._scroll_by(-self.visible))
+        self.tree.bind("<Next>", lambda e: self._scroll_by(self.visible))
+        self.tree.bind("<Home>", lambda e: self._scroll_to(0))
+        self.tree.bind("<End>", lambda e: self._scroll_to(len(self.source)))
+        self.bind("<Destroy>", self._on_destroy)
+
+    def refresh(self):
+        """Reload the source and redraw the visible window."""
+        if hasattr(self.source, 'reload'):
+            self.source.reload()
+        self._scroll_to(self.top)
+
+    def selected_values(self):
+        selection = self.tree.selection()
+        return self.tree.item(selection[0])['values'] if selection else None
+
+    def yview(self, *args):
+        """Scrollbar command: translate moveto/scroll into a row offset."""
+        if not args:
+            return
+        if args[0] == "moveto":
+            self._scroll_to(int(float(args[1]) * len(self.source)))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            self._scroll_by(step * self.visible if args[2] == "pages" else step)
+
+    def _scroll_by(self, delta):
+        self._scroll_to(self.top + delta)
+        return "break"
+
+    def _scroll_to(self, top):
+        total = len(self.source)
+        self.top = max(0, min(top, total - self.visible))
+        self._render()
+        return "break"
+
+    def _render(self):
+        rows = self.source.rows(self.top, self.visible)
+        items = self.tree.get_children()
+        for i, row in enumerate(rows):
+            iid = f"row{i}"
+            if i < len(items):
+                self.tree.item(iid, values=row)
+            else:
+                self.tree.insert("", "end", iid=iid, values=row)
+        if len(items) > len(rows):
+            self.tree.delete(*items[len(rows):])
+
+        selected = [f"row{i}" for i, row in enumerate(rows)
+                    if self.selected_key is not None and row[self.key_index] == self.selected_key]
+        self.tree.selection_set(selected)
+
+        total = len(self.source)
+        if total:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + len(rows)) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def _on_select(self, event=None):
+        values = self.selected_values()
+        if values:
+            self.selected_key = values[self.key_index]
+
+    def _on_arrow(self, direction):
+        focus = self.tree.focus()
+        items = self.tree.get_children()
+        if not items:
+            return "break"
+        index = items.index(focus) if focus in items else 0
+        target = index + direction
+        if target < 0:
+            self._scroll_by(-1)
+            target = 0
+        elif target >= len(items):
+            self._scroll_by(1)
+            target = len(self.tree.get_children()) - 1
+        iid = self.tree.get_children()[target]
+        self.tree.focus(iid)
+        self.tree.selection_set(iid)
+        return "break"
+
+    def _on_mousewheel(self, event):
+        if event.num == 4:
+            return self._scroll_by(-3)
+        if event.num == 5:
+            return self._scroll_by(3)
+        return self._scroll_by(-3 if event.delta > 0 else 3)
+
+    def _on_resize(self, event):
+        rowheight = ttk.Style().lookup("Treeview", "rowheight") or 20
+        visible = max(1, (event.height - 25) // int(rowheight))
+        if visible != self.visible:
+            self.visible = visible
+            self.tree.configure(height=visible)
+            self._scroll_to(self.top)
+
+    def _on_destroy(self, event):
+        if event.widget is self and hasattr(self.source, 'close'):
+            self.source.close()
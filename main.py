@@ -1,13 +1,21 @@
+import multiprocessing
 import tkinter as tk
+from engine.logs import setup_logging
 from gui.login_window import LoginWindow
 from gui.main_app import LetterGeneratorApp
+from gui.stall_watchdog import watch
 from db.database import create_database,create_default_admin
 
 def main():
+    # Batches render in a process pool; in the frozen exe each worker starts
+    # this executable again and must not open another window
+    multiprocessing.freeze_support()
+    setup_logging('app')
     create_database()
     create_default_admin()
     
     root = tk.Tk()
+    watch(root)
     app = LoginWindow(root, lambda officer, new_root: LetterGeneratorApp(new_root, officer))
     root.mainloop()
 
@@ -5,7 +5,7 @@ a = Analysis(
     ['main.py'],
     pathex=[],
     binaries=[],
-    datas=[('assets\\police.png', 'assets'), ('db\\letter_requests.db', 'db')],
+    datas=[('assets\\police.png', 'assets'), ('db\\letter_requests.db', 'db'), ('db\\msisdn_series.csv', 'db')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,32 @@
+import os
+import pandas as pd
+import pytest
+from db.database import DB_PATH_ENV, create_database
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATE_DIR = os.path.join(ROOT, 'templates')
+
+
+@pytest.fixture
+def database(tmp_path, monkeypatch):
+    """A fresh database with the default admin (officer 1) and every table."""
+    monkeypatch.setenv(DB_PATH_ENV, str(tmp_path / 'letters.db'))
+    create_database()
+    return tmp_path / 'letters.db'
+
+
+BANK_ROWS = {
+    'Account No': ['1234567890', '9876543210'],
+    'IFSC Code': ['SBIN0000001', 'HDFC0000001'],
+    'Transaction Amount': ['1000', '2500'],
+    'Date From': ['01-03-2025', '02-03-2025'],
+    'Date To': ['05-03-2025', '05-03-2025'],
+    'Transaction ID / UTR Number2': ['UTR1', 'UTR2'],
+    'Bank/FIs': ['SBI', 'HDFC Bank'],
+}
+
+
+def write_bank_sheet(path, rows=None):
+    """Write a bank sheet (SBI and HDFC Bank by default) and return its path."""
+    pd.DataFrame(rows or BANK_ROWS).to_excel(path, index=False)
+    return str(path)
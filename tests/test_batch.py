@@ -0,0 +1,12 @@
+import os
+from engine.batch import bank_jobs, bank_output_path
+from .conftest import TEMPLATE_DIR, write_bank_sheet
+
+
+def test_bank_jobs_are_numbered_in_bank_order(tmp_path):
+    sheet = write_bank_sheet(tmp_path / 'banks.xlsx')
+    jobs, errors = bank_jobs(sheet, '21/2025', '12345678901234', {}, TEMPLATE_DIR, str(tmp_path))
+    assert not errors
+    assert [os.path.basename(job['output_path']) for job in jobs] == ['Notice_HDFC_Bank_1.docx', 'Notice_SBI_2.docx']
+    assert [job['output_path'] for job in jobs] == [bank_output_path(job['case'], index, str(tmp_path))
+                                                   for index, job in enumerate(jobs, start=1)]
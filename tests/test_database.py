@@ -0,0 +1,51 @@
+import subprocess
+import sys
+from db.database import failed_groups, fetch_officer, record_batch_errors, save_case
+from engine.bank import build_bank_cases, read_bank_sheet
+from engine import metrics
+from engine.timing import StageTimer
+from .conftest import BANK_ROWS, ROOT, write_bank_sheet
+
+CASE = {'CrimeNumber': '21/2025', 'NCRP_ID': '12345678901234'}
+
+
+def partial_sheet(tmp_path):
+    """SBI with one bad account among good ones, and a bank whose only account is bad."""
+    rows = {column: values + values[:1] * 2 for column, values in BANK_ROWS.items()}
+    rows['Account No'] = ['1234567890', '9876543210', '12', 'n/a']
+    rows['Bank/FIs'] = ['SBI', 'HDFC Bank', 'SBI', 'Canara Bank']
+    return write_bank_sheet(tmp_path / 'partial.xlsx', rows)
+
+
+def test_partial_row_warning_is_not_rerun(database, tmp_path):
+    sheet = partial_sheet(tmp_path)
+    cases, errors = build_bank_cases(read_bank_sheet(sheet), CASE['CrimeNumber'], CASE['NCRP_ID'])
+    assert [bank_name for bank_name, case in cases] == ['HDFC Bank', 'SBI']
+    assert {(error.group, error.stage) for error in errors} == {('SBI', 'warning'), ('Canara Bank', 'validate')}
+
+    assert record_batch_errors('b1', CASE, 1, 'Bank', [e for e in errors if e.group == 'SBI'], sheet) is None
+    failed = failed_groups('b1')
+    assert failed['Groups'] == []
+    assert failed['SourcePath'] == sheet
+
+    assert record_batch_errors('b2', CASE, 1, 'Bank', errors, sheet) is None
+    assert failed_groups('b2')['Groups'] == ['Canara Bank']
+
+
+def test_batch_without_errors_has_nothing_to_rerun(database):
+    assert failed_groups('unknown') is None
+
+
+def test_database_does_not_import_the_engine():
+    code = "import sys, db.database; print(sorted(m for m in sys.modules if m.split('.')[0] == 'engine'))"
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    assert output.strip() == '[]'
+
+
+def test_database_calls_are_timed_by_the_engine(database, monkeypatch):
+    monkeypatch.setattr(metrics._state, 'enabled', True)
+    with StageTimer() as timer:
+        assert save_case(CASE, 1, 'Bank') is None
+        assert fetch_officer(1)['Id'] == 1
+    assert {stage: entry['count'] for stage, entry in timer.as_dict().items()} == {'save_case': 1, 'fetch_officer': 1}
+    assert ('save_case',) in metrics.DB_SECONDS.values
@@ -0,0 +1,93 @@
+import pytest
+from engine.identifiers import (BAD_CHARACTERS, BAD_CHECKSUM, BAD_LENGTH, BAD_PREFIX, EMPTY, OK, error_message,
+                                first_error, looks_like_header, normalize_identifiers, split_identifiers)
+
+
+def normalized(values, kind):
+    values, codes = normalize_identifiers(values, kind)
+    return list(zip(values.tolist(), codes.tolist()))
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('9876543210', '9876543210'),
+    ('+91 98765-43210', '9876543210'),
+    ('919876543210', '9876543210'),
+    ('09876543210', '9876543210'),
+    ('(98765) 43210', '9876543210'),
+    ('98765\xa043210', '9876543210'),
+    (9876543210.0, '9876543210'),
+    ('9876543210.0', '9876543210'),
+])
+def test_good_mobiles(value, expected):
+    assert normalized([value], 'mobile') == [(expected, OK)]
+
+
+@pytest.mark.parametrize('value, code', [
+    ('', EMPTY),
+    (None, EMPTY),
+    (float('nan'), EMPTY),
+    ('98765 4321', BAD_LENGTH),
+    ('987654321012', BAD_LENGTH),
+    ('5876543210', BAD_PREFIX),
+    ('98765O4321', BAD_CHARACTERS),
+    ('९८७६५४३२१०', BAD_CHARACTERS),
+])
+def test_bad_mobiles(value, code):
+    assert normalized([value], 'mobile')[0][1] == code
+
+
+def test_imei_luhn_check():
+    assert normalized(['490154203237518', '35-693803-564380-9', '490154203237519', '49015420323751'], 'imei') == [
+        ('490154203237518', OK), ('356938035643809', OK), ('490154203237519', BAD_CHECKSUM),
+        ('49015420323751', BAD_LENGTH)]
+
+
+def test_aadhaar_verhoeff_check():
+    assert normalized(['2341 2341 2346', '499118665246', '234123412347', '123456789012'], 'aadhaar') == [
+        ('234123412346', OK), ('499118665246', OK), ('234123412347', BAD_CHECKSUM), ('123456789012', BAD_PREFIX)]
+
+
+def test_accounts_keep_letters_upper_case():
+    assert normalized(['sbin-0001 23', '12', 'é123456'], 'account') == [
+        ('SBIN000123', OK), ('12', BAD_LENGTH), ('123456', BAD_CHARACTERS)]
+
+
+def test_clean_and_messy_values_in_one_list():
+    values = ['9876543210'] * 3 + ['+91 9876543210', 'abc']
+    assert [code for _, code in normalized(values, 'mobile')] == [OK, OK, OK, OK, BAD_CHARACTERS]
+
+
+def test_messages():
+    assert error_message('imei', BAD_CHECKSUM) == "IMEI No has an invalid check digit."
+    assert first_error(['9876543210', '5876543210'], 'mobile') == (
+        "Phone No must start with 6, 7, 8 or 9. (5876543210)")
+    assert first_error(['9876543210'], 'mobile') is None
+
+
+@pytest.mark.parametrize('text, kind, expected', [
+    ('+91 98765 43210\n98765 43210', 'mobile', ['+91 98765 43210', '98765 43210']),
+    ('9876543210 9123456789', 'mobile', ['9876543210', '9123456789']),
+    ('@a @b', 'mobile', ['@a', '@b']),
+    ('@a\t@b;  @c  @d', None, ['@a', '@b', '@c', '@d']),
+    ('a@x.com b@y.com', 'pos', ['a@x.com', 'b@y.com']),
+])
+def test_split_identifiers(text, kind, expected):
+    assert split_identifiers(text, kind) == expected
+
+
+@pytest.mark.parametrize('cells, kind, expected', [
+    (['Mobile No'], 'mobile', True),
+    (['Sl No', 'Mobile Number', None], 'mobile', True),
+    (['9876543210'], 'mobile', False),
+    (['1', 'Mobile No'], 'mobile', False),
+    (['abc'], 'mobile', True),
+    (['IMEI'], 'imei', True),
+    (['URL'], None, True),
+    (['Profile link', 'Platform'], None, True),
+    (['https://t.me/chan'], None, False),
+    (['someone@gmail.com'], None, False),
+    (['facebook.com/page'], None, False),
+    ([None, float('nan'), ''], 'mobile', False),
+])
+def test_looks_like_header(cells, kind, expected):
+    assert looks_like_header(cells, kind) == expected
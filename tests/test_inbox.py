@@ -0,0 +1,62 @@
+import json
+import os
+import pytest
+from engine.errors import InputDataError
+from engine.inbox import Inbox, case_from_file
+from .conftest import TEMPLATE_DIR, write_bank_sheet
+
+
+@pytest.fixture
+def inbox(database, tmp_path):
+    return Inbox(str(tmp_path / 'inbox'), TEMPLATE_DIR, str(tmp_path / 'out'), settle=0.1)
+
+
+def result_of(inbox, folder, name):
+    with open(os.path.join(inbox.inbox_dir, folder, os.path.splitext(name)[0] + '.result.json'),
+              encoding='utf-8') as f:
+        return json.load(f)
+
+
+def test_case_from_file_name(tmp_path):
+    path = str(tmp_path / '21_2025__12345678901234__3.xlsx')
+    assert case_from_file(path) == ('21/2025', '12345678901234', 3)
+    assert case_from_file(str(tmp_path / '21_2025__12345678901234.xlsx'), 7) == ('21/2025', '12345678901234', 7)
+
+
+def test_case_from_sidecar_with_a_bad_officer_id(tmp_path):
+    path = tmp_path / 'export.xlsx'
+    (tmp_path / 'export.json').write_text(json.dumps(
+        {'crime_number': '21/2025', 'ncrp_id': '12345678901234', 'officer_id': 'abc'}))
+    with pytest.raises(InputDataError, match='Invalid officer id'):
+        case_from_file(str(path))
+
+
+def test_empty_file_is_filed_under_failed(inbox):
+    os.makedirs(inbox.inbox_dir)
+    open(os.path.join(inbox.inbox_dir, 'empty__1__1.xlsx'), 'wb').close()
+    summaries = inbox.run_once()
+    assert [summary['status'] for summary in summaries] == ['failed']
+    assert os.listdir(inbox.inbox_dir) == ['failed']
+    assert 'empty' in result_of(inbox, 'failed', 'empty__1__1.xlsx')['errors'][0]
+
+
+def test_non_numeric_officer_in_sidecar_is_filed_under_failed(inbox, tmp_path):
+    os.makedirs(inbox.inbox_dir)
+    with open(os.path.join(inbox.inbox_dir, 'export.xlsx'), 'wb') as f:
+        f.write(b'not really a workbook')
+    with open(os.path.join(inbox.inbox_dir, 'export.json'), 'w', encoding='utf-8') as f:
+        json.dump({'crime_number': '21/2025', 'ncrp_id': '12345678901234', 'officer_id': 'SI Kumar'}, f)
+    summaries = inbox.run_once()
+    assert [summary['status'] for summary in summaries] == ['failed']
+    assert sorted(os.listdir(os.path.join(inbox.inbox_dir, 'failed'))) == [
+        'export.json', 'export.result.json', 'export.xlsx']
+    assert 'Invalid officer id' in result_of(inbox, 'failed', 'export.xlsx')['errors'][0]
+
+
+def test_spreadsheet_is_filed_under_done(inbox):
+    os.makedirs(inbox.inbox_dir)
+    write_bank_sheet(os.path.join(inbox.inbox_dir, '21_2025__12345678901234__1.xlsx'))
+    [summary] = inbox.run_once()
+    assert summary['status'] == 'done'
+    assert summary['generated'] == 2
+    assert result_of(inbox, 'done', '21_2025__12345678901234__1.xlsx')['crime_number'] == '21/2025'
@@ -0,0 +1,88 @@
+import json
+import os
+import shutil
+from docx import Document
+from db.database import record_letter, save_case
+from engine.batch import bank_jobs, run_jobs
+from engine.cli import main
+from engine.incremental import is_current, split_jobs
+from .conftest import BANK_ROWS, TEMPLATE_DIR, write_bank_sheet
+
+CASE_KEY = {'CrimeNumber': '21/2025', 'NCRP_ID': '12345678901234'}
+OFFICER = {'Id': 1, 'OfficerName': 'Test Officer', 'Designation': 'Inspector',
+           'Phone': '9000000000', 'Email': 'officer@example.com'}
+
+
+def generate(sheet, output_dir, officer=OFFICER, template_dir=TEMPLATE_DIR):
+    """Run a bank batch with reuse, record its letters as the CLI does and return {file name: reused}."""
+    jobs, errors = bank_jobs(sheet, CASE_KEY['CrimeNumber'], CASE_KEY['NCRP_ID'], officer, template_dir,
+                             str(output_dir))
+    assert not errors
+    assert save_case(CASE_KEY, 1, 'Bank') is None
+    results = run_jobs(jobs, reuse=True)
+    for result in results:
+        assert result['status'] == 'ok'
+        if not result.get('reused'):
+            assert record_letter(CASE_KEY, 1, 'Bank', result['recipient'], result['output_path'],
+                                 result['input_hash']) is None
+    return {os.path.basename(result['output_path']): bool(result.get('reused')) for result in results}
+
+
+def test_unchanged_inputs_are_reused(database, tmp_path):
+    sheet = write_bank_sheet(tmp_path / 'banks.xlsx')
+    assert generate(sheet, tmp_path / 'out') == {'Notice_HDFC_Bank_1.docx': False, 'Notice_SBI_2.docx': False}
+    assert generate(sheet, tmp_path / 'out') == {'Notice_HDFC_Bank_1.docx': True, 'Notice_SBI_2.docx': True}
+
+
+def test_changed_case_is_rendered_again(database, tmp_path):
+    generate(write_bank_sheet(tmp_path / 'banks.xlsx'), tmp_path / 'out')
+    rows = dict(BANK_ROWS, **{'Date From': ['01-03-2025', '03-03-2025']})
+    assert generate(write_bank_sheet(tmp_path / 'changed.xlsx', rows), tmp_path / 'out') == {
+        'Notice_HDFC_Bank_1.docx': False, 'Notice_SBI_2.docx': True}
+
+
+def test_changed_officer_is_rendered_again(database, tmp_path):
+    sheet = write_bank_sheet(tmp_path / 'banks.xlsx')
+    generate(sheet, tmp_path / 'out')
+    officer = dict(OFFICER, Designation='Sub-Inspector')
+    assert not any(generate(sheet, tmp_path / 'out', officer).values())
+
+
+def test_changed_template_is_rendered_again(database, tmp_path):
+    template_dir = tmp_path / 'templates'
+    shutil.copytree(TEMPLATE_DIR, template_dir)
+    sheet = write_bank_sheet(tmp_path / 'banks.xlsx')
+    generate(sheet, tmp_path / 'out', template_dir=str(template_dir))
+    template = template_dir / 'banks' / 'bank.docx'
+    doc = Document(str(template))
+    doc.add_paragraph("Reply within seven days.")
+    doc.save(str(template))
+    assert not any(generate(sheet, tmp_path / 'out', template_dir=str(template_dir)).values())
+
+
+def test_deleted_output_is_rendered_again(database, tmp_path):
+    sheet = write_bank_sheet(tmp_path / 'banks.xlsx')
+    generate(sheet, tmp_path / 'out')
+    jobs, _ = bank_jobs(sheet, CASE_KEY['CrimeNumber'], CASE_KEY['NCRP_ID'], OFFICER, TEMPLATE_DIR,
+                        str(tmp_path / 'out'))
+    stale, current = split_jobs(jobs)
+    assert not stale and all(is_current(job['output_path'], job['input_hash']) for job in current)
+    os.remove(jobs[0]['output_path'])
+    assert not is_current(jobs[0]['output_path'], jobs[0]['input_hash'])
+    assert generate(sheet, tmp_path / 'out') == {'Notice_HDFC_Bank_1.docx': False, 'Notice_SBI_2.docx': True}
+
+
+def test_force_renders_every_letter(database, tmp_path, capsys):
+    sheet = write_bank_sheet(tmp_path / 'banks.xlsx')
+    argv = ['bank', '--excel', sheet, '--crime-number', CASE_KEY['CrimeNumber'], '--ncrp-id', CASE_KEY['NCRP_ID'],
+            '--officer-id', '1', '--template-dir', TEMPLATE_DIR, '--output-dir', str(tmp_path / 'out'),
+            '--executor', 'thread', '--json']
+
+    def reused(extra):
+        capsys.readouterr()
+        assert main(argv + extra) == 0
+        return json.loads(capsys.readouterr().out)['reused']
+
+    assert reused([]) == 0
+    assert reused([]) == 2
+    assert reused(['--force']) == 0
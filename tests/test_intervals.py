@@ -0,0 +1,80 @@
+import pandas as pd
+import pytest
+from engine.intervals import merge_date_ranges, merge_intervals, parse_range
+from engine.tsp import build_tsp_import_cases, group_tsp_rows
+
+
+@pytest.mark.parametrize('intervals, expected', [
+    ([], []),
+    ([(5, 9), (1, 3)], [(1, 3), (5, 9)]),
+    ([(1, 5), (3, 8)], [(1, 8)]),
+    ([(1, 3), (4, 6)], [(1, 6)]),
+    ([(1, 10), (2, 3), (11, 12), (20, 25)], [(1, 12), (20, 25)]),
+    ([(4, 4), (4, 4)], [(4, 4)]),
+])
+def test_merge_intervals(intervals, expected):
+    assert merge_intervals(intervals) == expected
+
+
+def test_merge_date_ranges():
+    assert merge_date_ranges([
+        ('10-03-2025', '20-03-2025'),
+        ('01-03-2025', '12-03-2025'),   # overlaps the first
+        ('21-03-2025', '31-03-2025'),   # starts the day after it ends
+        ('01-04-2025', '05-04-2025'),   # adjacent across the month end
+        ('10-04-2025', '15-04-2025'),
+        ('30-02-2025', '02-03-2025'),   # not a date
+        ('20-05-2025', '10-05-2025'),   # ends before it starts
+    ]) == [('01-03-2025', '05-04-2025'), ('10-04-2025', '15-04-2025')]
+
+
+def test_parse_range():
+    assert parse_range('01-03-2025:05-03-2025') == ('01-03-2025', '05-03-2025')
+    assert parse_range(' 01-03-2025 to 05-03-2025 ') == ('01-03-2025', '05-03-2025')
+    assert parse_range('01-03-2025') == ('01-03-2025', '')
+
+
+def tsp_sheet(rows):
+    return pd.DataFrame(rows, columns=['identifier', 'tsp', 'request_type', 'from_date', 'to_date'])
+
+
+def test_identifiers_with_the_same_merged_ranges_share_a_letter():
+    df = tsp_sheet([
+        ('9876543210', 'Airtel', 'CDR', '01-03-2025', '10-03-2025'),
+        ('9876543210', 'Airtel', 'CDR', '11-03-2025', '20-03-2025'),   # adjacent: merges with row 2
+        ('9123456789', 'airtel', 'cdr', '01-03-2025', '20-03-2025'),   # same merged range as 9876543210
+        ('9000000001', 'Airtel', 'CDR', '05-03-2025', '15-03-2025'),
+        ('9000000001', 'Airtel', 'CDR', '01-04-2025', '02-04-2025'),   # a gap: two ranges
+        ('9000000002', 'Jio', 'CDR', '01-03-2025', '20-03-2025'),      # another TSP
+        ('12345', 'Airtel', 'CDR', '01-03-2025', '20-03-2025'),
+        ('9000000003', 'Airtel', 'CDR', '20-03-2025', '01-03-2025'),
+        ('9000000004', 'Unknown', 'CDR', '01-03-2025', '20-03-2025'),
+        ('9000000005', 'Airtel', 'CDR', None, None),
+        ('9000000006', 'Airtel', 'CAF', None, None),
+    ])
+    groups, errors = group_tsp_rows(df)
+    assert sorted(groups) == sorted([
+        ('Airtel', 'CDR', [('01-03-2025', '20-03-2025')], ['9876543210', '9123456789']),
+        ('Airtel', 'CDR', [('05-03-2025', '15-03-2025'), ('01-04-2025', '02-04-2025')], ['9000000001']),
+        ('Jio', 'CDR', [('01-03-2025', '20-03-2025')], ['9000000002']),
+        ('Airtel', 'CAF', [], ['9000000006']),
+    ])
+    # Errors name the sheet row: the header is row 1, so DataFrame line 6 is row 8
+    assert errors == [
+        "Row 8: Phone No must be 10 digits.",
+        "Row 9: From date 20-03-2025 is after To date 01-03-2025.",
+        "Row 10: unknown TSP or request type",
+        "Row 11: From and To dates are required.",
+    ]
+
+
+def test_import_cases_list_the_merged_ranges():
+    df = tsp_sheet([
+        ('9876543210', 'Airtel', 'CDR', '01-03-2025', '10-03-2025'),
+        ('9876543210', 'Airtel', 'CDR', '05-03-2025', '20-03-2025'),
+    ])
+    [case], errors = build_tsp_import_cases(df, '21/2025', '12345678901234')
+    assert not errors
+    assert case['TSP'] == 'Airtel' and case['Request_Type'] == 'CDR'
+    assert case['MobileNo'] == ['9876543210']
+    assert case['Date_Ranges'] == [('01-03-2025', '20-03-2025')]
@@ -0,0 +1,43 @@
+from docx import Document
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.oxml.ns import qn
+from engine.merge import merge_documents
+from engine.render import render
+from .conftest import TEMPLATE_DIR
+
+OFFICER = {'Id': 1, 'OfficerName': 'Test Officer', 'Designation': 'Inspector',
+           'Phone': '9000000000', 'Email': 'officer@example.com'}
+
+
+def bank_letter(bank, account_no):
+    case = {'CrimeNumber': '21/2025', 'NCRP_ID': '12345678901234', 'Bank': bank, 'Total_Amount': '₹3,500/-',
+            'Date_From': '01-03-2025', 'Date_To': '05-03-2025',
+            'Accounts': [{'account_no': account_no, 'ifsc_code': 'SBIN0000001'}]}
+    return render('Bank', case, OFFICER, TEMPLATE_DIR, output_format='docx')
+
+
+def test_merged_letters_keep_bodies_images_and_lists(tmp_path):
+    path = merge_documents([bank_letter('SBI', '1234567890'), bank_letter('HDFC Bank', '9876543210')],
+                           str(tmp_path / 'merged.docx'))
+    doc = Document(path)
+    body = doc.element.body
+    text = ''.join(t.text or '' for t in body.iter(qn('w:t')))
+    assert 'SBI' in text and 'HDFC Bank' in text
+    assert '1234567890' in text and '9876543210' in text
+    # Each letter is its own section, so it starts on a new page
+    assert len(doc.sections) == 2
+
+    # Both letters show the template's image, stored once
+    embeds = [blip.get(qn('r:embed')) for blip in body.iter(qn('a:blip'))]
+    assert len(embeds) == 2
+    assert all(doc.part.rels[rid].reltype == RT.IMAGE for rid in embeds)
+    assert len({doc.part.rels[rid].target_part.partname for rid in embeds}) == 1
+    drawing_ids = [doc_pr.get('id') for doc_pr in body.iter(qn('wp:docPr'))]
+    assert len(set(drawing_ids)) == len(drawing_ids)
+
+    # The second letter's list is copied under a new id, so its numbering restarts
+    num_ids = {num_id.get(qn('w:val')) for num_id in body.iter(qn('w:numId'))}
+    assert len(num_ids) == 2
+    numbering = doc.part.numbering_part.element
+    defined = {num.get(qn('w:numId')) for num in numbering.iterchildren(qn('w:num'))}
+    assert num_ids <= defined
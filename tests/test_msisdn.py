@@ -0,0 +1,71 @@
+import pandas as pd
+import pytest
+from engine.errors import InputDataError
+from engine.msisdn import DEFAULT_SERIES_FILE, MsisdnIndex, canonical_operator, to_msisdn
+from engine.tsp import TSP_NAMES, group_tsp_rows
+
+
+@pytest.fixture
+def index():
+    series = {'98': "Jio", '9845': "Airtel", '98450': "BSNL", '9448': "BSNL", '70': "Vodafone", '71': "Unknown Co"}
+    return MsisdnIndex(series, ports={'9845012345': "Jio"})
+
+
+def test_to_msisdn():
+    assert to_msisdn('+91 98450 12345') == 9845012345
+    assert to_msisdn('09845012345') == 9845012345
+    assert to_msisdn('12345') is None
+
+
+def test_canonical_operator():
+    assert canonical_operator(' Bharti Airtel ') == "Airtel"
+    assert canonical_operator('Vi') == "Vodafone"
+    assert canonical_operator('bsnl') == "BSNL"
+    assert canonical_operator('MTNL') is None
+
+
+def test_longest_prefix_and_ports_win(index):
+    assert index.lookup('9800000000') == "Jio"
+    assert index.lookup('9845900000') == "Airtel"
+    assert index.lookup('9845000000') == "BSNL"
+    assert index.lookup('9845012345') == "Jio"
+    assert index.lookup('7100000000') is None
+    assert index.lookup('not a number') is None
+
+
+def test_lookup_many_matches_lookup(index):
+    numbers = ['+91 98450 00000', '919845900000', '09448123456', '7012345678', '6000000000', 'abc', '', '9845012345']
+    assert index.lookup_many(numbers) == ["BSNL", "Airtel", "BSNL", "Vodafone", None, None, None, "Jio"]
+    assert index.lookup_many(numbers) == [index.lookup(number) for number in numbers]
+    assert index.lookup_many([]) == []
+
+
+def test_split(index):
+    groups, unknown = index.split(['9845900000', '+91 98001 00000', '9448000000', '6000000000', '98450 00001'])
+    assert groups == {"Airtel": ['9845900000'], "Jio": ['+91 98001 00000'], "BSNL": ['9448000000', '98450 00001']}
+    assert unknown == ['6000000000']
+
+
+def test_shipped_series_covers_every_operator():
+    index = MsisdnIndex.from_files(DEFAULT_SERIES_FILE)
+    assert set(index.codes.tolist()) - {-1} == set(range(len(TSP_NAMES)))
+    groups, unknown = index.split(['9845000001', '6360000001', '9886000001', '9448000001', '6000000001'])
+    assert sorted(groups) == sorted(TSP_NAMES)
+    assert unknown == ['6000000001']
+
+
+def test_missing_series_file(tmp_path):
+    with pytest.raises(InputDataError, match='series file not found'):
+        MsisdnIndex.from_files(str(tmp_path / 'missing.csv'))
+
+
+def test_auto_tsp_rows_are_split_by_operator(index):
+    df = pd.DataFrame([
+        ('9845900000', 'Auto', 'CAF', None, None),
+        ('9800000000', 'Auto', 'CAF', None, None),
+        ('6000000000', 'Auto', 'CAF', None, None),
+        ('490154203237518', 'Auto', 'IMEI CDR', '01-03-2025', '02-03-2025'),
+    ], columns=['identifier', 'tsp', 'request_type', 'from_date', 'to_date'])
+    groups, errors = group_tsp_rows(df, index)
+    assert sorted(groups) == [("Airtel", "CAF", [], ['9845900000']), ("Jio", "CAF", [], ['9800000000'])]
+    assert errors == ["Row 4: operator not found in the number series", "Row 5: unknown TSP or request type"]
@@ -0,0 +1,155 @@
+import asyncio
+import json
+import threading
+import urllib.request
+import zipfile
+import pytest
+from db.database import connect_db
+from engine.client import ServiceClient
+from engine.errors import ServiceError
+from engine.service import GenerationService
+from .conftest import TEMPLATE_DIR
+
+OFFICER_ID = 1
+
+
+def bank_case(bank):
+    return {'CrimeNumber': '21/2025', 'NCRP_ID': '12345678901234', 'Bank': bank,
+            'Accounts': [{'account_no': '1234567890', 'ifsc_code': 'SBIN0000001'}]}
+
+
+@pytest.fixture
+def client(database, tmp_path):
+    """A client for a service on 127.0.0.1 with a random port and thread workers."""
+    service = GenerationService(TEMPLATE_DIR, str(tmp_path / 'out'), workers=2, executor='thread')
+    started = threading.Event()
+    loop = asyncio.new_event_loop()
+    task = loop.create_task(service.run('127.0.0.1', 0, ready=lambda s: started.set()))
+
+    def run():
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert started.wait(10)
+    yield ServiceClient(f"http://127.0.0.1:{service.port}", timeout=30, poll_interval=0.05)
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(10)
+    loop.close()
+
+
+def post(client, payload):
+    """(status, body) of a raw POST /jobs, for payloads ServiceClient would not send."""
+    request = urllib.request.Request(client.base_url + '/jobs', data=json.dumps(payload).encode('utf-8'),
+                                     method='POST', headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_submit_poll_and_download_one_letter(client, tmp_path):
+    job_id = client.submit(OFFICER_ID, [{'letter_type': 'Bank', 'case': bank_case('SBI')}])
+    status = client.wait(job_id)
+    assert status['status'] == 'done'
+    assert status['generated'] == 1 and status['failed'] == 0
+    path = client.download(job_id, str(tmp_path / 'letter.docx'))
+    with open(path, 'rb') as f:
+        assert zipfile.is_zipfile(f)  # .docx files are ZIP packages
+        f.seek(0)
+        assert 'word/document.xml' in zipfile.ZipFile(f).namelist()
+
+
+def test_download_zip_of_several_letters(client, tmp_path):
+    job_id = client.submit(OFFICER_ID, [{'letter_type': 'Bank', 'case': bank_case(bank)}
+                                        for bank in ('SBI', 'HDFC Bank')])
+    assert client.wait(job_id)['generated'] == 2
+    path = client.download(job_id, str(tmp_path / 'letters.zip'))
+    names = zipfile.ZipFile(path).namelist()
+    assert sorted(names) == ['Notice_HDFC_Bank_2.docx', 'Notice_SBI_1.docx']
+
+
+def test_mixed_job_reports_the_failed_letter(client, tmp_path):
+    job_id = client.submit(OFFICER_ID, [
+        {'letter_type': 'Bank', 'case': bank_case('SBI')},
+        {'letter_type': 'TSP', 'case': {'TSP': 'Airtel', 'Request_Type': 'No such request'}},
+    ])
+    status = client.wait(job_id)
+    assert status['status'] == 'done'
+    assert [letter['status'] for letter in status['letters']] == ['ok', 'failed']
+    assert status['letters'][1]['error']
+    # Only the letter that was generated is downloaded, as a single .docx
+    path = client.download(job_id, str(tmp_path / 'mixed.docx'))
+    assert 'word/document.xml' in zipfile.ZipFile(path).namelist()
+    with pytest.raises(ServiceError, match='404'):
+        client.download(job_id, str(tmp_path / 'failed.docx'), index=1)
+
+
+def test_recipient_cannot_leave_the_job_directory(client, tmp_path):
+    job_id = client.submit(OFFICER_ID, [{'letter_type': 'Bank', 'case': bank_case(bank)}
+                                        for bank in ('../../evil', 'a/b\\c')])
+    assert client.wait(job_id)['generated'] == 2
+    path = client.download(job_id, str(tmp_path / 'letters.zip'))
+    assert sorted(zipfile.ZipFile(path).namelist()) == ['Notice_a_b_c_2.docx', 'Notice_evil_1.docx']
+    assert not (tmp_path / 'evil').exists()
+
+
+def test_every_case_of_a_job_is_saved(client):
+    second = dict(bank_case('HDFC Bank'), CrimeNumber='22/2025')
+    job_id = client.submit(OFFICER_ID, [{'letter_type': 'Bank', 'case': bank_case('SBI')},
+                                        {'letter_type': 'Bank', 'case': bank_case('Axis Bank')},
+                                        {'letter_type': 'Bank', 'case': second}])
+    assert client.wait(job_id)['generated'] == 3
+    conn = connect_db()
+    try:
+        rows = conn.execute("SELECT CrimeNumber FROM Cases ORDER BY CrimeNumber").fetchall()
+    finally:
+        conn.close()
+    assert [row[0] for row in rows] == ['21/2025', '22/2025']
+
+
+def test_job_larger_than_the_queue_is_too_large(client):
+    status, body = post(client, {'officer_id': OFFICER_ID,
+                                 'letters': [{'letter_type': 'Bank', 'case': bank_case('SBI')}] * 201})
+    assert status == 413
+    assert 'at most 200 letters' in body['error']
+
+
+def test_unknown_officer_is_rejected(client):
+    with pytest.raises(ServiceError, match='400.*Officer 999 not found'):
+        client.submit(999, [{'letter_type': 'Bank', 'case': bank_case('SBI')}])
+
+
+def test_unknown_letter_type_is_rejected(client):
+    with pytest.raises(ServiceError, match='400.*unknown letter type'):
+        client.submit(OFFICER_ID, [{'letter_type': 'Courier', 'case': {}}])
+
+
+@pytest.mark.parametrize('payload', [
+    {'officer_id': OFFICER_ID, 'letters': [{'letter_type': 'Bank', 'case': ['SBI']}]},
+    {'officer_id': OFFICER_ID, 'letter_type': 'Bank', 'case': 'SBI'},
+    {'officer_id': OFFICER_ID, 'letters': ['Bank']},
+    {'officer_id': OFFICER_ID, 'letters': {'letter_type': 'Bank'}},
+    ['not', 'an', 'object'],
+])
+def test_malformed_payload_is_a_bad_request(client, payload):
+    status, body = post(client, payload)
+    assert status == 400
+    assert body['error']
+
+
+def test_unknown_job_is_not_found(client):
+    with pytest.raises(ServiceError, match='404'):
+        client.status('doesnotexist')
+    with pytest.raises(ServiceError, match='404'):
+        client.download('doesnotexist', 'unused.docx')
+
+
+def test_health(client):
+    health = client.health()
+    assert health['status'] == 'ok'
+    assert health['workers'] == 2
@@ -0,0 +1,77 @@
+import pytest
+from engine.inter import PLATFORMS, build_inter_cases_by_platform
+from engine.templates import INTER_TEMPLATES
+from engine.urls import canonical_url, classify, classify_many
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('www.facebook.com/Some.User/?fbclid=abc&ref=bookmarks', ("Facebook", 'https://facebook.com/some.user')),
+    ('https://m.facebook.com/story.php?story_fbid=1&id=2&__tn__=R&sfnsn=mo',
+     ("Facebook", 'https://facebook.com/story.php?story_fbid=1&id=2')),
+    ('https://fb.com/Page/', ("Facebook", 'https://facebook.com/page')),
+    ('https://twitter.com/SomeUser/status/123?s=20&t=AbC', ("Twitter", 'https://x.com/someuser/status/123')),
+    ('https://www.instagram.com/p/AbCdE/?igshid=xyz&utm_source=ig_web', ("Instagram", 'https://instagram.com/p/AbCdE')),
+    ('https://instagram.com/Some_User?hl=en&ig_rid=1', ("Instagram", 'https://instagram.com/some_user')),
+    ('https://telegram.me/SomeChannel', ("Telegram", 'https://t.me/somechannel')),
+    ('https://www.youtube.com/watch?v=abc123&t=42&si=share&feature=shared',
+     ("Google", 'https://youtube.com/watch?v=abc123&t=42')),
+    ('https://example.com/page?s=query&t=1&ref=home&utm_campaign=x',
+     (None, 'https://example.com/page?s=query&t=1&ref=home')),
+])
+def test_canonical_url(url, expected):
+    assert canonical_url(url) == expected
+
+
+@pytest.mark.parametrize('url, expected', [
+    ('https://t.co/AbCdEf123', ("Twitter", 'https://t.co/AbCdEf123')),
+    ('https://fb.me/AbCdEf', ("Facebook", 'https://fb.me/AbCdEf')),
+    ('https://fb.watch/AbC_dE1/', ("Facebook", 'https://fb.watch/AbC_dE1')),
+    ('https://t.me/+AbCdEfGh', ("Telegram", 'https://t.me/+AbCdEfGh')),
+    ('https://telegram.me/joinchat/AbCdEfGh', ("Telegram", 'https://t.me/joinchat/AbCdEfGh')),
+    ('https://t.me/SomeChannel/123', ("Telegram", 'https://t.me/SomeChannel/123')),
+    ('https://x.com/SomeUser/status/123', ("Twitter", 'https://x.com/someuser/status/123')),
+])
+def test_case_sensitive_codes_are_kept(url, expected):
+    assert canonical_url(url) == expected
+
+
+def test_link_shims_are_unwrapped():
+    shim = 'https://l.facebook.com/l.php?u=https%3A%2F%2Ft.me%2FScamChannel%3Ffbclid%3Dabc&h=AT0'
+    assert canonical_url(shim) == ("Telegram", 'https://t.me/scamchannel')
+    assert classify('https://lm.facebook.com/l.php?u=https%3A%2F%2Fexample.com%2Fx') == (
+        None, None, 'https://example.com/x')
+    assert canonical_url('https://l.facebook.com/l.php') == ("Facebook", 'https://facebook.com/l.php')
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('Someone@Gmail.com', ("Google", "Gmail ID", 'someone@gmail.com')),
+    ('38400000-8CF0-11BD-B23E-10B96E40000D', ("Google", "GAID", '38400000-8cf0-11bd-b23e-10b96e40000d')),
+    ('+91 98765 43210', ("WhatsApp", None, '9876543210')),
+    ('https://wa.me/919876543210', ("WhatsApp", None, '9876543210')),
+    ('ig:Some.User', ("Instagram", None, 'https://instagram.com/some.user')),
+    ('tg:@SomeChannel', ("Telegram", None, 'https://t.me/somechannel')),
+    ('https://youtu.be/abc', ("Google", "URL", 'https://youtu.be/abc')),
+    ('someone@example.com', (None, None, 'someone@example.com')),
+    ('', (None, None, '')),
+])
+def test_classify(value, expected):
+    assert classify(value) == expected
+
+
+def test_handles_use_the_default_platform():
+    assert classify('@SomeUser', "Twitter") == ("Twitter", None, 'https://x.com/someuser')
+    assert classify('@SomeUser') == (None, None, '@SomeUser')
+
+
+def test_classify_many_groups_and_drops_duplicates():
+    groups, unknown = classify_many([
+        'https://facebook.com/a', 'https://www.facebook.com/A/?fbclid=1', 'https://t.me/chan', 'not a url !',
+    ])
+    assert groups == {("Facebook", None): ['https://facebook.com/a'], ("Telegram", None): ['https://t.me/chan']}
+    assert unknown == ['not a url !']
+
+
+def test_every_platform_has_a_template():
+    assert set(PLATFORMS) <= set(INTER_TEMPLATES)
+    cases, unknown = build_inter_cases_by_platform('21/2025', '12345678901234', ['https://t.me/chan'])
+    assert [case['Platform'] for case in cases] == ["Telegram"] and not unknown
@@ -0,0 +1,54 @@
+import pytest
+from db.database import connect_db
+from gui.virtual_list import SQLitePageSource
+
+
+@pytest.fixture
+def source(database):
+    conn = connect_db()
+    with conn:
+        conn.executemany("INSERT INTO BatchErrors (BatchId, LetterType, Stage, Message) VALUES (?, 'Bank', ?, ?)",
+                         [('b1', 'render' if i % 3 else 'validate', f"error {i}") for i in range(1, 1001)])
+        # Gaps in the key column
+        conn.execute("DELETE FROM BatchErrors WHERE Id % 7 = 0")
+    conn.close()
+    source = SQLitePageSource("BatchErrors", ("Id", "Message"), page_size=50)
+    yield source
+    source.close()
+
+
+def expected(where="1"):
+    conn = connect_db()
+    rows = conn.execute(f"SELECT Id, Message FROM BatchErrors WHERE {where} ORDER BY Id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_reload_counts_without_reading_the_keys(source):
+    source.reload()
+    assert len(source) == len(expected())
+    assert source.anchors == {}
+
+
+@pytest.mark.parametrize('start', [0, 49, 50, 475, 800, 850])
+def test_rows_match_an_offset_query(source, start):
+    source.reload()
+    assert source.rows(start, 10) == expected()[start:start + 10]
+
+
+def test_jumping_to_the_end_and_back(source):
+    source.reload()
+    rows = expected()
+    assert source.rows(len(rows) - 5, 10) == rows[-5:]
+    assert source.rows(120, 60) == rows[120:180]
+    assert source.rows(0, 3) == rows[:3]
+    assert source.rows(len(rows), 10) == []
+
+
+def test_filter(source):
+    source.set_filter("Stage = ?", ('validate',))
+    source.reload()
+    rows = expected("Stage = 'validate'")
+    assert len(source) == len(rows)
+    assert source.rows(len(rows) - 20, 20) == rows[-20:]
+    assert source.rows(55, 5) == rows[55:60]
@@ -1,28 +1,7 @@
-from reportlab.lib.pagesizes import A4
-from reportlab.pdfgen import canvas
+from engine.render import render
+from engine.templates import default_template_dir
 
-def generate_letter(case, officer, output_path):
-    c = canvas.Canvas(output_path, pagesize=A4)
-    c.setFont("Helvetica", 12)
-    y = 750
-    c.drawString(50, y, f"To,")
-    y -= 20
-    c.drawString(50, y, case['RecipientName'])
-    y -= 20
-    c.drawString(50, y, f"Subject: Request for Information Regarding Case No. {case['CaseNumber']}")
-    y -= 40
-    c.drawString(50, y, "Dear Sir/Madam,")
-    y -= 20
-  
-    c.drawString(50, y, f"Case No. {case['CaseNumber']}, reported on {case['RequestDate']}")
-    y -= 20
-    c.drawString(50, y, "Please provide the relevant details at the earliest convenience.")
-    y -= 40
-    c.drawString(50, y, f"Officer: {officer['OfficerName']}")
-    y -= 20
-    c.drawString(50, y, f"From: {officer['Address']}")
-    y -= 20
-    c.drawString(50, y, "Regards,")
-    y -= 20
-    c.drawString(50, y, "Cyber Crime Department")
-    c.save()
\ No newline at end of file
+
+def generate_letter(case, officer, output_path, letter_type='Bank', template_dir=None):
+    """Write one letter as PDF from the same template the .docx letters use."""
+    return render(letter_type, case, officer, template_dir or default_template_dir(), output_path, 'pdf')